@@ -2,7 +2,9 @@ import importlib
 import inspect
 import os
 import sys
+import time
 
+from fnmatch import fnmatch
 from typing import *
 
 from .bundle import AppBundle, Bundle
@@ -77,8 +79,38 @@ class AppFactory:
         for bundle in bundles:
             bundle.after_init_app(app)
 
+        if app.config.get('WARMUP_ON_STARTUP'):
+            cls.warmup(app, bundles)
+
         return app
 
+    @classmethod
+    def warmup(cls,
+               app: FlaskUnchained,
+               bundles: List[Bundle],
+               ) -> Dict[str, float]:
+        """
+        Performs the initialization that would otherwise happen lazily while
+        serving the first request(s): building the URL map, compiling the templates
+        listed in the ``WARMUP_TEMPLATES`` config option, and running each bundle's
+        :meth:`~flask_unchained.Bundle.warmup` method. Runs automatically at the end
+        of :meth:`create_app` when the ``WARMUP_ON_STARTUP`` config option is set.
+
+        :return: A dictionary of how long each step took, in seconds.
+        """
+        steps = [('url_map', lambda: app.url_map.update()),
+                 ('templates', lambda: _compile_templates(app))]
+        steps += [(bundle.name, lambda bundle=bundle: bundle.warmup(app))
+                  for bundle in bundles]
+
+        timings = {}
+        for name, step in steps:
+            start = time.perf_counter()
+            step()
+            timings[name] = time.perf_counter() - start
+            app.logger.info(f'Warmup step {name} took {timings[name] * 1000:.1f}ms')
+        return timings
+
     @classmethod
     def create_basic_app(cls, bundles=None, _config_overrides=None):
         """
@@ -100,6 +132,19 @@ class AppFactory:
         return app
 
 
+def _compile_templates(app: FlaskUnchained):
+    patterns = app.config.get('WARMUP_TEMPLATES') or []
+    names = [pattern for pattern in patterns
+             if not any(char in pattern for char in '*?[')]
+    if len(names) != len(patterns):
+        names += [name for name in app.jinja_env.list_templates()
+                  if name not in names
+                  and any(fnmatch(name, pattern) for pattern in patterns)]
+
+    for name in names:
+        app.jinja_env.get_template(name)
+
+
 def _cwd_import(module_name):
     module = importlib.import_module(module_name)
     expected_path = os.path.join(os.getcwd(), module_name.replace('.', os.sep) + '.py')
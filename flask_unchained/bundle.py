@@ -214,6 +214,15 @@ class Bundle(metaclass=_BundleMetaclass):
         """
         pass
 
+    def warmup(self, app: FlaskUnchained):
+        """
+        Override this method to eagerly perform any (expensive) initialization that
+        would otherwise happen lazily while serving the first requests. Only called
+        when the ``WARMUP_ON_STARTUP`` config option is enabled, after the
+        application has been fully initialized.
+        """
+        pass
+
     def _iter_class_hierarchy(self, include_self=True, reverse=True):
         """
         Iterate over the bundle classes in the hierarchy. Yields base-most
@@ -57,6 +57,21 @@ class ApiBundle(Bundle):
         self.set_json_encoder(app)
         app.before_first_request(self.register_model_resources)
 
+    def warmup(self, app: FlaskUnchained):
+        """
+        Instantiate the (lazily created) nested schemas of the serializers
+        attached to model resources.
+        """
+        from marshmallow.fields import Nested
+
+        for resource in self.resources_by_model.values():
+            for serializer in [resource.Meta.serializer,
+                               resource.Meta.serializer_many,
+                               resource.Meta.serializer_create]:
+                for field in getattr(serializer, 'fields', {}).values():
+                    if isinstance(field, Nested):
+                        field.schema
+
     def register_model_resources(self):
         for resource in unchained.api_bundle.resources_by_model.values():
             api.register_model_resource(resource)
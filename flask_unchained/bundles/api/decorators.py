@@ -3,17 +3,23 @@ from http import HTTPStatus
 
 from flask import abort, request
 
+from flask_unchained.bundles.sqlalchemy.services.session_manager import _no_read_replica
+
 
 def list_loader(*decorator_args, model):
     """
     Decorator to automatically query the database for all records of a model.
+    The query is routed to a read replica, if any are configured.
 
     :param model: The model class to query
     """
     def wrapped(fn):
         @wraps(fn)
         def decorated(*args, **kwargs):
-            return fn(model.query.all())
+            query = model.query
+            with getattr(query.session, 'read_replica', _no_read_replica)():
+                instances = query.all()
+            return fn(instances)
         return decorated
 
     if decorator_args and callable(decorator_args[0]):
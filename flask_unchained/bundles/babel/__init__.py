@@ -1,9 +1,9 @@
-import pkg_resources
 import re
 
 from flask import Blueprint, current_app, g, request
-from flask_babelex import Domain, gettext as _gettext, ngettext as _ngettext
+from flask_babelex import gettext as _gettext, ngettext as _ngettext
 from flask_unchained import Bundle, FlaskUnchained, DEV, TEST
+from functools import lru_cache
 from speaklater import make_lazy_string
 from typing import *
 
@@ -94,12 +94,12 @@ def gettext(*args, **kwargs):
     current global domain). This function is usually aliased as ``_``.
     """
     key = args[0]
-    key_match = TRANSLATION_KEY_RE.match(key)
+    domain_name = _get_key_domain_name(key)
     translation = _gettext(*args, **kwargs)
-    if not key_match or translation != key:
+    if not domain_name or translation != key:
         return translation
 
-    return _get_domain(key_match).gettext(*args, **kwargs)
+    return _get_domain(domain_name).gettext(*args, **kwargs)
 
 
 def lazy_gettext(*args, **kwargs):
@@ -116,16 +116,16 @@ def ngettext(*args, **kwargs):
     is_plural = args[2] > 1
     if not is_plural:
         key = args[0]
-        key_match = TRANSLATION_KEY_RE.match(key)
+        domain_name = _get_key_domain_name(key)
     else:
         key = args[1]
-        key_match = PLURAL_TRANSLATION_KEY_RE.match(key)
+        domain_name = _get_plural_key_domain_name(key)
 
     translation = _ngettext(*args, **kwargs)
-    if not key_match or translation != key:
+    if not domain_name or translation != key:
         return translation
 
-    return _get_domain(key_match).ngettext(*args, **kwargs)
+    return _get_domain(domain_name).ngettext(*args, **kwargs)
 
 
 def lazy_ngettext(*args, **kwargs):
@@ -135,11 +135,17 @@ def lazy_ngettext(*args, **kwargs):
     return make_lazy_string(ngettext, *args, **kwargs)
 
 
-def _get_domain(match):
-    domain_name = match.groupdict()['domain']
-    try:
-        domain_resources = pkg_resources.resource_filename(domain_name, 'translations')
-    except ImportError:
-        return current_app.extensions['babel']._default_domain
+@lru_cache(maxsize=2048)
+def _get_key_domain_name(key: str) -> Optional[str]:
+    match = TRANSLATION_KEY_RE.match(key)
+    return match and match.group('domain')
 
-    return Domain(domain_resources, domain=domain_name)
+
+@lru_cache(maxsize=2048)
+def _get_plural_key_domain_name(key: str) -> Optional[str]:
+    match = PLURAL_TRANSLATION_KEY_RE.match(key)
+    return match and match.group('domain')
+
+
+def _get_domain(domain_name):
+    return current_app.extensions['babel'].get_domain(domain_name)
@@ -0,0 +1,98 @@
+import os
+
+from babel.messages.catalog import Catalog
+from babel.messages.mofile import read_mo, write_mo
+from babel.support import Translations
+from typing import *
+
+
+def compile_catalogs(translations_dirs: Iterable[str],
+                     output_dir: str,
+                     ) -> Dict[str, int]:
+    """
+    Merge the compiled (``.mo``) catalogs of every domain in the given translations
+    directories into one ``<locale>.mo`` catalog per locale, in ``output_dir``.
+    Translations from later directories override those from earlier ones.
+
+    :param translations_dirs: The translations directories to merge, each with
+                              ``<locale>/LC_MESSAGES/<domain>.mo`` catalogs.
+    :param output_dir: The directory to write the merged catalogs to.
+    :return: A dictionary of locales to the number of messages in their catalog.
+    """
+    catalogs = {}
+    for translations_dir in translations_dirs:
+        if not os.path.isdir(translations_dir):
+            continue
+
+        for locale in sorted(os.listdir(translations_dir)):
+            messages_dir = os.path.join(translations_dir, locale, 'LC_MESSAGES')
+            if not os.path.isdir(messages_dir):
+                continue
+
+            # NOTE: Catalog.__setitem__ keeps the existing string of a message,
+            # so collect the messages in a dict for later ones to replace
+            messages = catalogs.setdefault(locale, {})
+            for filename in sorted(os.listdir(messages_dir)):
+                if not filename.endswith('.mo'):
+                    continue
+
+                with open(os.path.join(messages_dir, filename), 'rb') as f:
+                    for message in read_mo(f):
+                        if message.id:
+                            messages[message.id] = message
+
+    os.makedirs(output_dir, exist_ok=True)
+    for locale, messages in catalogs.items():
+        catalog = Catalog(locale=locale)
+        for message in messages.values():
+            catalog[message.id] = message
+        with open(os.path.join(output_dir, f'{locale}.mo'), 'wb') as f:
+            write_mo(f, catalog)
+    return {locale: len(messages) for locale, messages in catalogs.items()}
+
+
+def load_compiled_catalogs(dirname: str,
+                           locales: Iterable[str] = (),
+                           ) -> Dict[str, Translations]:
+    """
+    Load the catalogs written by :func:`compile_catalogs` (if any). Like with
+    uncompiled catalogs, regional locales fall back to their language (eg
+    ``fr_CA`` to ``fr``), for messages they don't translate.
+
+    :param locales: Additional locales to resolve (eg the ones supported by the
+                    app), which may only have catalogs to fall back to.
+    :return: A dictionary of locales to their translations.
+    """
+    catalogs = {}
+    if not os.path.isdir(dirname):
+        return catalogs
+
+    for filename in os.listdir(dirname):
+        locale, ext = os.path.splitext(filename)
+        if ext == '.mo':
+            with open(os.path.join(dirname, filename), 'rb') as f:
+                catalogs[locale] = Translations(f)
+
+    # link every catalog to its closest parent only (eg zh_Hant_TW to zh_Hant,
+    # and zh_Hant to zh), so that the fallbacks chain without any cycles
+    for locale, translations in catalogs.items():
+        parent = _find_catalog(catalogs, locale.split('_')[:-1])
+        if parent is not None:
+            translations.add_fallback(parent)
+
+    rv = {}
+    for locale in set(catalogs) | {str(locale) for locale in locales}:
+        translations = _find_catalog(catalogs, locale.split('_'))
+        if translations is not None:
+            rv[locale] = translations
+    return rv
+
+
+def _find_catalog(catalogs: Dict[str, Translations],
+                  parts: List[str],
+                  ) -> Optional[Translations]:
+    for i in range(len(parts), 0, -1):
+        name = '_'.join(parts[:i])
+        if name in catalogs:
+            return catalogs[name]
+    return None
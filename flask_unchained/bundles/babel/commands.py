@@ -7,6 +7,8 @@ from flask import current_app
 from flask_unchained.cli import cli, click
 from flask_unchained import AppBundle
 
+from .catalogs import compile_catalogs as _compile_catalogs
+
 DEFAULT_DOMAIN = 'messages'
 
 
@@ -67,6 +69,25 @@ def update(domain):
     return _run(f'update -i {pot} -d {translations_dir} --domain={domain}')
 
 
+@babel.command('compile-catalogs')
+@click.option('--output-dir', '-o', default=None,
+              help='The directory to write the catalogs to. Defaults to the '
+                   'BABEL_COMPILED_CATALOGS_DIR config option.')
+def compile_catalogs(output_dir):
+    """
+    Merge the compiled translations of all bundles (and the app) into a single
+    catalog per language, to load at startup.
+    """
+    output_dir = output_dir or current_app.config.get('BABEL_COMPILED_CATALOGS_DIR')
+    if not output_dir:
+        raise click.UsageError('Either pass --output-dir or set the '
+                               'BABEL_COMPILED_CATALOGS_DIR config option.')
+
+    counts = _compile_catalogs(_get_all_translations_dirs(), output_dir)
+    for locale, count in sorted(counts.items()):
+        click.echo(f'Compiled {count} messages for {locale}')
+
+
 def _run(str):
     return CommandLineInterface().run([sys.argv[0]] + str.split(' '))
 
@@ -100,6 +121,19 @@ def _get_translations_dir():
     return translations_dir
 
 
+def _get_all_translations_dirs():
+    # the app's translations come last, so that they override the bundles'
+    rv, app_dirs = [], [os.path.join(current_app.root_path, 'translations')]
+    for bundle in current_app.unchained.bundles.values():
+        for b in bundle._iter_class_hierarchy():
+            if isinstance(b, AppBundle):
+                app_dirs.append(os.path.join(os.path.dirname(b.folder),
+                                             'translations'))
+            else:
+                rv.append(os.path.join(b.folder, 'translations'))
+    return list(dict.fromkeys(rv + app_dirs))
+
+
 def _get_translations_domain(domain):
     if domain != DEFAULT_DOMAIN:
         return domain
@@ -49,6 +49,15 @@ class Config(BundleConfig):
     A dictionary of date formats.
     """
 
+    BABEL_COMPILED_CATALOGS_DIR = None
+    """
+    The directory to write precompiled catalogs to with ``flask babel
+    compile-catalogs``, and to load them from at startup. Precompiled catalogs
+    merge the translations of all bundles (and the app) into a single catalog per
+    locale, so that translations never get looked up on the filesystem per
+    request. Set to ``None`` to load each bundle's translations as needed instead.
+    """
+
     ENABLE_URL_LANG_CODE_PREFIX = False
     """
     Whether or not to enable the capability to specify the language code as part of
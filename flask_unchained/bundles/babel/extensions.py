@@ -1,4 +1,65 @@
-from flask_babelex import Babel
+import pkg_resources
+
+from flask_babelex import Babel as BaseBabel, Domain
+
+from .catalogs import load_compiled_catalogs
+
+
+class Babel(BaseBabel):
+    """
+    The `Babel` extension::
+
+        from flask_unchained.bundles.babel import babel
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._domains = {}
+        self._compiled_catalogs_dir = None
+        self._locales = ()
+
+    def init_app(self, app):
+        super().init_app(app)
+        self._compiled_catalogs_dir = app.config.get('BABEL_COMPILED_CATALOGS_DIR')
+        self._locales = [lang.replace('-', '_') for lang in
+                         [*app.config.get('LANGUAGES', []),
+                          app.config.get('BABEL_DEFAULT_LOCALE', 'en')]]
+        self.reload_catalogs()
+
+    def get_domain(self, domain_name: str) -> Domain:
+        """
+        Returns the :class:`~flask_babelex.Domain` for the translations in the
+        ``translations`` folder of the package named ``domain_name`` (or the
+        default domain, if no such package exists). Domains are cached, and they
+        cache the catalogs they load per locale.
+
+        When using precompiled catalogs, every domain's translations are included
+        in the default domain's catalogs, so the default domain gets returned.
+        """
+        domain = self._domains.get(domain_name)
+        if domain is None:
+            if self._compiled_catalogs_dir:
+                return self._default_domain
+
+            try:
+                dirname = pkg_resources.resource_filename(domain_name, 'translations')
+            except ImportError:
+                domain = self._default_domain
+            else:
+                domain = Domain(dirname, domain=domain_name)
+            self._domains[domain_name] = domain
+        return domain
+
+    def reload_catalogs(self) -> None:
+        """
+        Clear the cached domains and translation catalogs, so that they get
+        loaded again (eg after recompiling translations during development).
+        """
+        self._domains = {}
+        self._default_domain.cache.clear()
+        if self._compiled_catalogs_dir:
+            self._default_domain.cache.update(load_compiled_catalogs(
+                self._compiled_catalogs_dir, self._locales))
 
 
 babel = Babel()
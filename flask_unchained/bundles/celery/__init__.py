@@ -1,5 +1,6 @@
 from flask_unchained import Bundle
 
+from .batch_task import BatchTask
 from .extensions import Celery, celery
 
 
@@ -0,0 +1,108 @@
+import os
+import threading
+
+from concurrent.futures import Future
+from flask import current_app, has_app_context
+from typing import *
+
+
+class BatchTask:
+    """
+    Buffers calls to a Celery task in-process, and delivers them to the task as
+    one list of ``(args, kwargs)`` pairs, once ``max_size`` calls have been
+    buffered, or ``max_wait`` seconds after the first call was buffered.
+    Created by the :meth:`~flask_unchained.bundles.celery.Celery.batch_task`
+    decorator::
+
+        @celery.batch_task(max_size=100, max_wait=1.0)
+        def invalidate_cache(calls):
+            keys = [args[0] for args, kwargs in calls]
+            ...
+
+        invalidate_cache.delay('some-key')
+
+    **NOTE:** Buffered calls are only kept in memory. They get sent when the
+    process exits normally, but they are lost if it gets killed (eg with
+    ``SIGKILL``) before ``max_wait`` has passed.
+    """
+
+    def __init__(self, task, name: str, max_size: int, max_wait: float):
+        self.task = task
+        self.name = name
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._futures = []
+        self._timer = None
+        self._pid = os.getpid()
+
+    def __call__(self, *args, **kwargs):
+        """
+        Run the task directly (in the current process) with a single call.
+        """
+        return self.task([(args, kwargs)])
+
+    def delay(self, *args, **kwargs) -> Future:
+        """
+        Buffer a call to the task. When testing, the task gets applied right away.
+
+        :return: A :class:`~concurrent.futures.Future` that resolves to the
+                 :class:`~celery.result.AsyncResult` of the batch the call gets
+                 sent with (once it has been sent).
+        """
+        future = Future()
+        if has_app_context() and current_app.testing:
+            future.set_result(self.task.apply([[(args, kwargs)]]))
+            return future
+
+        with self._lock:
+            if self._pid != os.getpid():
+                # forked processes must not send the parent's buffered calls
+                self._buffer, self._futures, self._timer = [], [], None
+                self._pid = os.getpid()
+
+            self._buffer.append((args, kwargs))
+            self._futures.append(future)
+            if len(self._buffer) >= self.max_size:
+                batch, futures = self._take_buffer()
+            else:
+                batch, futures = None, None
+                if self._timer is None:
+                    self._timer = threading.Timer(self.max_wait, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+
+        if batch:
+            self._send(batch, futures)
+        return future
+
+    def flush(self) -> None:
+        """
+        Send the buffered calls to the task now.
+        """
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            batch, futures = self._take_buffer()
+
+        if batch:
+            self._send(batch, futures)
+
+    def _send(self, batch: List[Tuple[tuple, dict]], futures: List[Future]) -> None:
+        try:
+            result = self.task.delay(batch)
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            raise
+        for future in futures:
+            future.set_result(result)
+
+    def _take_buffer(self) -> Tuple[List[Tuple[tuple, dict]], List[Future]]:
+        batch, self._buffer = self._buffer, []
+        futures, self._futures = self._futures, []
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch, futures
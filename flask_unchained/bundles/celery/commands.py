@@ -1,8 +1,22 @@
+import os
 import subprocess
 import sys
+import threading
 import time
+import uuid
 
-from flask_unchained.cli import cli
+from celery.utils.log import mlevel
+from celery.utils.nodenames import default_nodename
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from flask import _app_ctx_stack, current_app
+from flask_mail import Message
+from flask_unchained.cli import cli, click
+from flask_unchained.commands.utils import print_table
+
+from .extensions import celery as celery_ext
+from .metrics import RegistryMetricsSink, merge_snapshots
+from .serializers import benchmark
 
 
 @cli.group()
@@ -13,12 +27,41 @@ def celery():
 
 
 @celery.command()
-def worker():
+@click.option('-c', '--concurrency', type=int, default=os.cpu_count(),
+              show_default=True,
+              help='Number of child processes (or threads) processing tasks.')
+@click.option('-P', '--pool', type=click.Choice(['prefork', 'solo']),
+              default='prefork', show_default=True,
+              help='The pool implementation to run tasks with.')
+@click.option('--prefetch-multiplier', type=int, default=4, show_default=True,
+              help='How many messages to prefetch per process. Use 1 for '
+                   'long-running tasks.')
+@click.option('-l', '--loglevel', default='info', show_default=True,
+              type=click.Choice(['debug', 'info', 'warning', 'error', 'critical']),
+              help='The logging level.')
+@click.option('-n', '--hostname', default=None,
+              help='The worker node name. Defaults to celery@<hostname>.')
+def worker(concurrency, pool, prefetch_multiplier, loglevel, hostname):
     """
     Start the celery worker.
+
+    The worker runs in this process, using the already initialized app, so that
+    prefork pool processes inherit it when they get forked (instead of every one
+    of them importing and initializing the app again).
     """
-    _run_until_killed('celery worker -A celery_app.celery -l debug',
-                      'celery worker')
+    # database connections must not be shared with the forked pool processes
+    sqlalchemy = current_app.extensions.get('sqlalchemy')
+    if sqlalchemy is not None:
+        sqlalchemy.db.dispose_engines()
+
+    with _detached_app_context():
+        worker = celery_ext.Worker(hostname=default_nodename(hostname),
+                                   pool_cls=pool,
+                                   concurrency=concurrency,
+                                   prefetch_multiplier=prefetch_multiplier,
+                                   loglevel=mlevel(loglevel))
+        worker.start()
+    sys.exit(worker.exitcode)
 
 
 @celery.command()
@@ -30,6 +73,123 @@ def beat():
                       'celery beat')
 
 
+@celery.command()
+@click.option('--timeout', default=1.0, show_default=True,
+              help='How many seconds to wait for the workers to reply.')
+def stats(timeout):
+    """
+    Show the task metrics collected by the running workers.
+    """
+    sink = current_app.config.get('CELERY_TASK_METRICS_SINK')
+    if not isinstance(sink, RegistryMetricsSink):
+        click.echo('Task metrics are only collected by the workers when '
+                   'CELERY_TASK_METRICS_SINK is a RegistryMetricsSink.')
+        return
+
+    replies = celery_ext.control.broadcast('task_metrics', reply=True,
+                                           timeout=timeout) or []
+    metrics = merge_snapshots(snapshot for reply in replies
+                              for snapshot in reply.values())
+    if not metrics:
+        click.echo('No task metrics have been recorded yet.')
+        return
+
+    rows = []
+    for task_name, task_metrics in sorted(metrics.items()):
+        for metric, s in sorted(task_metrics.items()):
+            rows.append((task_name, metric, s['count'],
+                         _format_metric(metric, s['total'] / s['count']),
+                         _format_metric(metric, s['min']),
+                         _format_metric(metric, s['max'])))
+    print_table(['Task', 'Metric', 'Count', 'Mean', 'Min', 'Max'], rows)
+
+
+@celery.command(name='benchmark-serializers')
+@click.option('--number', default=1000, show_default=True,
+              help='How many times to encode and decode the payload.')
+def benchmark_serializers(number):
+    """
+    Compare the payload size and speed of the task serializers.
+    """
+    html = '<p>' + 'Hello world! ' * 100 + '</p>'
+    msg = Message('Hello world', ['foo@example.com'], html=html, body=html[3:-4])
+    payload = ((msg,), dict(sent_at=datetime.now(timezone.utc), id=uuid.uuid4()), {})
+
+    print_table(['Serializer', 'Size (bytes)', 'Encode (µs)', 'Decode (µs)'],
+                [(name, size, f'{encode_time:.1f}', f'{decode_time:.1f}')
+                 for name, size, encode_time, decode_time
+                 in benchmark(payload, number=number)])
+
+
+@celery.command(name='benchmark-app-context')
+@click.option('--number', default=10000, show_default=True,
+              help='How many times to run a no-op task.')
+def benchmark_app_context(number):
+    """
+    Compare task throughput with and without a persistent app context.
+    """
+    app = current_app._get_current_object()
+    noop = celery_ext.task(name='flask_unchained.bundles.celery.benchmark_noop')(_noop)
+
+    def run(persistent):
+        # tasks must run outside of the command's app context, like in a worker
+        app.config.CELERY_PERSISTENT_APP_CONTEXT = persistent
+        results = []
+
+        def target():
+            try:
+                results.append(_time_calls(noop, number))
+            except Exception as e:
+                results.append(e)
+
+        thread = threading.Thread(target=target)
+        thread.start()
+        thread.join()
+        if isinstance(results[0], Exception):
+            raise results[0]
+        return number / results[0]
+
+    original = app.config.CELERY_PERSISTENT_APP_CONTEXT
+    try:
+        rows = [('per task', f'{run(False):.0f}'),
+                ('persistent', f'{run(True):.0f}')]
+    finally:
+        app.config.CELERY_PERSISTENT_APP_CONTEXT = original
+    print_table(['App context', 'Tasks per second'], rows)
+
+
+@contextmanager
+def _detached_app_context():
+    """
+    Temporarily remove the command's app context from the stack (without tearing
+    it down), so that tasks run in the worker get their own app contexts.
+    """
+    ctx = _app_ctx_stack.pop()
+    try:
+        yield
+    finally:
+        _app_ctx_stack.push(ctx)
+
+
+def _format_metric(metric, value):
+    if metric == 'payload_size':
+        return f'{value:.0f}B'
+    return f'{value * 1000:.2f}ms'
+
+
+def _noop():
+    pass
+
+
+def _time_calls(task, number):
+    # apply the task (instead of calling it) so that the task signals get sent,
+    # like in a worker (eg the persistent app context gets reset after each task)
+    start = time.perf_counter()
+    for _ in range(number):
+        task.apply()
+    return time.perf_counter() - start
+
+
 def _run_until_killed(cmd, kill_proc):
     p = None
     try:
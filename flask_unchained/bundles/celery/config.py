@@ -2,6 +2,7 @@ import os
 
 from flask_unchained import BundleConfig
 
+from .serializers import msgpack
 from .tasks import async_mail_task, _send_mail_async
 
 
@@ -23,9 +24,45 @@ class Config(BundleConfig):
     The result backend URL to connect to.
     """
 
-    CELERY_ACCEPT_CONTENT = ('json', 'pickle', 'dill')
+    CELERY_ACCEPT_CONTENT = ('json', 'pickle', 'dill', 'tagged-json') + (
+        ('tagged-msgpack',) if msgpack else ())
     """
-    Tuple of supported serialization strategies.
+    Tuple of supported serialization strategies. The ``tagged-json`` and
+    ``tagged-msgpack`` serializers (the latter requires msgpack to be installed)
+    extend their untagged counterparts with support for datetimes, UUIDs,
+    decimals, sets, bytes, lazy strings, :class:`~flask_mail.Message` instances
+    and references to SQLAlchemy model instances (by primary key, loaded in the
+    task's app context when it runs). More types can be added with
+    :func:`~flask_unchained.bundles.celery.serializers.register_type`, and tasks
+    can select a serializer with eg ``@celery.task(serializer='tagged-json')``.
+    """
+
+    CELERY_PERSISTENT_APP_CONTEXT = False
+    """
+    Whether or not to keep one app context active per worker process (or thread)
+    for running tasks, instead of pushing (and tearing down) a new one for every
+    task. Between tasks, only the database session and ``g`` get reset. This
+    speeds up workers running many small tasks, but note that
+    ``teardown_appcontext`` handlers will not run after each task.
+    """
+
+    CELERY_TASK_METRICS_SINK = None
+    """
+    An instance of a :class:`~flask_unchained.bundles.celery.metrics.MetricsSink`
+    subclass to record task metrics with (queue wait and runtime per task, and
+    optionally the serialized payload size), or ``None`` to disable recording
+    them. Use a :class:`~flask_unchained.bundles.celery.metrics.RegistryMetricsSink`
+    to aggregate them in the workers, so that they can be viewed with
+    ``flask celery stats`` (with the prefork pool, the pool processes send their
+    metrics to the main worker process through a pipe).
+    """
+
+    CELERY_TASK_METRICS_PAYLOAD_SIZE = False
+    """
+    Whether or not to record the serialized payload size of tasks (requires
+    ``CELERY_TASK_METRICS_SINK``). Celery only serializes task messages after
+    the ``before_task_publish`` signal, so measuring them means serializing every
+    message body an extra time when it gets enqueued.
     """
 
     # configure mail bundle to send emails via celery
@@ -2,12 +2,20 @@
 code adapted from:
 https://stackoverflow.com/questions/12044776/how-to-use-flask-sqlalchemy-in-a-celery-task
 """
+import atexit
 import flask
+import threading
+import time
 
 from celery import Celery as BaseCelery
-from dill import dumps as dill_dumps, load as dill_load
-from kombu.serialization import pickle_loads, pickle_protocol, registry
-from kombu.utils.encoding import str_to_bytes
+from celery.signals import (before_task_publish, task_postrun, worker_init,
+                            worker_process_init)
+from kombu.serialization import registry
+
+from ..batch_task import BatchTask
+from ..metrics import (RegistryMetricsSink,
+                       task_metrics)  # task_metrics registers the inspect command
+from ..serializers import register_serializers, _resolve_model_references
 
 
 class Celery(BaseCelery):
@@ -17,9 +25,12 @@ class Celery(BaseCelery):
         from flask_unchained.bundles.celery import celery
     """
     def __init__(self, *args, **kwargs):
-        self._register_dill()
+        register_serializers()
         super().__init__(*args, **kwargs)
         self.override_task_class()
+        self._local = threading.local()
+        self.batch_tasks = {}
+        atexit.register(self.flush_batch_tasks)
 
     def override_task_class(self):
         BaseTask = self.Task
@@ -29,11 +40,38 @@ class Celery(BaseCelery):
             abstract = True
 
             def __call__(self, *args, **kwargs):
+                sink = _celery.app.config.get('CELERY_TASK_METRICS_SINK')
+                if sink is None or self.request.called_directly:
+                    return self._call(*args, **kwargs)
+
+                start = time.time()
+                enqueued_at = _get_header(self.request, 'enqueued_at')
+                if enqueued_at is not None:
+                    sink.record(self.name, 'queue_wait', max(start - enqueued_at, 0))
+                payload_size = _get_header(self.request, 'payload_size')
+                if payload_size is not None:
+                    sink.record(self.name, 'payload_size', payload_size)
+
+                perf_start = time.perf_counter()
+                try:
+                    return self._call(*args, **kwargs)
+                finally:
+                    sink.record(self.name, 'runtime',
+                                time.perf_counter() - perf_start)
+
+            def _call(self, *args, **kwargs):
                 if flask.has_app_context():
-                    return BaseTask.__call__(self, *args, **kwargs)
+                    return self._run(args, kwargs)
+                elif _celery.app.config.CELERY_PERSISTENT_APP_CONTEXT:
+                    _celery.push_persistent_app_context()
+                    return self._run(args, kwargs)
                 else:
                     with _celery.app.app_context():
-                        return BaseTask.__call__(self, *args, **kwargs)
+                        return self._run(args, kwargs)
+
+            def _run(self, args, kwargs):
+                args, kwargs = _resolve_model_references((args, kwargs))
+                return BaseTask.__call__(self, *args, **kwargs)
 
         self.Task = ContextTask
 
@@ -44,28 +82,122 @@ class Celery(BaseCelery):
         self.__autoset('result_backend', app.config.CELERY_RESULT_BACKEND)
         self.config_from_object(app.config)
 
+        worker_init.connect(self._on_worker_init,
+                            dispatch_uid='flask_unchained.celery.worker_init')
+        worker_process_init.connect(self._on_worker_process_init,
+                                    dispatch_uid='flask_unchained.celery.process_init')
+        task_postrun.connect(self._on_task_postrun,
+                             dispatch_uid='flask_unchained.celery.task_postrun')
+        before_task_publish.connect(self._on_before_task_publish,
+                                    dispatch_uid='flask_unchained.celery.before_publish')
+
         # we don't use self.autodiscover_tasks here, preferring instead to allow the
         # DiscoverTasksHook to discover tasks. This way allows for bundles to define
         # what module their tasks are located in (and in a consistent way with how it
         # works for the rest of Flask Unchained)
 
-    def _register_dill(self):
-        def encode(obj, dumper=dill_dumps):
-            return dumper(obj, protocol=pickle_protocol)
+    def batch_task(self, *args, max_size: int = 100, max_wait: float = 1.0, **opts):
+        """
+        Decorator to create a :class:`~flask_unchained.bundles.celery.BatchTask`.
+        The decorated function receives a list of the ``(args, kwargs)`` pairs
+        that :meth:`BatchTask.delay` got called with. Any extra arguments are
+        passed on to :meth:`task`.
+
+        :param max_size: The maximum number of calls to buffer per batch.
+        :param max_wait: The maximum number of seconds to buffer calls for.
+        """
+        def decorator(fn):
+            name = opts.pop('name', None) or self.gen_task_name(fn.__name__,
+                                                               fn.__module__)
+            task = self.task(*args, name=name, **opts)(fn)
+            return BatchTask(task, name, max_size=max_size, max_wait=max_wait)
+        return decorator
+
+    def flush_batch_tasks(self) -> None:
+        """
+        Send the buffered calls of all the batch tasks discovered by the
+        :class:`~flask_unchained.bundles.celery.hooks.DiscoverTasksHook`. Gets
+        called automatically when the process exits.
+        """
+        for batch_task in self.batch_tasks.values():
+            batch_task.flush()
 
-        def decode(s):
-            return pickle_loads(str_to_bytes(s), load=dill_load)
+    def push_persistent_app_context(self) -> flask.ctx.AppContext:
+        """
+        Push an app context that stays active for the lifetime of the current
+        thread (if one hasn't been pushed already), and return it. Used to run
+        tasks when ``CELERY_PERSISTENT_APP_CONTEXT`` is enabled.
+        """
+        ctx = getattr(self._local, 'app_ctx', None)
+        if ctx is None:
+            ctx = self.app.app_context()
+            ctx.push()
+            self._local.app_ctx = ctx
+        return ctx
 
-        registry.register(
-            name='dill',
-            encoder=encode,
-            decoder=decode,
-            content_type='application/x-python-serialize',
-            content_encoding='binary'
-        )
+    def _on_worker_init(self, **kwargs):
+        # with the prefork pool, tasks (and so their metrics) run in the child
+        # processes, but the main process answers the task_metrics command
+        sink = self.app.config.get('CELERY_TASK_METRICS_SINK')
+        if isinstance(sink, RegistryMetricsSink):
+            sink.collect_from_child_processes()
+
+    def _on_worker_process_init(self, **kwargs):
+        # forked worker processes must not share the parent's app context
+        self._local = threading.local()
+        if self.app.config.CELERY_PERSISTENT_APP_CONTEXT:
+            self.push_persistent_app_context()
+
+    def _on_task_postrun(self, **kwargs):
+        """
+        Reset the state of the persistent app context after each task, like
+        popping and pushing a new one would, but without running the
+        ``teardown_appcontext`` handlers.
+        """
+        ctx = getattr(self._local, 'app_ctx', None)
+        if ctx is None or flask._app_ctx_stack.top is not ctx:
+            return
+
+        sqlalchemy = self.app.extensions.get('sqlalchemy')
+        if sqlalchemy is not None:
+            sqlalchemy.db.session.remove()
+        ctx.g = self.app.app_ctx_globals_class()
+
+    def _on_before_task_publish(self, sender=None, body=None, headers=None,
+                                **kwargs):
+        """
+        Add the enqueue timestamp (and, if enabled, the serialized payload size)
+        to the message headers, so that the worker running the task can record
+        them as metrics.
+        """
+        if headers is None or self.app.config.get('CELERY_TASK_METRICS_SINK') is None:
+            return
+
+        headers['enqueued_at'] = time.time()
+        if not self.app.config.get('CELERY_TASK_METRICS_PAYLOAD_SIZE'):
+            return
+
+        task = self.tasks.get(sender)
+        serializer = getattr(task, 'serializer', None) or self.conf.task_serializer
+        try:
+            data = registry.dumps(body, serializer=serializer)[2]
+        except Exception:
+            pass
+        else:
+            headers['payload_size'] = len(data.encode('utf-8')
+                                          if isinstance(data, str) else data)
 
     # the same as upstream, but we need to copy it here so we can access it
     def __autoset(self, key, value):
         if value:
             self._preconf[key] = value
             self._preconf_set_by_auto.add(key)
+
+
+def _get_header(request, name):
+    # custom message headers are set as attributes of the request in workers, but
+    # eagerly applied tasks only have them in the headers dict
+    value = getattr(request, name, None)
+    if value is None:
+        value = (getattr(request, 'headers', None) or {}).get(name)
+    return value
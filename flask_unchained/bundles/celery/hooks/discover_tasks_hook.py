@@ -1,6 +1,8 @@
 from flask_unchained import AppFactoryHook, FlaskUnchained
 from typing import *
 
+from ..batch_task import BatchTask
+
 
 class DiscoverTasksHook(AppFactoryHook):
     """
@@ -10,11 +12,16 @@ class DiscoverTasksHook(AppFactoryHook):
     bundle_module_name = 'tasks'
     bundle_override_module_name_attr = 'celery_tasks_module_name'
     run_after = ['init_extensions']
+    limit_discovery_to_local_declarations = False
 
     def process_objects(self, app: FlaskUnchained, objects: Dict[str, Any]):
-        # don't need to do anything, just make sure the tasks modules get imported
-        # (which happens just by this hook running)
-        pass
+        # regular tasks get registered just by the tasks modules getting imported
+        # (which happens just by this hook running), but batch tasks need to be
+        # known by the extension so that their buffered calls can be flushed
+        self.unchained.extensions.celery.batch_tasks.update(objects)
+
+    def key_name(self, name: str, obj: Any) -> str:
+        return obj.name
 
     def type_check(self, obj: Any):
-        return False
+        return isinstance(obj, BatchTask)
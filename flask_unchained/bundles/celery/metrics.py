@@ -0,0 +1,182 @@
+import abc
+import logging
+import os
+import select
+import socket
+import threading
+
+from celery.worker.control import inspect_command
+from typing import *
+
+
+class MetricsSink(abc.ABC):
+    """
+    Base class for task metrics sinks. Set ``CELERY_TASK_METRICS_SINK`` to an
+    instance of a subclass to enable recording task metrics. The recorded metrics
+    are:
+
+    - ``queue_wait``: seconds between a task being enqueued and starting to run
+    - ``runtime``: seconds the task took to run
+    - ``payload_size``: size of the serialized task message body, in bytes
+      (only if ``CELERY_TASK_METRICS_PAYLOAD_SIZE`` is enabled)
+    """
+
+    @abc.abstractmethod
+    def record(self, task_name: str, metric: str, value: float) -> None:
+        pass
+
+
+class LogMetricsSink(MetricsSink):
+    """
+    Logs task metrics, one line per metric.
+    """
+
+    def __init__(self, logger: Union[str, logging.Logger] = 'celery.metrics',
+                 level: int = logging.INFO):
+        self.logger = (logging.getLogger(logger) if isinstance(logger, str)
+                       else logger)
+        self.level = level
+
+    def record(self, task_name: str, metric: str, value: float) -> None:
+        self.logger.log(self.level, 'task=%s metric=%s value=%s',
+                        task_name, metric, value)
+
+
+class StatsdMetricsSink(MetricsSink):
+    """
+    Sends task metrics to a StatsD server over UDP. Durations are sent as timers
+    (in milliseconds), and payload sizes as gauges.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8125,
+                 prefix: str = 'celery'):
+        self.address = (host, port)
+        self.prefix = prefix
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def record(self, task_name: str, metric: str, value: float) -> None:
+        if metric == 'payload_size':
+            line = f'{self.prefix}.{task_name}.{metric}:{value:g}|g'
+        else:
+            line = f'{self.prefix}.{task_name}.{metric}:{value * 1000:.3f}|ms'
+        try:
+            self._socket.sendto(line.encode('utf-8'), self.address)
+        except OSError:
+            pass
+
+
+class RegistryMetricsSink(MetricsSink):
+    """
+    Aggregates task metrics in-process (count, total, min and max per task and
+    metric), which ``flask celery stats`` collects from the running workers.
+
+    Tasks run in the pool's child processes with the (default) prefork pool,
+    while the main worker process is the one answering ``flask celery stats``.
+    So when a worker starts, it calls :meth:`collect_from_child_processes`, and
+    the child processes then send the metrics they record to it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._collector_pid = None
+        self._write_fd = None
+
+    def collect_from_child_processes(self) -> None:
+        """
+        Aggregate the metrics recorded by the processes forked after calling this
+        (eg the worker's pool processes) in the current process. They send them
+        through a pipe, which a background thread reads from.
+        """
+        if self._collector_pid == os.getpid():
+            return
+
+        read_fd, write_fd = os.pipe()
+        # never block the tasks: metrics are dropped if the pipe is ever full
+        os.set_blocking(write_fd, False)
+        self._collector_pid = os.getpid()
+        self._write_fd = write_fd
+        threading.Thread(target=self._collect, args=(read_fd,),
+                         name='task-metrics-collector', daemon=True).start()
+
+    def record(self, task_name: str, metric: str, value: float) -> None:
+        if self._write_fd is not None and os.getpid() != self._collector_pid:
+            self._send(task_name, metric, value)
+        else:
+            self._add(task_name, metric, value)
+
+    def _send(self, task_name, metric, value):
+        # writes of up to PIPE_BUF bytes are atomic, so the child processes can
+        # share the pipe without a lock
+        line = f'{task_name}\t{metric}\t{value!r}\n'.encode('utf-8')
+        if len(line) > select.PIPE_BUF:
+            return
+        try:
+            os.write(self._write_fd, line)
+        except OSError:
+            pass
+
+    def _collect(self, read_fd):
+        with os.fdopen(read_fd, 'rb') as f:
+            for line in f:
+                task_name, metric, value = line.decode('utf-8')[:-1].rsplit('\t', 2)
+                self._add(task_name, metric, float(value))
+
+    def _add(self, task_name, metric, value):
+        with self._lock:
+            stats = self._metrics.get((task_name, metric))
+            if stats is None:
+                self._metrics[(task_name, metric)] = [1, value, value, value]
+            else:
+                stats[0] += 1
+                stats[1] += value
+                stats[2] = min(stats[2], value)
+                stats[3] = max(stats[3], value)
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        Returns the aggregated metrics, as a dictionary of task names to
+        dictionaries of metric names to their stats.
+        """
+        rv = {}
+        with self._lock:
+            for (task_name, metric), (count, total, min_, max_) in self._metrics.items():
+                rv.setdefault(task_name, {})[metric] = dict(
+                    count=count, total=total, min=min_, max=max_)
+        return rv
+
+    def clear(self) -> None:
+        with self._lock:
+            self._metrics.clear()
+
+
+def merge_snapshots(snapshots: Iterable[Dict[str, Dict[str, Dict[str, float]]]],
+                    ) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Merge metrics snapshots (eg from multiple workers).
+    """
+    rv = {}
+    for snapshot in snapshots:
+        for task_name, metrics in snapshot.items():
+            for metric, stats in metrics.items():
+                merged = rv.setdefault(task_name, {}).get(metric)
+                if merged is None:
+                    rv[task_name][metric] = dict(stats)
+                    continue
+
+                merged['count'] += stats['count']
+                merged['total'] += stats['total']
+                merged['min'] = min(merged['min'], stats['min'])
+                merged['max'] = max(merged['max'], stats['max'])
+    return rv
+
+
+@inspect_command()
+def task_metrics(state):
+    """Aggregated task metrics (requires a RegistryMetricsSink)."""
+    from .extensions import celery
+
+    sink = celery.app.config.get('CELERY_TASK_METRICS_SINK')
+    if isinstance(sink, RegistryMetricsSink):
+        return sink.snapshot()
+    return {}
@@ -0,0 +1,239 @@
+import base64
+import datetime as dt
+import json
+import timeit
+import uuid
+
+from decimal import Decimal
+from dill import dumps as dill_dumps, load as dill_load
+from flask_mail import Attachment, Message
+from kombu.serialization import pickle_loads, pickle_protocol, registry
+from kombu.utils.encoding import str_to_bytes
+from speaklater import make_lazy_string
+from typing import *
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    from sqlalchemy import inspect as sa_inspect
+except ImportError:
+    sa_inspect = None
+
+
+# the type of lazy strings (eg from lazy_gettext), which speaklater doesn't export
+_LazyString = type(make_lazy_string(str, ''))
+
+# encoded values are dicts with this (namespaced) key as their only key, so that
+# they can't be mistaken for dicts in the task arguments
+TAG_KEY = '__flask_unchained.tagged__'
+
+_encoders = []  # (type, tag, encode) tuples, checked in order
+_decoders = {}  # tag -> decode
+
+
+def register_type(type_: type,
+                  tag: str,
+                  encode: Callable[[Any], Any],
+                  decode: Callable[[Any], Any],
+                  ) -> None:
+    """
+    Register a type with the tagged serializers, so that task arguments of that
+    type can be serialized by them.
+
+    :param type_: The type to register (subclasses are encoded the same way).
+    :param tag: A unique name to tag the encoded values with.
+    :param encode: A function to convert instances of the type to a value the
+                   serializers can encode (the value may use other registered types).
+    :param decode: A function to convert the encoded value back to an instance.
+    """
+    _encoders[:] = [(t, tg, enc) for t, tg, enc in _encoders if tg != tag]
+    _encoders.append((type_, tag, encode))
+    _decoders[tag] = decode
+
+
+def register_serializers() -> None:
+    """
+    Register the ``dill``, ``tagged-json`` and (if msgpack is installed)
+    ``tagged-msgpack`` serializers with kombu.
+    """
+    registry.register(
+        name='dill',
+        encoder=_dill_dumps,
+        decoder=_dill_loads,
+        content_type='application/x-python-serialize',
+        content_encoding='binary'
+    )
+
+    registry.register(
+        name='tagged-json',
+        encoder=tagged_json_dumps,
+        decoder=tagged_json_loads,
+        content_type='application/x-tagged-json',
+        content_encoding='utf-8'
+    )
+
+    if msgpack is not None:
+        registry.register(
+            name='tagged-msgpack',
+            encoder=tagged_msgpack_dumps,
+            decoder=tagged_msgpack_loads,
+            content_type='application/x-tagged-msgpack',
+            content_encoding='binary'
+        )
+
+
+def tagged_json_dumps(obj: Any) -> str:
+    return json.dumps(obj, default=_encode, separators=(',', ':'))
+
+
+def tagged_json_loads(s: Union[str, bytes]) -> Any:
+    if isinstance(s, bytes):
+        s = s.decode('utf-8')
+    return json.loads(s, object_hook=_decode)
+
+
+def tagged_msgpack_dumps(obj: Any) -> bytes:
+    return msgpack.packb(obj, default=_encode, use_bin_type=True)
+
+
+def tagged_msgpack_loads(s: bytes) -> Any:
+    return msgpack.unpackb(str_to_bytes(s), object_hook=_decode, raw=False)
+
+
+def benchmark(payload: Any,
+              serializers: Optional[Iterable[str]] = None,
+              number: int = 1000,
+              ) -> List[Tuple[str, int, float, float]]:
+    """
+    Benchmark the given serializers with a task payload.
+
+    :param payload: The (args, kwargs) payload to serialize.
+    :param serializers: The names of the serializers to benchmark. Defaults to all
+                        of the ones registered by :func:`register_serializers`,
+                        plus ``pickle``.
+    :param number: How many times to encode and decode the payload.
+    :return: A list of ``(serializer name, payload size in bytes,
+             microseconds per encode, microseconds per decode)`` tuples.
+    """
+    if serializers is None:
+        serializers = ['pickle', 'dill', 'tagged-json']
+        if msgpack is not None:
+            serializers.append('tagged-msgpack')
+
+    results = []
+    for name in serializers:
+        content_type, content_encoding, data = registry.dumps(payload, serializer=name)
+        size = len(data.encode('utf-8') if isinstance(data, str) else data)
+        encode_time = timeit.timeit(
+            lambda: registry.dumps(payload, serializer=name), number=number)
+        decode_time = timeit.timeit(
+            lambda: registry.loads(data, content_type, content_encoding,
+                                   accept=[content_type]), number=number)
+        results.append((name, size,
+                        encode_time / number * 1e6,
+                        decode_time / number * 1e6))
+    return results
+
+
+def _dill_dumps(obj, dumper=dill_dumps):
+    return dumper(obj, protocol=pickle_protocol)
+
+
+def _dill_loads(s):
+    return pickle_loads(str_to_bytes(s), load=dill_load)
+
+
+def _encode(obj):
+    for type_, tag, encode in _encoders:
+        if isinstance(obj, type_):
+            return {TAG_KEY: [tag, encode(obj)]}
+
+    state = sa_inspect and sa_inspect(obj, raiseerr=False)
+    if state is not None and getattr(state, 'mapper', None) is not None:
+        if state.identity is None:
+            raise TypeError(f'Cannot serialize {obj!r}: it has not been persisted')
+        return {TAG_KEY: ['model', [state.mapper.class_.__name__,
+                                    list(state.identity)]]}
+
+    raise TypeError(f'Object of type {type(obj).__name__} is not serializable')
+
+
+def _decode(d):
+    if len(d) != 1 or TAG_KEY not in d:
+        return d
+    tag, value = d[TAG_KEY]
+    return _decoders[tag](value)
+
+
+class _ModelReference(NamedTuple):
+    model_name: str
+    identity: List[Any]
+
+
+def _resolve_model_references(obj):
+    """
+    Load the model instances referenced by decoded task arguments. Models are
+    not loaded while decoding messages, but by the task (in its app context).
+    """
+    if isinstance(obj, _ModelReference):
+        from flask_unchained import unchained
+        model = unchained.sqlalchemy_bundle.models[obj.model_name]
+        return model.query.get(obj.identity[0] if len(obj.identity) == 1
+                               else obj.identity)
+    elif isinstance(obj, (list, tuple)):
+        items = [_resolve_model_references(x) for x in obj]
+        if any(x is not y for x, y in zip(items, obj)):
+            return type(obj)(items)
+    elif isinstance(obj, dict):
+        items = {k: _resolve_model_references(v) for k, v in obj.items()}
+        if any(v is not obj[k] for k, v in items.items()):
+            return items
+
+    # containers without references are returned as-is, so that arguments of
+    # tasks that are called directly keep their identity
+    return obj
+
+
+def _encode_datetime(d):
+    offset = d.utcoffset()
+    return [d.year, d.month, d.day, d.hour, d.minute, d.second, d.microsecond,
+            None if offset is None else offset.total_seconds()]
+
+
+def _decode_datetime(values):
+    *values, offset = values
+    tz = None if offset is None else dt.timezone(dt.timedelta(seconds=offset))
+    return dt.datetime(*values, tzinfo=tz)
+
+
+def _encode_object(obj):
+    return vars(obj)
+
+
+def _decode_object(cls):
+    def decode(values):
+        obj = cls.__new__(cls)
+        obj.__dict__.update(values)
+        return obj
+    return decode
+
+
+register_type(bytes, 'bytes',
+              lambda b: base64.b64encode(b).decode('ascii'),
+              lambda s: base64.b64decode(s))
+register_type(set, 'set', list, set)
+register_type(frozenset, 'frozenset', list, frozenset)
+register_type(dt.datetime, 'datetime', _encode_datetime, _decode_datetime)
+register_type(dt.date, 'date', dt.date.toordinal, dt.date.fromordinal)
+register_type(dt.timedelta, 'timedelta',
+              lambda td: [td.days, td.seconds, td.microseconds],
+              lambda v: dt.timedelta(*v))
+register_type(Decimal, 'decimal', str, Decimal)
+register_type(uuid.UUID, 'uuid', str, uuid.UUID)
+register_type(_LazyString, 'lazy_string', str, str)
+register_type(Attachment, 'mail_attachment', _encode_object, _decode_object(Attachment))
+register_type(Message, 'mail_message', _encode_object, _decode_object(Message))
+_decoders['model'] = lambda value: _ModelReference(*value)
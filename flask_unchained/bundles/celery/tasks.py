@@ -1,4 +1,5 @@
 from flask import current_app
+from smtplib import SMTPException
 
 from .extensions import celery
 from ..mail.extensions import mail
@@ -6,18 +7,56 @@ from ..mail.utils import make_message
 
 
 def _send_mail_async(subject_or_message=None, to=None, template=None, **kwargs):
+    """
+    Send an email asynchronously, batched with other emails sent from this
+    process (within one second) by :func:`async_bulk_mail_task`.
+
+    :return: A :class:`~concurrent.futures.Future` that resolves to the
+             :class:`~celery.result.AsyncResult` of the batch the email gets
+             sent with (instead of the result of one task per email).
+    """
     subject_or_message = subject_or_message or kwargs.pop('subject')
-    if current_app and current_app.testing:
-        return async_mail_task.apply([subject_or_message, to, template], kwargs)
-    return async_mail_task.delay(subject_or_message, to, template, **kwargs)
+    to = to or kwargs.pop('recipients', [])
+
+    # render the message here, so that only the message itself (and not arbitrary
+    # template context objects) needs to be serialized for the task
+    msg = make_message(subject_or_message, to, template, **kwargs)
+    return async_bulk_mail_task.delay(msg)
 
 
-@celery.task(serializer='dill')
+@celery.task(serializer='tagged-json', autoretry_for=(SMTPException, OSError),
+             retry_backoff=True, retry_kwargs={'max_retries': 5})
 def async_mail_task(subject_or_message, to=None, template=None, **kwargs):
     """
-    Celery task to send emails asynchronously using the mail bundle.
+    Celery task to send emails asynchronously using the mail bundle. Sending is
+    retried (with exponential backoff) if the mail server can't be reached.
     """
     to = to or kwargs.pop('recipients', [])
     msg = make_message(subject_or_message, to, template, **kwargs)
     with mail.connect() as connection:
         connection.send(msg)
+
+
+@celery.batch_task(serializer='tagged-json', max_size=100, max_wait=1.0,
+                   autoretry_for=(SMTPException, OSError), retry_backoff=True,
+                   retry_kwargs={'max_retries': 5})
+def async_bulk_mail_task(calls):
+    """
+    Celery batch task to send many emails asynchronously over one connection to
+    the mail server. Messages that fail to send because of mail server errors
+    are retried individually by :func:`async_mail_task`. Any other failures get
+    logged, and make the task fail (after the other messages have been sent).
+    """
+    failures = mail.send_bulk(args[0] for args, kwargs in calls)
+    errors = 0
+    for msg, e in failures:
+        if isinstance(e, (SMTPException, OSError)):
+            async_mail_task.delay(msg)
+            continue
+
+        errors += 1
+        current_app.logger.error(f'Failed to send email {msg.subject!r} to '
+                                 f'{msg.recipients}', exc_info=e)
+
+    if errors:
+        raise RuntimeError(f'Failed to send {errors} of {len(calls)} emails')
@@ -71,6 +71,20 @@ class Config(BundleConfig):
     useful for testing.
     """
 
+    MAIL_POOL_SIZE = int(os.getenv('FLASK_MAIL_POOL_SIZE', 0))
+    """
+    The maximum number of idle connections to the mail server to keep open (per
+    process) for reuse. Defaults to 0, meaning a new connection gets opened (and
+    closed) every time emails are sent.
+    """
+
+    MAIL_POOL_NOOP_INTERVAL = 15
+    """
+    The number of seconds a pooled connection can be idle for before it gets
+    checked with a ``NOOP`` command (and replaced if it's no longer alive) when
+    reusing it.
+    """
+
     MAIL_ASCII_ATTACHMENTS = os.getenv('FLASK_MAIL_ASCII_ATTACHMENTS', False)
     """
     Whether or not to coerce attachment filenames to ASCII.
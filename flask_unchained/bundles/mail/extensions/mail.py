@@ -1,6 +1,14 @@
-from flask_mail import _MailMixin, Message
+import os
+import smtplib
+import threading
+import time
+
+from flask import before_render_template, current_app, template_rendered
+from flask_mail import (_MailMixin, BadHeaderError, Connection, Message,
+                        email_dispatched, sanitize_address, sanitize_addresses)
 from flask_unchained import FlaskUnchained
 from flask_unchained.utils import ConfigProperty, ConfigPropertyMetaclass
+from itertools import islice
 from types import FunctionType
 from typing import *
 
@@ -24,8 +32,16 @@ class Mail(_MailMixin, metaclass=ConfigPropertyMetaclass):
     suppress: bool = ConfigProperty('MAIL_SUPPRESS_SEND')
     ascii_attachments: bool = ConfigProperty()
 
+    pool_size: int = ConfigProperty()
+    pool_noop_interval: int = ConfigProperty()
+
     send: FunctionType = ConfigProperty('MAIL_SEND_FN')
 
+    def __init__(self):
+        self._pool = {}
+        self._pool_lock = threading.Lock()
+        self._pool_pid = None
+
     def send_message(self,
                      subject_or_message: Optional[Union[Message, str]] = None,
                      to: Optional[Union[str, List[str]]] = None,
@@ -42,5 +58,256 @@ class Mail(_MailMixin, metaclass=ConfigPropertyMetaclass):
         to = to or kwargs.pop('recipients', [])
         return self.send(subject_or_message, to, **kwargs)
 
+    def send_bulk(self,
+                  messages: Iterable[Message],
+                  batch_size: Optional[int] = None,
+                  ) -> List[Tuple[Message, Exception]]:
+        """
+        Send many messages, reusing one connection to the mail server for each
+        batch of messages (the connection still reconnects after every
+        ``MAIL_MAX_EMAILS`` messages, if that's set). Messages are consumed from
+        the iterable lazily, one batch at a time.
+
+        :param messages: The :class:`~flask_mail.Message` instances to send.
+        :param batch_size: The maximum number of messages to send per connection.
+                           Defaults to sending all of them over one connection.
+        :return: A list of ``(message, exception)`` tuples for the messages that
+                 failed to send.
+        """
+        failures = []
+        messages = iter(messages)
+        while True:
+            batch = list(islice(messages, batch_size))
+            if not batch:
+                return failures
+
+            with self.connect() as connection:
+                for msg in batch:
+                    try:
+                        connection.send(msg)
+                    except Exception as e:
+                        failures.append((msg, e))
+
+    def render_many(self,
+                    template: str,
+                    contexts: Iterable[Dict[str, Any]],
+                    ) -> Iterator[str]:
+        """
+        Render a template once per context. The template gets loaded (and the
+        template context processors get run) only once, and the contexts are
+        rendered lazily, one at a time, as the returned generator gets consumed.
+
+        :param template: The name of the template to render.
+        :param contexts: The template contexts to render the template with.
+        :return: A generator of the rendered templates.
+        """
+        render = self._get_renderer(template)
+        for ctx in contexts:
+            yield render(ctx)
+
+    def send_templated_bulk(self,
+                            subject: str,
+                            template: str,
+                            contexts: Iterable[Dict[str, Any]],
+                            batch_size: Optional[int] = None,
+                            ) -> List[Tuple[Message, Exception]]:
+        """
+        Send one message per context, rendering the template for each of them.
+        Messages are rendered lazily and sent using :meth:`send_bulk`, so at most
+        one batch of messages is kept in memory at a time.
+
+        :param subject: The default subject of the messages.
+        :param template: The name of the (HTML) template to render. If a plain text
+                         variant of it exists (eg ``foo.txt`` for ``foo.html``),
+                         it gets rendered for the message bodies.
+        :param contexts: The template contexts. Each must include the recipient(s)
+                         of its message as ``to``, and may also include extra
+                         kwargs for :class:`~flask_mail.Message` (eg ``subject``).
+        :param batch_size: The maximum number of messages to send per connection.
+        :return: A list of ``(message, exception)`` tuples for the messages that
+                 failed to render or send. The message is ``None`` if the error
+                 happened before it could be created (eg if ``to`` is missing).
+        """
+        from ..utils import _get_text_template_name, html_to_text, message_kwargs
+
+        render_html = self._get_renderer(template)
+        text_template = _get_text_template_name(current_app.jinja_env, template)
+        render_text = text_template and self._get_renderer(text_template)
+
+        failures = []
+
+        def make_messages():
+            for ctx in contexts:
+                msg = None
+                try:
+                    kwargs = {k: ctx[k] for k in message_kwargs & set(ctx)}
+                    kwargs.setdefault('subject', subject)
+                    to = ctx['to']
+                    kwargs['recipients'] = [to] if isinstance(to, str) else list(to)
+
+                    msg = Message(**kwargs)
+                    msg.html = msg.html or render_html(ctx)
+                    msg.body = msg.body or (render_text(ctx) if render_text
+                                            else html_to_text(msg.html))
+                except Exception as e:
+                    failures.append((msg, e))
+                else:
+                    yield msg
+
+        failures.extend(self.send_bulk(make_messages(), batch_size=batch_size))
+        return failures
+
+    def connect(self):
+        """
+        Get a connection to the mail server. If ``MAIL_POOL_SIZE`` is set, the
+        underlying SMTP connection gets returned to the pool when the connection's
+        context manager exits, so that it can be reused by later calls.
+        """
+        return PooledConnection(self)
+
+    def close_connections(self) -> None:
+        """
+        Close all of the idle pooled connections.
+        """
+        with self._pool_lock:
+            pool, self._pool = self._pool, {}
+
+        for idle in pool.values():
+            for host, last_used in idle:
+                _quit(host)
+
     def init_app(self, app: FlaskUnchained):
         app.extensions['mail'] = self
+
+    def _get_renderer(self, template: str) -> Callable[[Dict[str, Any]], str]:
+        """
+        Returns a function to render the given template with a template context,
+        the same way :func:`flask.render_template` does.
+        """
+        app = current_app._get_current_object()
+        tmpl = app.jinja_env.get_or_select_template(template)
+        base_ctx = {}
+        app.update_template_context(base_ctx)
+
+        def render(ctx: Dict[str, Any]) -> str:
+            context = dict(base_ctx, **ctx)
+            before_render_template.send(app, template=tmpl, context=context)
+            rv = tmpl.render(context)
+            template_rendered.send(app, template=tmpl, context=context)
+            return rv
+
+        return render
+
+    def _checkout_host(self) -> smtplib.SMTP:
+        """
+        Get an idle SMTP connection from the pool, making sure it's still alive if
+        it has been idle for longer than ``MAIL_POOL_NOOP_INTERVAL``, or otherwise
+        open a new one.
+        """
+        key = self._get_pool_key()
+        while True:
+            with self._pool_lock:
+                self._check_pool_pid()
+                idle = self._pool.get(key)
+                if not idle:
+                    break
+                host, last_used = idle.pop()
+
+            if (time.monotonic() - last_used < self.pool_noop_interval
+                    or _is_alive(host)):
+                return host
+            _quit(host)
+
+        return Connection(self).configure_host()
+
+    def _checkin_host(self, host: smtplib.SMTP, discard: bool = False) -> None:
+        """
+        Return an SMTP connection to the pool, or close it if the pool is full (or
+        disabled), or if the connection should be discarded.
+        """
+        if not discard and self.pool_size and getattr(host, 'sock', None):
+            key = self._get_pool_key()
+            with self._pool_lock:
+                self._check_pool_pid()
+                idle = self._pool.setdefault(key, [])
+                if len(idle) < self.pool_size:
+                    idle.append((host, time.monotonic()))
+                    return
+        _quit(host)
+
+    def _check_pool_pid(self) -> None:
+        # connections cannot be shared with forked child processes
+        if self._pool_pid != os.getpid():
+            self._pool = {}
+            self._pool_pid = os.getpid()
+
+    def _get_pool_key(self) -> tuple:
+        return (self.server, self.port, self.username, self.use_ssl, self.use_tls)
+
+
+class PooledConnection(Connection):
+    """
+    A :class:`flask_mail.Connection` that reuses pooled SMTP connections, and
+    reconnects (once) if the server disconnected before a message got sent. The
+    number of messages sent is counted per SMTP connection, so that pooled
+    connections still reconnect after every ``MAIL_MAX_EMAILS`` messages.
+    """
+
+    def __enter__(self):
+        self.host = None if self.mail.suppress else self.mail._checkout_host()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if self.host:
+            self.mail._checkin_host(self.host, discard=exc_type is not None)
+            self.host = None
+
+    def send(self, message, envelope_from=None):
+        # the same as upstream, except for the reconnecting
+        assert message.send_to, 'No recipients have been added'
+        assert message.sender, ('The message does not specify a sender and a '
+                                'default sender has not been configured')
+        if message.has_bad_headers():
+            raise BadHeaderError
+        if message.date is None:
+            message.date = time.time()
+
+        rv = None
+        if self.host:
+            rv = self._sendmail(message, envelope_from)
+        email_dispatched.send(message, app=current_app._get_current_object())
+
+        if self.host:
+            self.host.num_emails = getattr(self.host, 'num_emails', 0) + 1
+            if self.host.num_emails == self.mail.max_emails:
+                _quit(self.host)
+                self.host = self.configure_host()
+        return rv
+
+    def _sendmail(self, message, envelope_from):
+        args = (sanitize_address(envelope_from or message.sender),
+                list(sanitize_addresses(message.send_to)),
+                message.as_bytes(),
+                message.mail_options,
+                message.rcpt_options)
+        try:
+            return self.host.sendmail(*args)
+        except smtplib.SMTPServerDisconnected:
+            # eg an idle pooled connection that timed out on the server
+            _quit(self.host)
+            self.host = self.configure_host()
+            return self.host.sendmail(*args)
+
+
+def _is_alive(host: smtplib.SMTP) -> bool:
+    try:
+        return host.noop()[0] == 250
+    except (smtplib.SMTPException, OSError):
+        return False
+
+
+def _quit(host: smtplib.SMTP) -> None:
+    try:
+        host.quit()
+    except (smtplib.SMTPException, OSError):
+        host.close()
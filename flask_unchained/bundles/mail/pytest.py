@@ -1,8 +1,76 @@
+import asyncore
+import email
 import pytest
+import smtpd
+import threading
 
 from .extensions import mail
 
 
+class FakeSMTPServer(smtpd.SMTPServer):
+    """
+    A local SMTP server (running in a background thread) that records the
+    messages it receives, instead of delivering them.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        self._map = {}
+        self._running = False
+        self._thread = None
+        self._disconnect = threading.Event()
+        self._disconnected = threading.Event()
+        self.connections = 0
+        self.messages = []
+        super().__init__((host, port), None, map=self._map)
+
+    @property
+    def host(self):
+        return self.socket.getsockname()[0]
+
+    @property
+    def port(self):
+        return self.socket.getsockname()[1]
+
+    def handle_accepted(self, conn, addr):
+        self.connections += 1
+        super().handle_accepted(conn, addr)
+
+    def process_message(self, peer, mailfrom, rcpttos, data, **kwargs):
+        msg = email.message_from_bytes(data)
+        msg.envelope_sender = mailfrom
+        msg.envelope_recipients = rcpttos
+        self.messages.append(msg)
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._thread.join()
+        for channel in list(self._map.values()):
+            channel.close()
+
+    def disconnect_clients(self):
+        """
+        Close the connections of all currently connected clients.
+        """
+        self._disconnected.clear()
+        self._disconnect.set()
+        self._disconnected.wait()
+
+    def _serve(self):
+        while self._running:
+            asyncore.loop(timeout=0.05, count=1, map=self._map)
+            if self._disconnect.is_set():
+                for channel in list(self._map.values()):
+                    if channel is not self:
+                        channel.close()
+                self._disconnect.clear()
+                self._disconnected.set()
+
+
 @pytest.fixture()
 def outbox():
     """
@@ -16,3 +84,31 @@ def outbox():
     """
     with mail.record_messages() as messages:
         yield messages
+
+
+@pytest.fixture()
+def smtp_server(app):
+    """
+    Fixture to actually send the messages of the mail extension over SMTP, to a
+    local fake SMTP server that records the messages it receives.
+    Example Usage::
+
+        def test_some_view(client, smtp_server):
+            r = client.get('some.endpoint.that.sends.mail')
+            assert len(smtp_server.messages) == 1
+            assert smtp_server.messages[0]['Subject'] == "You've got mail!"
+    """
+    server = FakeSMTPServer()
+    server.start()
+
+    config = {k: app.config.get(k) for k in ['MAIL_SERVER', 'MAIL_PORT',
+                                            'MAIL_USE_TLS', 'MAIL_USE_SSL',
+                                            'MAIL_USERNAME', 'MAIL_SUPPRESS_SEND']}
+    app.config.update(MAIL_SERVER=server.host, MAIL_PORT=server.port,
+                      MAIL_USE_TLS=False, MAIL_USE_SSL=False,
+                      MAIL_USERNAME=None, MAIL_SUPPRESS_SEND=False)
+    try:
+        yield server
+    finally:
+        app.config.update(config)
+        server.stop()
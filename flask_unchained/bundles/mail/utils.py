@@ -1,23 +1,11 @@
 import inspect
 import re
 
-try:
-    from bs4 import BeautifulSoup
-except ImportError:
-    BeautifulSoup = None
-    from warnings import warn
-    warn('BeautifulSoup4 is not installed. Will not automatically '
-         'convert html email messages to plain text.')
-
-try:
-    import lxml
-except ImportError:
-    from warnings import warn
-    warn('lxml is not installed. Will not automatically '
-         'convert html email messages to plain text.')
-
-from flask import render_template
+from flask import current_app, render_template
 from flask_mail import Message
+from functools import lru_cache
+from html.parser import HTMLParser
+from jinja2 import Environment, TemplateNotFound
 from typing import *
 
 from .extensions import mail
@@ -28,6 +16,59 @@ message_kwargs = {name for name, param in message_sig.parameters.items()
                       or param.kind == param.KEYWORD_ONLY)}
 
 
+class _HTMLToTextParser(HTMLParser):
+    """
+    Collects the text content of an HTML document, starting new lines for block
+    level elements and skipping the contents of non-visible elements.
+    """
+
+    BLOCK_TAGS = {'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div',
+                  'dl', 'dt', 'fieldset', 'figcaption', 'figure', 'footer', 'form',
+                  'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'main',
+                  'nav', 'ol', 'p', 'pre', 'section', 'table', 'td', 'th', 'tr',
+                  'ul'}
+    SKIP_TAGS = {'head', 'script', 'style', 'template', 'title'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in self.BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+
+def html_to_text(html: str) -> str:
+    """
+    Converts HTML to plain text, using the standard library's HTML parser.
+
+    :param html: The HTML to convert.
+    :return: The plain text.
+    """
+    parser = _HTMLToTextParser()
+    parser.feed(html)
+    parser.close()
+    plain_text = '\n'.join(line.strip() for line in ''.join(parser.parts).splitlines())
+    return re.sub(r'\n\n+', '\n\n', plain_text).strip()
+
+
 def get_message_plain_text(msg: Message):
     """
     Converts an HTML message to plain text.
@@ -38,12 +79,10 @@ def get_message_plain_text(msg: Message):
     if msg.body:
         return msg.body
 
-    if BeautifulSoup is None or not msg.html:
+    if not msg.html:
         return msg.html
 
-    plain_text = '\n'.join(line.strip() for line in
-                           BeautifulSoup(msg.html, 'lxml').text.splitlines())
-    return re.sub(r'\n\n+', '\n\n', plain_text).strip()
+    return html_to_text(msg.html)
 
 
 def make_message(subject_or_message: Union[str, Message],
@@ -56,7 +95,9 @@ def make_message(subject_or_message: Union[str, Message],
     :param subject_or_message: A subject string, or for backwards compatibility with
                                stock Flask-Mail, a :class:`~flask_mail.Message` instance
     :param to: An email address, or a list of email addresses
-    :param template: Which template to render.
+    :param template: Which template to render. If a plain text variant of it
+                     exists (eg ``foo.txt`` for ``foo.html``), it gets rendered
+                     for the message body, instead of converting the HTML.
     :param kwargs: Extra kwargs to pass on to :class:`~flask_mail.Message`
     :return: The created :class:`~flask_mail.Message`
     """
@@ -73,7 +114,12 @@ def make_message(subject_or_message: Union[str, Message],
     if not msg.html and template:
         msg.html = render_template(template, **kwargs)
     if not msg.body:
-        msg.body = get_message_plain_text(msg)
+        text_template = template and _get_text_template_name(
+            current_app.jinja_env, template)
+        if text_template:
+            msg.body = render_template(text_template, **kwargs)
+        else:
+            msg.body = get_message_plain_text(msg)
     return msg
 
 
@@ -95,3 +141,26 @@ def _send_mail(subject_or_message: Optional[Union[str, Message]] = None,
     msg = make_message(subject_or_message, to, template, **kwargs)
     with mail.connect() as connection:
         connection.send(msg)
+
+
+@lru_cache()
+def _find_text_template_name(jinja_env: Environment, template: str):
+    name = re.sub(r'\.html?$', '.txt', template)
+    if name == template:
+        return None
+
+    try:
+        jinja_env.get_template(name)
+    except TemplateNotFound:
+        return None
+    return name
+
+
+def _get_text_template_name(jinja_env: Environment, template: str):
+    """
+    Returns the name of the plain text variant of an HTML template, if it exists.
+    Lookups are cached, unless templates get auto-reloaded.
+    """
+    if jinja_env.auto_reload:
+        return _find_text_template_name.__wrapped__(jinja_env, template)
+    return _find_text_template_name(jinja_env, template)
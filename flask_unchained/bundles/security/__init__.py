@@ -2,7 +2,7 @@ from flask_unchained import Bundle
 
 from .decorators import anonymous_user_required, auth_required, auth_required_same_user
 from .exceptions import SecurityException, AuthenticationError
-from .models import AnonymousUser, User, Role, UserRole
+from .models import AnonymousUser, TokenUser, User, UserSnapshot, Role, UserRole
 from .services import SecurityService, SecurityUtilsService, UserManager, RoleManager
 from .utils import current_user
 from .views import SecurityController, UserResource
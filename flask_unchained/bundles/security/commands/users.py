@@ -1,13 +1,28 @@
+import csv
+import json
+import re
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
 from flask_unchained import unchained
 from flask_unchained.cli import cli, click
 from flask_unchained.commands.utils import print_table
+from itertools import islice
+from sqlalchemy_unchained import ValidationError
 
 from .utils import _query_to_role, _query_to_user
 from ..extensions import Security
-from ..services import SecurityService, UserManager
+from ..services import (RoleManager, SecurityService, SecurityUtilsService,
+                        UserManager)
+from ..validators import EmailValidator
 
 security: Security = unchained.get_local_proxy('security')
 security_service: SecurityService = unchained.get_local_proxy('security_service')
+security_utils_service: SecurityUtilsService = \
+    unchained.get_local_proxy('security_utils_service')
+role_manager: RoleManager = unchained.get_local_proxy('role_manager')
 user_manager: UserManager = unchained.get_local_proxy('user_manager')
 
 
@@ -68,6 +83,70 @@ def create_user(email, password, active, confirmed_at, send_email):
         click.echo('Cancelled.')
 
 
+@users.command('import')
+@click.argument('file', type=click.Path(exists=True, dir_okay=False))
+@click.option('--batch-size', default=1000, show_default=True,
+              help='How many users to insert per batch.')
+@click.option('--processes', type=int, default=None,
+              help='How many processes to hash passwords in. '
+                   '[default: the number of CPUs]')
+@click.option('--send-email/--no-email', default=False, show_default=True,
+              help='Whether or not to send the users email confirmation instructions.')
+def import_users(file, batch_size, processes, send_email):
+    """
+    Import users from a CSV or JSON Lines file.
+
+    Each row must have an ``email``, and may have a ``password``, ``active``,
+    ``confirmed_at`` (a timestamp, or "now"), ``roles`` (a list of role names,
+    comma-separated in CSV files), and values for any other columns of the user
+    model.
+    """
+    if send_email and not security.confirmable:
+        raise click.UsageError('Sending email confirmation instructions requires '
+                               'SECURITY_CONFIRMABLE to be enabled.')
+
+    role_ids = {role.name: role.id for role in role_manager.all()}
+    seen_emails = set()
+    count, errors = 0, []
+    start = time.time()
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        rows = _read_users_file(file)
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+
+            existing_emails = _get_existing_emails(row for line, row in batch)
+            users, user_roles = [], []
+            for line, row in batch:
+                try:
+                    user, roles = _row_to_user(row, role_ids, seen_emails,
+                                               existing_emails)
+                except (ValidationError, ValueError) as e:
+                    errors.append((line, str(e)))
+                else:
+                    users.append(user)
+                    user_roles.append(roles)
+
+            user_ids = _insert_users(users, user_roles, executor)
+            if send_email:
+                for user in user_manager.filter(
+                        user_manager.Meta.model.id.in_(user_ids)):
+                    security_service.send_email_confirmation_instructions(user)
+
+            count += len(users)
+            elapsed = time.time() - start
+            click.echo(f'Imported {count} users ({count / elapsed:.0f} users/sec)')
+
+    click.echo(f'Successfully imported {count} users in {time.time() - start:.1f}s')
+    if errors:
+        click.secho(f'Failed to import {len(errors)} rows:', fg='red')
+        for line, error in errors:
+            click.secho(f'  line {line}: {error}', fg='red')
+        sys.exit(1)
+
+
 @users.command('delete')
 @click.argument('query', nargs=1, help='The query to search for a user by. For example, '
                                        '`id=5`, `email=a@a.com` or '
@@ -197,3 +276,131 @@ def remove_role_from_user(user, role):
         click.echo(f'Successfully removed {role!r} from {user!r}')
     else:
         click.echo('Cancelled.')
+
+
+def _read_users_file(path):
+    """
+    Yields tuples of line numbers and row dictionaries.
+    """
+    with open(path, newline='') as f:
+        if path.endswith('.csv'):
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, {k: v for k, v in row.items() if v != ''}
+        elif path.endswith(('.jsonl', '.ndjson')):
+            for line_num, line in enumerate(f, start=1):
+                if line.strip():
+                    try:
+                        yield line_num, json.loads(line)
+                    except ValueError as e:
+                        yield line_num, e
+        else:
+            raise click.BadParameter('Only .csv and .jsonl files are supported.',
+                                     param_hint='FILE')
+
+
+def _get_existing_emails(rows):
+    emails = [row['email'] for row in rows
+              if isinstance(row, dict) and row.get('email')]
+    User = user_manager.Meta.model
+    return {email for email, in user_manager.session.query(User.email).filter(
+        User.email.in_(emails))}
+
+
+_TIMESTAMP_FORMATS = ['%Y-%m-%d'] + [
+    f'%Y-%m-%d{sep}%H:%M{seconds}{tz}'
+    for sep in ('T', ' ')
+    for seconds in (':%S.%f', ':%S', '')
+    for tz in ('%z', '')
+]
+
+
+def _parse_timestamp(value):
+    # datetime.fromisoformat requires Python 3.7, and strptime's %z only accepts
+    # offsets with a colon (and "Z") since Python 3.7
+    timestamp = re.sub(r'([+-]\d\d):(\d\d)$', r'\1\2', value.strip())
+    timestamp = re.sub(r'Z$', '+0000', timestamp)
+    for date_format in _TIMESTAMP_FORMATS:
+        try:
+            dt = datetime.strptime(timestamp, date_format)
+        except ValueError:
+            continue
+
+        # like security.datetime_factory, return aware UTC datetimes (timestamps
+        # without an offset are taken to be UTC already)
+        if dt.tzinfo is None:
+            return dt.replace(tzinfo=timezone.utc)
+        return dt.astimezone(timezone.utc)
+    raise ValueError(f'Invalid timestamp {value!r}.')
+
+
+def _row_to_user(row, role_ids, seen_emails, existing_emails):
+    """
+    Validates a row, returning the user's column values and their role ids.
+    """
+    if isinstance(row, Exception):
+        raise ValueError(f'Invalid JSON: {row}')
+
+    User = user_manager.Meta.model
+    user = dict(row)
+    email = user.get('email')
+    if not email:
+        raise ValidationError('Email is required.')
+    EmailValidator()(email)
+    if email in existing_emails:
+        raise ValidationError(f'A user with email {email} already exists.')
+    elif email in seen_emails:
+        raise ValidationError(f'Duplicate email {email}.')
+    seen_emails.add(email)
+
+    User.validate_password(user.get('password'))
+    if isinstance(user.get('active'), str):
+        user['active'] = user['active'].lower() in {'1', 'true', 'y', 'yes'}
+    if user.get('confirmed_at') == 'now':
+        user['confirmed_at'] = security.datetime_factory()
+    elif isinstance(user.get('confirmed_at'), str):
+        user['confirmed_at'] = _parse_timestamp(user['confirmed_at'])
+
+    roles = user.pop('roles', None) or []
+    if isinstance(roles, str):
+        roles = [role.strip() for role in roles.split(',')]
+    unknown_roles = [role for role in roles if role not in role_ids]
+    if unknown_roles:
+        raise ValidationError(f'Unknown roles: {", ".join(unknown_roles)}')
+
+    columns = User.__mapper__.column_attrs
+    unknown_columns = [key for key in user if key != 'password'
+                       and (key not in columns or key.startswith('_'))]
+    if unknown_columns:
+        raise ValidationError(f'Unknown columns: {", ".join(unknown_columns)}')
+
+    return user, [role_ids[role] for role in roles]
+
+
+def _insert_users(users, user_roles, executor):
+    """
+    Hashes the users' passwords, and bulk inserts the users and their roles.
+    Returns the ids of the new users.
+    """
+    if not users:
+        return []
+
+    User = user_manager.Meta.model
+    UserRole = unchained.sqlalchemy_bundle.models['UserRole']
+    session = user_manager.session
+
+    passwords = {i: user.pop('password', None) for i, user in enumerate(users)}
+    passwords = {i: password for i, password in passwords.items() if password}
+    hashes = security_utils_service.hash_passwords(passwords.values(),
+                                                   executor=executor)
+    for i, password_hash in zip(passwords, hashes):
+        users[i]['_password'] = password_hash
+
+    session.bulk_insert_mappings(User, users)
+    ids = dict(session.query(User.email, User.id).filter(
+        User.email.in_([user['email'] for user in users])))
+    session.bulk_insert_mappings(UserRole, [
+        dict(user_id=ids[user['email']], role_id=role_id)
+        for user, roles in zip(users, user_roles) for role_id in roles])
+    session.commit()
+    return list(ids.values())
@@ -36,6 +36,15 @@ class AuthenticationConfigMixin(BundleConfig):
     Each must be unique.
     """
 
+    SECURITY_USER_CACHE_TTL = None
+    """
+    The number of seconds to cache snapshots of session-authenticated users for,
+    so that loading the current user doesn't need to query the database on every
+    request. (When enabled, ``current_user`` will be a :class:`UserSnapshot` for
+    session-authenticated requests.) Snapshots are invalidated whenever users get
+    updated (by this process). Defaults to None, meaning users don't get cached.
+    """
+
     SECURITY_POST_LOGIN_REDIRECT_ENDPOINT = '/'
     """
     The endpoint or url to redirect to after a successful login.
@@ -47,6 +56,27 @@ class AuthenticationConfigMixin(BundleConfig):
     """
 
 
+class AuthorizationConfigMixin(BundleConfig):
+    """
+    Config options for checking user roles.
+    """
+
+    SECURITY_ROLE_CACHE = False
+    """
+    Whether or not to cache the role names of users in a per-process cache, so
+    that loading the current user and checking their roles doesn't need to query
+    the database. The cache is invalidated whenever roles get added to or removed
+    from users (by this process).
+    """
+
+    SECURITY_ROLE_CACHE_TTL = 60
+    """
+    The number of seconds cached role names remain valid for. Because the role
+    cache is per-process, this is the upper bound on how long other processes
+    may keep granting roles that have been removed from a user.
+    """
+
+
 class ChangePasswordConfigMixin(BundleConfig):
     """
     Config options for changing passwords
@@ -119,6 +149,15 @@ class EncryptionConfigMixin(BundleConfig):
     List of deprecated algorithms for hashing passwords.
     """
 
+    SECURITY_PASSWORD_HASHING_POOL_SIZE = None
+    """
+    The number of worker processes to hash and verify passwords in. This takes the
+    (intentionally) CPU-expensive hashing off of the request threads, and caps how
+    many passwords can be hashed concurrently, so that a storm of logins can't
+    starve other requests of CPU. Defaults to None, meaning passwords get hashed in
+    the calling thread.
+    """
+
     SECURITY_HASHING_SCHEMES = ['sha512_crypt']
     """
     List of algorithms that can be used for creating and validating tokens.
@@ -274,8 +313,40 @@ class TokenConfigMixin(BundleConfig):
     Defaults to None, meaning the token never expires.
     """
 
+    SECURITY_STATELESS_TOKENS = False
+    """
+    Whether or not to issue stateless access tokens. Access tokens are signed
+    and short-lived, and their claims include the user's id and role names, so
+    that token-authenticated requests don't need to query the database. (When
+    enabled, ``current_user`` will be a :class:`TokenUser` for token-authenticated
+    requests.) Use the refresh token returned by the login view to get new access
+    tokens, and increment :attr:`User.token_version` to revoke them.
+    """
+
+    SECURITY_ACCESS_TOKEN_MAX_AGE = 15 * 60
+    """
+    The number of seconds before a stateless access token expires. This is also
+    the upper bound on how long revoked access tokens remain usable.
+    """
+
+    SECURITY_REFRESH_TOKEN_MAX_AGE = 30 * 24 * 60 * 60
+    """
+    The number of seconds before a refresh token expires.
+    """
+
+    SECURITY_ACCESS_SALT = 'security-access-salt'
+    """
+    The salt used for signing stateless access tokens.
+    """
+
+    SECURITY_REFRESH_SALT = 'security-refresh-salt'
+    """
+    The salt used for signing refresh tokens.
+    """
+
 
 class Config(AuthenticationConfigMixin,
+             AuthorizationConfigMixin,
              ChangePasswordConfigMixin,
              EncryptionConfigMixin,
              ForgotPasswordConfigMixin,
@@ -297,6 +368,16 @@ class Config(AuthenticationConfigMixin,
     an HTTP status code of 401 (UNAUTHORIZED).
     """
 
+    SECURITY_SEND_MAIL_AFTER_COMMIT = False
+    """
+    Whether or not to defer sending the security bundle's emails until the database
+    transaction of the change they're about (eg a new user, or a password change)
+    gets committed. Emails are rendered right away, but only handed off to
+    ``MAIL_SEND_FN`` after the commit (and discarded if the transaction gets rolled
+    back instead). Combine with the celery bundle to deliver them from a worker,
+    with retries, instead of from inside the request.
+    """
+
     # make datetimes timezone-aware by default
     SECURITY_DATETIME_FACTORY = lambda: datetime.now(timezone.utc)
     """
@@ -1,17 +1,25 @@
-from flask import Request
+import os
+import threading
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from flask import Request, _request_ctx_stack
 from flask_login import LoginManager
 from flask_principal import Principal, Identity, UserNeed, RoleNeed, identity_loaded
 from flask_unchained import FlaskUnchained, injectable, lazy_gettext as _
 from flask_unchained.utils import ConfigProperty, ConfigPropertyMetaclass
 from itsdangerous import URLSafeTimedSerializer
 from passlib.context import CryptContext
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
 from types import FunctionType
 from typing import *
 
-from ..models import AnonymousUser, User
+from ..models import AnonymousUser, User, UserSnapshot
 from ..utils import current_user
 from ..services.security_utils_service import SecurityUtilsService
 from ..services.user_manager import UserManager
+from ..signals import password_changed, password_reset, user_confirmed
 
 
 class _SecurityConfigProperties(metaclass=ConfigPropertyMetaclass):
@@ -27,9 +35,20 @@ class _SecurityConfigProperties(metaclass=ConfigPropertyMetaclass):
     token_authentication_key: str = ConfigProperty()
     token_max_age: str = ConfigProperty()
 
+    stateless_tokens: bool = ConfigProperty()
+    access_token_max_age: int = ConfigProperty()
+    refresh_token_max_age: int = ConfigProperty()
+
     password_hash: str = ConfigProperty()
+    password_hashing_pool_size: int = ConfigProperty()
     password_salt: str = ConfigProperty()
 
+    role_cache: bool = ConfigProperty()
+    role_cache_ttl: int = ConfigProperty()
+    user_cache_ttl: int = ConfigProperty()
+
+    send_mail_after_commit: bool = ConfigProperty()
+
     datetime_factory: FunctionType = ConfigProperty()
     _unauthorized_callback: FunctionType = \
         ConfigProperty('SECURITY_UNAUTHORIZED_CALLBACK')
@@ -44,24 +63,33 @@ class Security(_SecurityConfigProperties):
 
     def __init__(self):
         self._context_processors = {}
+        self._password_hashing_pool = None
+        self._password_hashing_pool_lock = threading.Lock()
+        self._password_hashing_pool_pid = None
+        self._role_names_cache = {}
         self._send_mail_task = None
+        self._user_cache = {}
 
         # injected services
         self.security_utils_service = None
         self.user_manager = None
 
         # remaining properties are all set by `self.init_app`
+        self.access_token_serializer = None
         self.confirm_serializer = None
         self.hashing_context = None
         self.login_manager = None
         self.login_serializer = None
         self.principal = None
         self.pwd_context = None
+        self.pwd_context_config = None
+        self.refresh_token_serializer = None
         self.remember_token_serializer = None
         self.reset_serializer = None
 
     def init_app(self, app: FlaskUnchained):
         # NOTE: the order of these `self.get_*` calls is important!
+        self.access_token_serializer = self._get_serializer(app, 'access')
         self.confirm_serializer = self._get_serializer(app, 'confirm')
         self.hashing_context = self._get_hashing_context(app)
         self.login_manager = self._get_login_manager(
@@ -69,6 +97,8 @@ class Security(_SecurityConfigProperties):
         self.login_serializer = self._get_serializer(app, 'login')
         self.principal = self._get_principal(app)
         self.pwd_context = self._get_pwd_context(app)
+        self.pwd_context_config = self.pwd_context.to_string()
+        self.refresh_token_serializer = self._get_serializer(app, 'refresh')
         self.remember_token_serializer = self._get_serializer(app, 'remember')
         self.reset_serializer = self._get_serializer(app, 'reset')
 
@@ -77,6 +107,8 @@ class Security(_SecurityConfigProperties):
         # FIXME: should this be easier to customize for end users, perhaps by making
         # FIXME: the function come from a config setting?
         identity_loaded.connect_via(app)(self._on_identity_loaded)
+        self._register_cache_listeners(app)
+        self._register_after_commit_listeners()
         app.extensions['security'] = self
 
     def inject_services(self,
@@ -162,6 +194,120 @@ class Security(_SecurityConfigProperties):
                 rv.update(fn())
         return rv
 
+    def get_password_hashing_pool(self) -> Union[ProcessPoolExecutor, None]:
+        """
+        Get the process pool to hash and verify passwords in, or ``None`` if
+        ``SECURITY_PASSWORD_HASHING_POOL_SIZE`` isn't set.
+        """
+        if not self.password_hashing_pool_size:
+            return None
+
+        # process pools don't survive forking, so each process needs its own
+        with self._password_hashing_pool_lock:
+            if self._password_hashing_pool_pid != os.getpid():
+                self._password_hashing_pool = ProcessPoolExecutor(
+                    max_workers=self.password_hashing_pool_size)
+                self._password_hashing_pool_pid = os.getpid()
+        return self._password_hashing_pool
+
+    ###########################################
+    # public api to cache the names of roles #
+    ###########################################
+
+    def get_cached_role_names(self, user_id) -> Union[FrozenSet[str], None]:
+        """
+        Get the role names of a user, if they're cached for the current request, or
+        (when ``SECURITY_ROLE_CACHE`` is enabled) in the per-process role cache.
+        """
+        request_cache = _get_request_role_names_cache()
+        if user_id in request_cache:
+            return request_cache[user_id]
+        if not self.role_cache:
+            return None
+
+        expires_at, role_names = self._role_names_cache.get(user_id, (0, None))
+        if expires_at < time.monotonic():
+            return None
+        request_cache[user_id] = role_names
+        return role_names
+
+    def cache_role_names(self, user_id, role_names: FrozenSet[str]) -> None:
+        """
+        Cache the role names of a user for the current request, and (when
+        ``SECURITY_ROLE_CACHE`` is enabled) in the per-process role cache.
+        """
+        _get_request_role_names_cache()[user_id] = role_names
+        if self.role_cache:
+            self._role_names_cache[user_id] = (
+                time.monotonic() + self.role_cache_ttl, role_names)
+
+    def clear_role_names_cache(self, user_id=None) -> None:
+        """
+        Invalidate the cached role names of the given user, or of all users
+        if ``user_id`` is None.
+        """
+        for cache in [_get_request_role_names_cache(), self._role_names_cache]:
+            if user_id is None:
+                cache.clear()
+            else:
+                cache.pop(user_id, None)
+
+    ###################################################
+    # public api to cache snapshots of loaded users #
+    ###################################################
+
+    def get_cached_user(self, user_id) -> Union[UserSnapshot, None]:
+        """
+        Get a snapshot of the user from the user cache, if it's enabled (by
+        ``SECURITY_USER_CACHE_TTL``) and the user is cached.
+        """
+        if not self.user_cache_ttl:
+            return None
+
+        expires_at, values, role_names = self._user_cache.get(user_id, (0, None, None))
+        if expires_at < time.monotonic():
+            return None
+        return UserSnapshot(values, role_names)
+
+    def cache_user(self, user: User) -> UserSnapshot:
+        """
+        Add a snapshot of the user to the user cache (if it's enabled), and
+        return it.
+        """
+        snapshot = UserSnapshot.from_user(user)
+        if self.user_cache_ttl:
+            self._user_cache[user.id] = (time.monotonic() + self.user_cache_ttl,
+                                         snapshot._values, snapshot.role_names)
+        return snapshot
+
+    def clear_user_cache(self, user_id=None) -> None:
+        """
+        Invalidate the cached snapshot of the given user, or of all users
+        if ``user_id`` is None.
+        """
+        if user_id is None:
+            self._user_cache.clear()
+        else:
+            self._user_cache.pop(user_id, None)
+
+    ###############################################################
+    # public api to defer work until the transaction is committed #
+    ###############################################################
+
+    def after_commit(self, fn: Callable[[], Any]) -> None:
+        """
+        Call ``fn`` once the current database transaction gets committed, or right
+        away if the session doesn't have any changes to commit. If the transaction
+        gets rolled back instead, ``fn`` is discarded without being called.
+        """
+        session = self.user_manager.session
+        if not (session.new or session.dirty or session.deleted
+                or session.info.get(_FLUSHED_KEY)):
+            fn()
+            return
+
+        session.info.setdefault(_AFTER_COMMIT_KEY, []).append(fn)
+
     # protected
     def _add_ctx_processor(self, endpoint, fn) -> None:
         group = self._context_processors.setdefault(endpoint, [])
@@ -192,7 +338,7 @@ class Security(_SecurityConfigProperties):
         login_manager.localize_callback = _
         login_manager.request_loader(self._request_loader)
         login_manager.user_loader(
-            lambda *a, **kw: self.security_utils_service.user_loader(*a, **kw))
+            lambda *a, **kw: self.security_utils_service.cached_user_loader(*a, **kw))
         login_manager.login_view = 'security_controller.login'
         login_manager.login_message = _(
             'flask_unchained.bundles.security:error.login_required')
@@ -230,13 +376,63 @@ class Security(_SecurityConfigProperties):
         Get a URLSafeTimedSerializer for the given serialization context name.
 
         :param app: the :class:`FlaskUnchained` instance
-        :param name: Serialization context. One of ``confirm``, ``login``,
-          ``remember``, or ``reset``
+        :param name: Serialization context. One of ``access``, ``confirm``,
+          ``login``, ``refresh``, ``remember``, or ``reset``
         :return: URLSafeTimedSerializer
         """
         salt = app.config.get('SECURITY_%s_SALT' % name.upper())
         return URLSafeTimedSerializer(secret_key=app.config.SECRET_KEY, salt=salt)
 
+    def _register_cache_listeners(self, app: FlaskUnchained) -> None:
+        """
+        Invalidate cached users and role names whenever users get updated, roles get
+        added to or removed from users, or roles get renamed or deleted.
+        """
+        models = app.unchained.sqlalchemy_bundle.models
+        for model_name, callback in [('User', self._on_user_changed),
+                                     ('UserRole', self._on_user_role_changed),
+                                     ('Role', self._on_role_changed)]:
+            model = models.get(model_name)
+            if model is None:
+                continue
+
+            for event_name in ['after_insert', 'after_update', 'after_delete']:
+                if not event.contains(model, event_name, callback):
+                    event.listen(model, event_name, callback)
+
+        for signal in [password_changed, password_reset, user_confirmed]:
+            signal.connect(self._on_user_signal)
+
+    def _register_after_commit_listeners(self) -> None:
+        """
+        Keep track of which sessions have flushed changes, and run the callbacks
+        deferred by :meth:`after_commit` once their transactions commit.
+        """
+        for event_name, callback in [('after_flush', _on_session_flushed),
+                                     ('after_commit', _on_session_committed),
+                                     ('after_transaction_end', _on_transaction_end)]:
+            if not event.contains(Session, event_name, callback):
+                event.listen(Session, event_name, callback)
+
+    def _on_user_changed(self, mapper, connection, user) -> None:
+        self.clear_user_cache(user.id)
+
+    def _on_user_role_changed(self, mapper, connection, user_role) -> None:
+        # a user role that got moved to another user changes both of the users
+        user_ids = {user_role.user_id,
+                    *inspect(user_role).attrs.user_id.history.deleted}
+        for user_id in user_ids - {None}:
+            self.clear_role_names_cache(user_id)
+            self.clear_user_cache(user_id)
+
+    def _on_role_changed(self, mapper, connection, role) -> None:
+        self.clear_role_names_cache()
+        self.clear_user_cache()
+
+    def _on_user_signal(self, sender, user=None, **kwargs) -> None:
+        if user is not None:
+            self.clear_user_cache(user.id)
+
     def _identity_loader(self) -> Union[Identity, None]:
         """
         Identity loading function to be passed to be assigned to the Principal
@@ -252,8 +448,8 @@ class Security(_SecurityConfigProperties):
         if hasattr(current_user, 'id'):
             identity.provides.add(UserNeed(current_user.id))
 
-        for role in getattr(current_user, 'roles', []):
-            identity.provides.add(RoleNeed(role.name))
+        for role_name in getattr(current_user, 'role_names', []):
+            identity.provides.add(RoleNeed(role_name))
 
         identity.user = current_user
 
@@ -268,12 +464,45 @@ class Security(_SecurityConfigProperties):
             data = request.get_json(silent=True) or {}
             token = data.get(args_key, token)
 
+        if self.stateless_tokens:
+            user = self.security_utils_service.access_token_loader(token)
+            if user:
+                return user
+
         try:
             data = self.remember_token_serializer.loads(token, max_age=self.token_max_age)
-            user = self.user_manager.get(data[0])
+            user = self.security_utils_service.user_loader(data[0])
             if user and self.security_utils_service.verify_hash(data[1], user.password):
                 return user
         except:
             pass
 
         return self.login_manager.anonymous_user()
+
+
+_AFTER_COMMIT_KEY = 'security_after_commit'
+_FLUSHED_KEY = 'security_flushed'
+
+
+def _on_session_flushed(session, flush_context) -> None:
+    session.info[_FLUSHED_KEY] = True
+
+
+def _on_session_committed(session) -> None:
+    for fn in session.info.pop(_AFTER_COMMIT_KEY, []):
+        fn()
+
+
+def _on_transaction_end(session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_AFTER_COMMIT_KEY, None)
+        session.info.pop(_FLUSHED_KEY, None)
+
+
+def _get_request_role_names_cache() -> Dict[Any, FrozenSet[str]]:
+    ctx = _request_ctx_stack.top
+    if ctx is None:
+        return {}
+    if not hasattr(ctx, 'role_names'):
+        ctx.role_names = {}
+    return ctx.role_names
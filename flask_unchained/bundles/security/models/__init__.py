@@ -1,4 +1,6 @@
 from .anonymous_user import AnonymousUser
+from .token_user import TokenUser
+from .user_snapshot import UserSnapshot
 from .user import User
 from .role import Role
 from .user_role import UserRole
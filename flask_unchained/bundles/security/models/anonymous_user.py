@@ -10,6 +10,10 @@ class AnonymousUser(AnonymousUserMixin):
     def id(self):
         return None
 
+    @property
+    def role_names(self):
+        return frozenset()
+
     @property
     def active(self):
         return False
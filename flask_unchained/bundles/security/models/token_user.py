@@ -0,0 +1,54 @@
+from flask_unchained import unchained, injectable
+from typing import *
+
+
+class TokenUser:
+    """
+    A lightweight stand-in for the :class:`User` model, loaded from the claims of
+    a stateless access token without querying the database. Use :meth:`get_user`
+    to load the actual :class:`User` instance when it's needed.
+    """
+
+    def __init__(self, id, role_names: Iterable[str] = (), token_version: int = 0):
+        self.id = id
+        self.role_names = frozenset(role_names)
+        self.token_version = token_version
+
+    @unchained.inject('user_manager')
+    def get_user(self, user_manager=injectable):
+        """
+        Returns the :class:`User` identified by this token user.
+        """
+        return user_manager.get(self.id)
+
+    def has_role(self, role):
+        """
+        Returns `True` if the user identifies with the specified role.
+
+        :param role: A role name or :class:`Role` instance
+        """
+        if isinstance(role, str):
+            return role in self.role_names
+        return role.name in self.role_names
+
+    def get_id(self):
+        return str(self.id)
+
+    @property
+    def active(self):
+        return True
+
+    @property
+    def is_active(self):
+        return True
+
+    @property
+    def is_authenticated(self):
+        return True
+
+    @property
+    def is_anonymous(self):
+        return False
+
+    def __repr__(self):
+        return f'TokenUser(id={self.id!r}, roles={sorted(self.role_names)!r})'
@@ -1,5 +1,6 @@
 from flask_unchained.bundles.sqlalchemy import db
 from flask_unchained import unchained, injectable, lazy_gettext as _
+from typing import *
 
 from .user_role import UserRole
 from ..validators import EmailValidator
@@ -10,8 +11,9 @@ MIN_PASSWORD_LENGTH = 8
 class User(db.Model):
     """
     Base :class:`User` model. Includes :attr:`email`, :attr:`password`, :attr:`active`,
-    and :attr:`confirmed_at` columns, and a many-to-many relationship to the
-    :class:`Role` model via the intermediary :class:`UserRole` join table.
+    :attr:`confirmed_at` and :attr:`token_version` columns, and a many-to-many
+    relationship to the :class:`Role` model via the intermediary :class:`UserRole`
+    join table.
     """
     class Meta:
         lazy_mapped = True
@@ -23,6 +25,7 @@ class User(db.Model):
     _password = db.Column('password', db.String, nullable=True)
     active = db.Column(db.Boolean(name='active'), default=False)
     confirmed_at = db.Column(db.DateTime(), nullable=True)
+    token_version = db.Column(db.Integer, default=0, server_default='0')
 
     user_roles = db.relationship('UserRole', back_populates='user',
                                  cascade='all, delete-orphan')
@@ -51,6 +54,14 @@ class User(db.Model):
         """
         return security_utils_service.get_auth_token(self)
 
+    @property
+    @unchained.inject('security_utils_service')
+    def role_names(self, security_utils_service=injectable) -> FrozenSet[str]:
+        """
+        The names of the user's roles.
+        """
+        return security_utils_service.get_role_names(self)
+
     def has_role(self, role):
         """
         Returns `True` if the user identifies with the specified role.
@@ -58,7 +69,7 @@ class User(db.Model):
         :param role: A role name or :class:`Role` instance
         """
         if isinstance(role, str):
-            return role in (role.name for role in self.roles)
+            return role in self.role_names
         else:
             return role in self.roles
 
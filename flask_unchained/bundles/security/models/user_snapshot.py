@@ -0,0 +1,46 @@
+from sqlalchemy import inspect
+from typing import *
+
+from .token_user import TokenUser
+
+
+class UserSnapshot(TokenUser):
+    """
+    A detached snapshot of a :class:`User`'s column values and role names, as
+    loaded from the user cache. Column values are available as attributes (except
+    for the password). Use :meth:`get_user` to load the actual :class:`User`
+    instance when it's needed.
+    """
+
+    def __init__(self, values: Dict[str, Any], role_names: Iterable[str] = ()):
+        super().__init__(values['id'], role_names, values.get('token_version') or 0)
+        self._values = values
+
+    @classmethod
+    def from_user(cls, user):
+        """
+        Create a snapshot of the given user.
+        """
+        values = {attr.key: getattr(user, attr.key)
+                  for attr in inspect(user).mapper.column_attrs
+                  if not attr.key.startswith('_')}
+        return cls(values, user.role_names)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    @property
+    def active(self):
+        return self._values.get('active')
+
+    @property
+    def is_active(self):
+        return bool(self.active)
+
+    def __repr__(self):
+        return f'UserSnapshot(id={self.id!r}, email={self._values.get("email")!r})'
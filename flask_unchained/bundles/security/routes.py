@@ -16,6 +16,8 @@ routes = lambda: [
             get('/check-auth-token', SecurityController.check_auth_token, only_if=True),
             post('/login', SecurityController.login,
                  endpoint='security_api.login'),
+            post('/refresh-token', SecurityController.refresh_token,
+                 endpoint='security_api.refresh_token'),
             get('/logout', SecurityController.logout,
                 endpoint='security_api.logout'),
             post('/send-confirmation-email',
@@ -22,7 +22,8 @@ class UserSerializer(ma.ModelSerializer):
 
     class Meta:
         model = User
-        exclude = ('confirmed_at', 'created_at', 'updated_at', 'user_roles')
+        exclude = ('confirmed_at', 'created_at', 'updated_at', 'user_roles',
+                   'token_version')
         dump_only = ('active', 'roles')
         load_only = ('password',)
 
@@ -5,6 +5,7 @@ from flask_login.utils import logout_user as _logout_user
 from flask_principal import Identity, AnonymousIdentity, identity_changed
 from flask_unchained import url_for, lazy_gettext as _
 from flask_unchained.bundles.mail import Mail
+from flask_unchained.bundles.mail.utils import make_message
 from flask_unchained import BaseService, injectable
 from typing import *
 
@@ -175,7 +176,7 @@ class SecurityService(BaseService):
                            either sending or not sending an email.
         """
         user.password = password
-        self.user_manager.save(user)
+        self.revoke_auth_tokens(user)
         if send_email or (app.config.SECURITY_SEND_PASSWORD_CHANGED_EMAIL
                           and send_email is None):
             self.send_mail(
@@ -197,7 +198,7 @@ class SecurityService(BaseService):
         :return:
         """
         user.password = password
-        self.user_manager.save(user)
+        self.revoke_auth_tokens(user)
         if app.config.SECURITY_SEND_PASSWORD_RESET_NOTICE_EMAIL:
             self.send_mail(
                 _('flask_unchained.bundles.security:email_subject.password_reset_notice'),
@@ -206,6 +207,16 @@ class SecurityService(BaseService):
                 user=user)
         password_reset.send(app._get_current_object(), user=user)
 
+    def revoke_auth_tokens(self, user):
+        """
+        Revokes the user's refresh tokens by incrementing their token version.
+        (Stateless access tokens remain valid until they expire.)
+
+        :param user: The user to revoke the tokens of.
+        """
+        user.token_version = (user.token_version or 0) + 1
+        self.user_manager.save(user)
+
     def send_email_confirmation_instructions(self, user):
         """
         Sends the confirmation instructions email for the specified user.
@@ -265,6 +276,9 @@ class SecurityService(BaseService):
     def send_mail(self, subject, to, template, **template_ctx):
         """
         Utility method to send mail with the `mail` template context.
+
+        If ``SECURITY_SEND_MAIL_AFTER_COMMIT`` is enabled, the message gets sent
+        once the current database transaction commits.
         """
         if not self.mail:
             from warnings import warn
@@ -272,6 +286,10 @@ class SecurityService(BaseService):
                  'Please install it, or fix your configuration.')
             return
 
-        self.mail.send(subject, to, template, **dict(
-            **self.security.run_ctx_processor('mail'),
-            **template_ctx))
+        template_ctx = dict(**self.security.run_ctx_processor('mail'), **template_ctx)
+        if not self.security.send_mail_after_commit:
+            self.mail.send(subject, to, template, **template_ctx)
+            return
+
+        msg = make_message(subject, to, template, **template_ctx)
+        self.security.after_commit(lambda: self.mail.send(msg))
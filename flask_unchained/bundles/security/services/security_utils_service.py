@@ -1,10 +1,21 @@
 import base64
 import hashlib
 import hmac
+import time
 
+from concurrent.futures import Executor
 from datetime import timedelta
+from flask import after_this_request, has_request_context
 from flask_unchained import BaseService, current_app, injectable
+from functools import lru_cache, partial
 from itsdangerous import BadSignature, SignatureExpired
+from passlib.context import CryptContext
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload
+from typing import *
+
+from ..models import TokenUser, UserSnapshot
+from ..signals import password_hashing_finished
 
 
 class SecurityUtilsService(BaseService):
@@ -36,32 +47,93 @@ class SecurityUtilsService(BaseService):
 
     def get_auth_token(self, user):
         """
-        Returns the user's authentication token.
+        Returns the user's authentication token. (A stateless access token if
+        ``SECURITY_STATELESS_TOKENS`` is enabled.)
         """
+        if self.security.stateless_tokens:
+            return self.get_access_token(user)
+
         data = [str(user.id),
                 self.security.hashing_context.hash(encode_string(user._password))]
         return self.security.remember_token_serializer.dumps(data)
 
+    def get_access_token(self, user):
+        """
+        Returns a signed, short-lived access token for the user. Its claims
+        include the user's id, role names and token version.
+        """
+        return self.security.access_token_serializer.dumps({
+            'sub': user.id,
+            'roles': sorted(user.role_names),
+            'ver': user.token_version or 0,
+        })
+
+    def get_refresh_token(self, user):
+        """
+        Returns a refresh token for the user, which can be exchanged for new
+        access tokens until it expires, or the user's token version changes.
+        """
+        return self.security.refresh_token_serializer.dumps({
+            'sub': user.id,
+            'ver': user.token_version or 0,
+        })
+
+    def access_token_loader(self, token) -> Optional[TokenUser]:
+        """
+        Returns a :class:`TokenUser` if the access token is valid, otherwise
+        ``None``. Does not query the database.
+
+        :param token: The access token
+        """
+        if not token:
+            return None
+
+        try:
+            claims = self.security.access_token_serializer.loads(
+                token, max_age=self.security.access_token_max_age)
+            return TokenUser(claims['sub'], claims['roles'], claims['ver'])
+        except (BadSignature, KeyError, TypeError, ValueError):
+            return None
+
+    def refresh_access_token(self, refresh_token) -> Optional[str]:
+        """
+        Returns a new access token if the refresh token is valid, otherwise
+        ``None``. Refresh tokens are revoked by incrementing the user's
+        :attr:`~User.token_version`.
+
+        :param refresh_token: The refresh token
+        """
+        try:
+            claims = self.security.refresh_token_serializer.loads(
+                refresh_token, max_age=self.security.refresh_token_max_age)
+            user = self.user_loader(claims['sub'])
+        except (BadSignature, KeyError, TypeError, ValueError):
+            return None
+
+        if not user or not user.active or (user.token_version or 0) != claims['ver']:
+            return None
+        return self.get_access_token(user)
+
     def verify_password(self, user, password):
         """
         Returns ``True`` if the password is valid for the specified user.
 
         Additionally, the hashed password in the database is updated if the
-        hashing algorithm happens to have changed.
+        hashing algorithm happens to have changed. (During requests, this happens
+        after the response has been sent.)
 
         :param user: The user to verify against
         :param password: The plaintext password to verify
         """
         if self.use_double_hash(user.password):
-            verified = self.security.pwd_context.verify(
-                self.get_hmac(password), user.password)
+            verified = self._call_pwd_context(
+                'verify', self.get_hmac(password), user.password)
         else:
             # Try with original password.
-            verified = self.security.pwd_context.verify(password, user.password)
+            verified = self._call_pwd_context('verify', password, user.password)
 
         if verified and self.security.pwd_context.needs_update(user.password):
-            user.password = password
-            self.user_manager.save(user)
+            self._rehash_password(user, password)
         return verified
 
     def hash_password(self, password):
@@ -75,11 +147,36 @@ class SecurityUtilsService(BaseService):
         if self.use_double_hash():
             password = self.get_hmac(password).decode('ascii')
 
-        return self.security.pwd_context.hash(
-            password,
+        return self._call_pwd_context(
+            'hash', password,
             **current_app.config.SECURITY_PASSWORD_HASH_OPTIONS.get(
                 current_app.config.SECURITY_PASSWORD_HASH, {}))
 
+    def hash_passwords(self, passwords: Iterable[str],
+                       executor: Optional[Executor] = None) -> List[str]:
+        """
+        Hash many plaintext passwords, in parallel when given an executor (or when
+        the password hashing pool is enabled).
+
+        :param passwords: The plaintext passwords to hash
+        :param executor: An optional :class:`~concurrent.futures.ProcessPoolExecutor`
+                         to hash the passwords in
+        """
+        if self.use_double_hash():
+            passwords = [self.get_hmac(password).decode('ascii')
+                         for password in passwords]
+        options = current_app.config.SECURITY_PASSWORD_HASH_OPTIONS.get(
+            current_app.config.SECURITY_PASSWORD_HASH, {})
+
+        executor = executor or self.security.get_password_hashing_pool()
+        if executor is None:
+            return [self.security.pwd_context.hash(password, **options)
+                    for password in passwords]
+
+        hash_password = partial(_call_pwd_context, self.security.pwd_context_config,
+                                'hash', **options)
+        return [rv for rv, duration in executor.map(hash_password, passwords)]
+
     def hash_data(self, data):
         """
         Hash data in the security token hashing context.
@@ -236,11 +333,126 @@ class SecurityUtilsService(BaseService):
             user_identifier = int(user_identifier)
         except (ValueError, TypeError):
             for attr in self.get_identity_attributes():
-                user = self.user_manager.get_by(**{attr: user_identifier})
+                user = self._get_user_query().filter_by(
+                    **{attr: user_identifier}).one_or_none()
                 if user:
                     return user
         else:
-            return self.user_manager.get(user_identifier)
+            if self.security.get_cached_role_names(user_identifier) is not None:
+                return self.user_manager.get(user_identifier)
+            return self._get_user_query().get(user_identifier)
+
+    def cached_user_loader(self, user_identifier) -> Union[UserSnapshot, None]:
+        """
+        The user loader for session-authenticated requests. Returns a
+        :class:`UserSnapshot` from the user cache if ``SECURITY_USER_CACHE_TTL``
+        is set, otherwise the same as :meth:`user_loader`.
+        """
+        if not self.security.user_cache_ttl:
+            return self.user_loader(user_identifier)
+
+        try:
+            user_id = int(user_identifier)
+        except (ValueError, TypeError):
+            return self.user_loader(user_identifier)
+
+        snapshot = self.security.get_cached_user(user_id)
+        if snapshot is None:
+            user = self.user_loader(user_id)
+            if user is None:
+                return None
+            snapshot = self.security.cache_user(user)
+        return snapshot
+
+    def get_role_names(self, user) -> FrozenSet[str]:
+        """
+        Returns the names of the user's roles. They're cached for the duration of
+        the current request, and also in the per-process role cache if
+        ``SECURITY_ROLE_CACHE`` is enabled.
+
+        :param user: The user to get the role names of
+        """
+        state = inspect(user)
+        if not state.persistent or state.attrs.user_roles.history.has_changes():
+            return frozenset(role.name for role in user.roles)
+
+        role_names = self.security.get_cached_role_names(user.id)
+        if role_names is None:
+            role_names = frozenset(role.name for role in user.roles)
+            self.security.cache_role_names(user.id, role_names)
+        return role_names
+
+    def _call_pwd_context(self, method, *args, **kwargs):
+        """
+        Call a method of the password hashing context, in the password hashing
+        pool if it's enabled.
+
+        Sends signal `password_hashing_finished`.
+        """
+        start = time.perf_counter()
+        pool = self.security.get_password_hashing_pool()
+        if pool is None:
+            rv = getattr(self.security.pwd_context, method)(*args, **kwargs)
+            duration = time.perf_counter() - start
+        else:
+            rv, duration = pool.submit(_call_pwd_context,
+                                       self.security.pwd_context_config,
+                                       method, *args, **kwargs).result()
+
+        password_hashing_finished.send(current_app._get_current_object(),
+                                       method=method, duration=duration,
+                                       wait_time=time.perf_counter() - start - duration)
+        return rv
+
+    def _rehash_password(self, user, password):
+        """
+        Update the user's password hash. During requests, rehashing (which is as
+        expensive as verifying) gets deferred until after the response.
+        """
+        if not has_request_context():
+            user.password = password
+            self.user_manager.save(user)
+            return
+
+        app = current_app._get_current_object()
+        user_id = user.id
+
+        def rehash():
+            with app.app_context():
+                try:
+                    user = self.user_manager.get(user_id)
+                    user.password = password
+                    self.user_manager.save(user, commit=True)
+                except Exception:
+                    app.logger.exception(f'Failed to rehash the password of '
+                                         f'user {user_id}')
+
+        @after_this_request
+        def rehash_after_response(response):
+            response.call_on_close(rehash)
+            return response
+
+    def _get_user_query(self):
+        """
+        Returns a query for users that eagerly loads their roles.
+        """
+        return self.user_manager.query.options(
+            joinedload('user_roles').joinedload('role'))
+
+
+def _call_pwd_context(config, method, *args, **kwargs):
+    """
+    Call a method of a password hashing context in a process pool worker,
+    returning the result and how long it took.
+    """
+    start = time.perf_counter()
+    rv = getattr(_get_pwd_context(config), method)(*args, **kwargs)
+    return rv, time.perf_counter() - start
+
+
+@lru_cache()
+def _get_pwd_context(config):
+    return CryptContext.from_string(config)
 
 
 def encode_string(string):
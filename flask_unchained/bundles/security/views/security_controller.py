@@ -1,4 +1,4 @@
-from flask import current_app as app, request
+from flask import _request_ctx_stack, current_app as app, request
 from flask_unchained import Controller, route, lazy_gettext as _
 from flask_unchained import injectable
 from flask_unchained.bundles.sqlalchemy import SessionManager
@@ -8,6 +8,7 @@ from werkzeug.datastructures import MultiDict
 from ..decorators import anonymous_user_required, auth_required
 from ..exceptions import AuthenticationError
 from ..extensions import Security
+from ..models import TokenUser
 from ..services import SecurityService, SecurityUtilsService
 from ..utils import current_user
 
@@ -32,7 +33,22 @@ class SecurityController(Controller):
         """
         # the auth_required decorator verifies the token and sets current_user,
         # just need to return a success response
-        return self.jsonify({'user': current_user})
+        return self.jsonify({'user': self._get_current_user()})
+
+    @route(methods=['POST'],
+           only_if=lambda app: app.config.SECURITY_STATELESS_TOKENS)
+    def refresh_token(self):
+        """
+        View function to exchange a refresh token for a new access token.
+        """
+        data = request.get_json(silent=True) or {}
+        token = self.security_utils_service.refresh_access_token(
+            data.get('refresh_token'))
+        if not token:
+            return self.jsonify({'error': _(
+                'flask_unchained.bundles.security:error.invalid_refresh_token')},
+                code=HTTPStatus.UNAUTHORIZED)
+        return self.jsonify({'token': token})
 
     @route(methods=['GET', 'POST'])
     @anonymous_user_required(msg='You are already logged in', category='success')
@@ -49,8 +65,11 @@ class SecurityController(Controller):
             else:
                 self.after_this_request(self._commit)
                 if request.is_json:
-                    return self.jsonify({'token': form.user.get_auth_token(),
-                                         'user': form.user})
+                    data = {'token': form.user.get_auth_token(), 'user': form.user}
+                    if self.security.stateless_tokens:
+                        data['refresh_token'] = \
+                            self.security_utils_service.get_refresh_token(form.user)
+                    return self.jsonify(data)
                 self.flash(_('flask_unchained.bundles.security:flash.login'),
                            category='success')
                 return self.redirect('SECURITY_POST_LOGIN_REDIRECT_ENDPOINT')
@@ -160,7 +179,8 @@ class SecurityController(Controller):
             self.flash(_('flask_unchained.bundles.security:flash.already_confirmed'),
                        category='info')
 
-        if user != current_user:
+        # compare by id, since the current user may be a cached UserSnapshot
+        if user.id != getattr(current_user, 'id', None):
             self.security_service.logout_user()
             self.security_service.login_user(user)
 
@@ -249,11 +269,10 @@ class SecurityController(Controller):
         View function for a user to change their password.
         Supports html and json requests.
         """
+        user = self._get_current_user()
         form = self._get_form('SECURITY_CHANGE_PASSWORD_FORM')
         if form.validate_on_submit():
-            self.security_service.change_password(
-                current_user._get_current_object(),
-                form.new_password.data)
+            self.security_service.change_password(user, form.new_password.data)
             self.after_this_request(self._commit)
             self.flash(_('flask_unchained.bundles.security:flash.password_change'),
                        category='success')
@@ -275,6 +294,14 @@ class SecurityController(Controller):
             return form_cls(MultiDict(request.get_json()))
         return form_cls(request.form)
 
+    def _get_current_user(self):
+        # stateless access tokens only load a TokenUser, so swap it for the
+        # actual user when views need it
+        user = current_user._get_current_object()
+        if isinstance(user, TokenUser):
+            user = _request_ctx_stack.top.user = user.get_user()
+        return user
+
     def _commit(self, response=None):
         self.session_manager.commit()
         return response
@@ -7,3 +7,4 @@ class SessionBundle(Bundle):
     """
     The :class:`Bundle` subclass for the Session Bundle. Has no special behaviour.
     """
+    command_group_names = ['session']
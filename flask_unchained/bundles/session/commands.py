@@ -0,0 +1,24 @@
+from flask import current_app
+from flask_unchained.cli import cli, click
+
+
+@cli.group()
+def session():
+    """
+    Session commands.
+    """
+
+
+@session.command()
+@click.option('--batch-size', default=1000, show_default=True,
+              help='How many sessions to delete per transaction.')
+def cleanup(batch_size):
+    """
+    Delete expired sessions from the database.
+    """
+    if current_app.config.SESSION_TYPE != 'sqlalchemy':
+        raise click.UsageError('Only the sqlalchemy SESSION_TYPE stores expired '
+                               'sessions that need to be cleaned up.')
+
+    count = current_app.session_interface.delete_expired(batch_size=batch_size)
+    click.echo(f'Deleted {count} expired sessions.')
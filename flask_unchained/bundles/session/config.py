@@ -120,6 +120,37 @@ class Config(_DefaultFlaskConfigForSessions):
     Defaults to ``'session:'``.
     """
 
+    SESSION_SERIALIZER = 'pickle'
+    """
+    How to serialize session data. One of ``'pickle'``, ``'msgpack'`` (requires
+    msgpack to be installed) or ``'json'``. The ``msgpack`` and ``json``
+    serializers support the same types as Flask's cookie sessions do (including
+    tuples, bytes, UUIDs and datetimes). Sessions serialized with dill (by older
+    versions of Flask Unchained) can still be loaded.
+
+    Defaults to ``'pickle'``.
+    """
+
+    SESSION_COMPRESS_THRESHOLD = 1024
+    """
+    Serialized session data larger than this many bytes gets compressed with zlib.
+    Set to ``None`` to disable compression.
+
+    Defaults to 1024.
+    """
+
+    SESSION_REFRESH_INTERVAL = timedelta(minutes=5)
+    """
+    When ``SESSION_REFRESH_EACH_REQUEST`` is enabled, how often to extend the
+    expiry of unchanged sessions in the session store. Sessions are only written
+    to the store when their data changes; otherwise their expiry is extended at
+    most once per this interval (eg with ``EXPIRE`` in Redis, or by updating only
+    the ``expiry`` column in SQL), and the session cookie is only set when that
+    happens. Does not apply to the ``'mongodb'`` session type.
+
+    Defaults to 5 minutes.
+    """
+
     SESSION_REDIS = None
     """
     A :class:`redis.Redis` instance.
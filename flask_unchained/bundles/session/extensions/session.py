@@ -1,8 +1,9 @@
-import dill
-
 from flask_session import Session as BaseSession
 
-from ..session_interfaces import SqlAlchemySessionInterface
+from ..serializers import SessionSerializer
+from ..session_interfaces import (
+    FileSystemSessionInterface, MemcachedSessionInterface, RedisSessionInterface,
+    SqlAlchemySessionInterface)
 
 
 class Session(BaseSession):
@@ -13,16 +14,36 @@ class Session(BaseSession):
     """
 
     def init_app(self, app):
+        if app.config.get('SESSION_LOCAL_CACHE'):
+            # checking that a locally cached session is still current takes a
+            # round trip to the store, which is all that loading it costs
+            raise ValueError('SESSION_LOCAL_CACHE is not supported: sessions are '
+                             'always loaded from the session store.')
         super().init_app(app)
-        app.session_interface.serializer = dill
+        app.session_interface.serializer = SessionSerializer(
+            app.config.SESSION_SERIALIZER,
+            compress_threshold=app.config.SESSION_COMPRESS_THRESHOLD)
 
     def _get_interface(self, app):
-        if app.config.SESSION_TYPE == 'sqlalchemy':
+        kwargs = dict(key_prefix=app.config.SESSION_KEY_PREFIX,
+                      use_signer=app.config.SESSION_USE_SIGNER,
+                      permanent=app.config.SESSION_PERMANENT,
+                      refresh_interval=app.config.SESSION_REFRESH_INTERVAL)
+
+        if app.config.SESSION_TYPE == 'redis':
+            return RedisSessionInterface(app.config.SESSION_REDIS, **kwargs)
+        elif app.config.SESSION_TYPE == 'memcached':
+            return MemcachedSessionInterface(app.config.SESSION_MEMCACHED, **kwargs)
+        elif app.config.SESSION_TYPE == 'filesystem':
+            return FileSystemSessionInterface(
+                cache_dir=app.config.SESSION_FILE_DIR,
+                threshold=app.config.SESSION_FILE_THRESHOLD,
+                mode=app.config.SESSION_FILE_MODE,
+                **kwargs)
+        elif app.config.SESSION_TYPE == 'sqlalchemy':
             return SqlAlchemySessionInterface(
                 db=app.config.SESSION_SQLALCHEMY,
                 table=app.config.SESSION_SQLALCHEMY_TABLE,
-                key_prefix=app.config.SESSION_KEY_PREFIX,
-                use_signer=app.config.SESSION_USE_SIGNER,
-                permanent=app.config.SESSION_PERMANENT,
-                model_class=app.config.SESSION_SQLALCHEMY_MODEL)
+                model_class=app.config.SESSION_SQLALCHEMY_MODEL,
+                **kwargs)
         return super()._get_interface(app)
@@ -0,0 +1,79 @@
+import dill
+import pickle
+import zlib
+
+from flask.json.tag import TaggedJSONSerializer
+from typing import *
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+# serialized sessions start with a null byte (which is never the first byte of a
+# pickle), followed by the format and compression flags
+MAGIC = b'\x00'
+COMPRESSED = b'z'
+UNCOMPRESSED = b'-'
+
+_tagger = TaggedJSONSerializer()
+
+
+class SessionSerializer:
+    """
+    Serializes server-side session data with pickle, msgpack or JSON, optionally
+    compressing it with zlib. Data that was serialized by older versions of the
+    session bundle (with dill) can still be loaded.
+
+    :param format: One of ``'pickle'``, ``'msgpack'`` or ``'json'``.
+    :param compress_threshold: Compress serialized data larger than this many
+                               bytes. Set to ``None`` to disable compression.
+    """
+
+    formats = {
+        'pickle': b'p',
+        'msgpack': b'm',
+        'json': b'j',
+    }
+
+    def __init__(self, format: str = 'pickle',
+                 compress_threshold: Optional[int] = 1024):
+        if format not in self.formats:
+            raise ValueError(f'Unknown session serializer {format!r} (must be '
+                             f'one of {", ".join(self.formats)})')
+        elif format == 'msgpack' and msgpack is None:
+            raise ValueError('msgpack must be installed to use the msgpack '
+                             'session serializer')
+        self.format = format
+        self.compress_threshold = compress_threshold
+        self._prefix = MAGIC + self.formats[format]
+
+    def dumps(self, data: Dict[str, Any], *args) -> bytes:
+        # extra args are ignored (the memcached interface passes a pickle protocol)
+        if self.format == 'pickle':
+            rv = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+        elif self.format == 'msgpack':
+            rv = msgpack.packb(_tagger.tag(data), use_bin_type=True)
+        else:
+            rv = _tagger.dumps(data).encode('utf-8')
+
+        if self.compress_threshold is not None and len(rv) > self.compress_threshold:
+            return self._prefix + COMPRESSED + zlib.compress(rv)
+        return self._prefix + UNCOMPRESSED + rv
+
+    def loads(self, data: bytes) -> Dict[str, Any]:
+        if data[:1] != MAGIC:
+            return dill.loads(data)
+
+        format, compression, data = data[1:2], data[2:3], data[3:]
+        if compression == COMPRESSED:
+            data = zlib.decompress(data)
+
+        if format == b'p':
+            return pickle.loads(data)
+        elif format == b'm':
+            return msgpack.unpackb(data, raw=False, object_hook=_tagger.untag)
+        elif format == b'j':
+            return _tagger.loads(data.decode('utf-8'))
+        raise ValueError(f'Unknown session serialization format {format!r}')
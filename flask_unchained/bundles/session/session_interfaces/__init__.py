@@ -1,11 +1,12 @@
 from flask_session.sessions import (
     NullSessionInterface,
-    RedisSessionInterface,
-    MemcachedSessionInterface,
-    FileSystemSessionInterface,
     MongoDBSessionInterface,
 )
 
+from .base import ServerSideSession, ServerSideSessionInterface
+from .filesystem import FileSystemSessionInterface
+from .memcached import MemcachedSessionInterface
+from .redis import RedisSessionInterface
 from .sqla import SqlAlchemySessionInterface
 
 
@@ -16,4 +17,6 @@ __all__ = [
     'FileSystemSessionInterface',
     'MongoDBSessionInterface',
     'SqlAlchemySessionInterface',
+    'ServerSideSession',
+    'ServerSideSessionInterface',
 ]
@@ -0,0 +1,150 @@
+import hashlib
+import time
+
+from datetime import timedelta
+from flask_session.sessions import (
+    ServerSideSession as BaseServerSideSession, SessionInterface)
+from itsdangerous import BadSignature, want_bytes
+from typing import *
+
+from ..serializers import SessionSerializer
+
+
+class ServerSideSession(BaseServerSideSession):
+    """
+    A server-side session that remembers the digest of its data as it was
+    loaded, and when its expiry in the store was last extended.
+    """
+    loaded_digest: Optional[bytes] = None
+    refreshed_at: Optional[float] = None
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """
+    Base class for server-side session interfaces that only write sessions to
+    the store when their data has changed. Unchanged sessions only get their
+    expiry extended (at most once per ``refresh_interval``), if
+    ``SESSION_REFRESH_EACH_REQUEST`` is enabled.
+
+    Subclasses must implement :meth:`load`, :meth:`save` and :meth:`delete`, and
+    should implement :meth:`touch` if the store supports extending the expiry of
+    an entry without rewriting it.
+
+    :param key_prefix: A prefix that is added to all store keys.
+    :param use_signer: Whether to sign the session id cookie or not.
+    :param permanent: Whether to use permanent session or not.
+    :param refresh_interval: How often to extend the expiry of unchanged sessions.
+    """
+
+    serializer = SessionSerializer()
+    session_class = ServerSideSession
+
+    def __init__(self, key_prefix: str, use_signer: bool = False,
+                 permanent: bool = True,
+                 refresh_interval: Union[timedelta, int] = timedelta(minutes=5)):
+        self.key_prefix = key_prefix
+        self.use_signer = use_signer
+        self.permanent = permanent
+        self.refresh_interval = (refresh_interval.total_seconds()
+                                 if isinstance(refresh_interval, timedelta)
+                                 else refresh_interval)
+
+    def load(self, store_id: str) -> Tuple[Optional[bytes], Optional[float]]:
+        """
+        Load a session from the store.
+
+        :return: A tuple of the serialized session data (or ``None`` if the
+                 session does not exist), and the unix timestamp of when it
+                 expires (or ``None`` if unknown).
+        """
+        raise NotImplementedError
+
+    def save(self, store_id: str, value: bytes, lifetime: timedelta) -> None:
+        """
+        Save a session to the store.
+        """
+        raise NotImplementedError
+
+    def touch(self, store_id: str, value: bytes, lifetime: timedelta) -> None:
+        """
+        Extend the expiry of an unchanged session in the store. Defaults to saving
+        it again.
+        """
+        self.save(store_id, value, lifetime)
+
+    def delete(self, store_id: str) -> None:
+        """
+        Delete a session from the store.
+        """
+        raise NotImplementedError
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(app.session_cookie_name)
+        if not sid:
+            return self.session_class(sid=self._generate_sid(),
+                                      permanent=self.permanent)
+
+        if self.use_signer:
+            signer = self._get_signer(app)
+            if signer is None:
+                return None
+            try:
+                sid = signer.unsign(sid).decode()
+            except BadSignature:
+                return self.session_class(sid=self._generate_sid(),
+                                          permanent=self.permanent)
+
+        value, expires_at = self.load(self.key_prefix + sid)
+        if value is None:
+            return self.session_class(sid=sid, permanent=self.permanent)
+
+        try:
+            data = self.serializer.loads(want_bytes(value))
+        except Exception:
+            return self.session_class(sid=sid, permanent=self.permanent)
+
+        session = self.session_class(data, sid=sid)
+        session.loaded_digest = _digest(value)
+        if expires_at is not None:
+            session.refreshed_at = (expires_at
+                                    - app.permanent_session_lifetime.total_seconds())
+        return session
+
+    def save_session(self, app, session, response):
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        store_id = self.key_prefix + session.sid
+
+        if not session:
+            if session.modified:
+                self.delete(store_id)
+                response.delete_cookie(app.session_cookie_name,
+                                       domain=domain, path=path)
+            return
+
+        value = self.serializer.dumps(dict(session))
+        lifetime = app.permanent_session_lifetime
+        if _digest(value) != session.loaded_digest:
+            self.save(store_id, value, lifetime)
+        elif not self.should_set_cookie(app, session):
+            return
+        elif (session.refreshed_at is None
+                or time.time() - session.refreshed_at >= self.refresh_interval):
+            self.touch(store_id, value, lifetime)
+        else:
+            return
+
+        if self.use_signer:
+            session_id = self._get_signer(app).sign(want_bytes(session.sid))
+        else:
+            session_id = session.sid
+        response.set_cookie(app.session_cookie_name, session_id,
+                            expires=self.get_expiration_time(app, session),
+                            httponly=self.get_cookie_httponly(app),
+                            domain=domain, path=path,
+                            secure=self.get_cookie_secure(app),
+                            samesite=self.get_cookie_samesite(app))
+
+
+def _digest(value: Union[str, bytes]) -> bytes:
+    return hashlib.blake2b(want_bytes(value), digest_size=16).digest()
@@ -0,0 +1,39 @@
+import time
+
+from datetime import timedelta
+
+from .base import ServerSideSessionInterface
+
+
+class FileSystemSessionInterface(ServerSideSessionInterface):
+    """
+    Uses a :class:`werkzeug.contrib.cache.FileSystemCache` as the session backend.
+
+    :param cache_dir: The directory where session files are stored.
+    :param threshold: The maximum number of items the session stores before it
+                      starts deleting some.
+    :param mode: The file mode wanted for the session files.
+    """
+
+    def __init__(self, cache_dir, threshold, mode, key_prefix, use_signer=False,
+                 permanent=True, refresh_interval=timedelta(minutes=5)):
+        super().__init__(key_prefix, use_signer, permanent, refresh_interval)
+        from werkzeug.contrib.cache import FileSystemCache
+        self.cache = FileSystemCache(cache_dir, threshold=threshold, mode=mode)
+
+    def load(self, store_id):
+        entry = self.cache.get(store_id)
+        if isinstance(entry, dict):
+            # stored by Flask-Session (as an unserialized dict)
+            return self.serializer.dumps(entry), None
+        elif entry is None:
+            return None, None
+        expires_at, value = entry
+        return value, expires_at
+
+    def save(self, store_id, value, lifetime):
+        timeout = int(lifetime.total_seconds())
+        self.cache.set(store_id, (time.time() + timeout, value), timeout)
+
+    def delete(self, store_id):
+        self.cache.delete(store_id)
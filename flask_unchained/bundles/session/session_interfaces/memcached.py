@@ -0,0 +1,61 @@
+import time
+
+from datetime import timedelta
+
+from .base import ServerSideSessionInterface
+
+
+class MemcachedSessionInterface(ServerSideSessionInterface):
+    """
+    Uses memcached as the session backend. Memcached cannot tell when an entry
+    expires, so unchanged sessions have their expiry extended with ``touch`` on
+    every request (if the client supports it, otherwise they get saved again).
+
+    :param client: A ``memcache.Client`` (or ``pylibmc.Client``) instance.
+    """
+
+    def __init__(self, client, key_prefix, use_signer=False, permanent=True,
+                 refresh_interval=timedelta(minutes=5)):
+        super().__init__(key_prefix, use_signer, permanent, refresh_interval)
+        if client is None:
+            client = self._get_preferred_memcache_client()
+            if client is None:
+                raise RuntimeError('no memcache module found')
+        self.client = client
+
+    def load(self, store_id):
+        return self.client.get(store_id), None
+
+    def save(self, store_id, value, lifetime):
+        self.client.set(store_id, value, self._get_memcache_timeout(lifetime))
+
+    def touch(self, store_id, value, lifetime):
+        if not hasattr(self.client, 'touch'):
+            return self.save(store_id, value, lifetime)
+        self.client.touch(store_id, self._get_memcache_timeout(lifetime))
+
+    def delete(self, store_id):
+        self.client.delete(store_id)
+
+    def _get_preferred_memcache_client(self):
+        servers = ['127.0.0.1:11211']
+        try:
+            import pylibmc
+        except ImportError:
+            pass
+        else:
+            return pylibmc.Client(servers)
+
+        try:
+            import memcache
+        except ImportError:
+            pass
+        else:
+            return memcache.Client(servers)
+
+    def _get_memcache_timeout(self, lifetime: timedelta) -> int:
+        timeout = int(lifetime.total_seconds())
+        # memcached treats timeouts longer than 30 days as unix timestamps
+        if timeout > 60 * 60 * 24 * 30:
+            timeout += int(time.time())
+        return timeout
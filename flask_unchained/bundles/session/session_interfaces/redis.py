@@ -0,0 +1,41 @@
+import time
+
+from datetime import timedelta
+
+from .base import ServerSideSessionInterface
+
+
+class RedisSessionInterface(ServerSideSessionInterface):
+    """
+    Uses Redis as the session backend. Unchanged sessions have their expiry
+    extended with ``EXPIRE``.
+
+    :param redis: A ``redis.Redis`` instance.
+    """
+
+    def __init__(self, redis, key_prefix, use_signer=False, permanent=True,
+                 refresh_interval=timedelta(minutes=5)):
+        super().__init__(key_prefix, use_signer, permanent, refresh_interval)
+        if redis is None:
+            from redis import Redis
+            redis = Redis()
+        self.redis = redis
+
+    def load(self, store_id):
+        # GET and TTL don't need to be atomic, so skip wrapping them in MULTI/EXEC
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.get(store_id)
+        pipe.ttl(store_id)
+        value, ttl = pipe.execute()
+        if value is None or ttl is None or ttl < 0:
+            return value, None
+        return value, time.time() + ttl
+
+    def save(self, store_id, value, lifetime):
+        self.redis.setex(name=store_id, value=value, time=lifetime)
+
+    def touch(self, store_id, value, lifetime):
+        self.redis.expire(store_id, lifetime)
+
+    def delete(self, store_id):
+        self.redis.delete(store_id)
@@ -1,5 +1,6 @@
-from flask_session import (
-    SqlAlchemySessionInterface as BaseSqlAlchemySessionInterface)
+from datetime import datetime, timedelta, timezone
+
+from .base import ServerSideSessionInterface
 
 try:
     from sqlalchemy import types
@@ -7,13 +8,21 @@ except ImportError:
     types = None
 
 
-class SqlAlchemySessionInterface(BaseSqlAlchemySessionInterface):
+class SqlAlchemySessionInterface(ServerSideSessionInterface):
+    """
+    Uses SQLAlchemy as the session backend. Unchanged sessions have their expiry
+    extended by updating only the ``expiry`` column.
+
+    :param db: A :class:`~flask_unchained.bundles.sqlalchemy.SQLAlchemy` instance.
+    :param table: The name of the sessions table.
+    :param model_class: A custom session model class to use.
+    """
+
     def __init__(self, db, table, key_prefix, use_signer=False,
-                 permanent=True, model_class=None):
+                 permanent=True, model_class=None,
+                 refresh_interval=timedelta(minutes=5)):
+        super().__init__(key_prefix, use_signer, permanent, refresh_interval)
         self.db = db
-        self.key_prefix = key_prefix
-        self.use_signer = use_signer
-        self.permanent = permanent
 
         if model_class is not None:
             self.sql_session_model = model_class
@@ -25,7 +34,7 @@ class SqlAlchemySessionInterface(BaseSqlAlchemySessionInterface):
             id = db.Column(db.Integer, primary_key=True)
             session_id = db.Column(db.String(255), unique=True)
             data = db.Column(db.LargeBinary)
-            expiry = db.Column(types.DateTime, nullable=True)
+            expiry = db.Column(types.DateTime, nullable=True, index=True)
 
             def __init__(self, session_id, data, expiry):
                 self.session_id = session_id
@@ -36,3 +45,65 @@ class SqlAlchemySessionInterface(BaseSqlAlchemySessionInterface):
                 return '<Session data %s>' % self.data
 
         self.sql_session_model = Session
+
+    def load(self, store_id):
+        Session = self.sql_session_model
+        row = self.db.session.query(Session.data, Session.expiry).filter_by(
+            session_id=store_id).first()
+        if row is None:
+            return None, None
+
+        data, expiry = row
+        if expiry is None:
+            return data, None
+
+        expires_at = expiry.replace(tzinfo=timezone.utc).timestamp()
+        if expiry <= datetime.utcnow():
+            self.delete(store_id)
+            return None, None
+        return data, expires_at
+
+    def save(self, store_id, value, lifetime):
+        expiry = datetime.utcnow() + lifetime
+        if not self._update(store_id, data=value, expiry=expiry):
+            self.db.session.add(self.sql_session_model(store_id, value, expiry))
+        self.db.session.commit()
+
+    def touch(self, store_id, value, lifetime):
+        if self._update(store_id, expiry=datetime.utcnow() + lifetime):
+            self.db.session.commit()
+        else:
+            self.save(store_id, value, lifetime)
+
+    def delete(self, store_id):
+        self.sql_session_model.query.filter_by(session_id=store_id).delete(
+            synchronize_session=False)
+        self.db.session.commit()
+
+    def delete_expired(self, batch_size: int = 1000) -> int:
+        """
+        Delete expired sessions, in batches of (at most) ``batch_size`` sessions
+        per transaction, so that the table is never locked for long.
+
+        :return: The number of sessions deleted.
+        """
+        Session = self.sql_session_model
+        now = datetime.utcnow()
+        count = 0
+        last_id = None
+        while True:
+            query = self.db.session.query(Session.id).filter(Session.expiry <= now)
+            if last_id is not None:
+                query = query.filter(Session.id > last_id)
+            ids = [id for id, in query.order_by(Session.id).limit(batch_size)]
+            if not ids:
+                return count
+
+            count += Session.query.filter(Session.id.in_(ids)).delete(
+                synchronize_session=False)
+            self.db.session.commit()
+            last_id = ids[-1]
+
+    def _update(self, store_id, **values) -> int:
+        return self.sql_session_model.query.filter_by(session_id=store_id).update(
+            values, synchronize_session=False)
@@ -0,0 +1,26 @@
+from flask import current_app
+
+try:
+    from flask_unchained.bundles.celery import celery
+except ImportError:
+    celery = None
+
+
+def delete_expired_sessions(batch_size=1000):
+    """
+    Celery task to delete expired sessions from the database (when using the
+    ``sqlalchemy`` ``SESSION_TYPE``). To run it periodically, add it to the beat
+    schedule in your config::
+
+        CELERY_BEAT_SCHEDULE = {
+            'delete-expired-sessions': {
+                'task': 'flask_unchained.bundles.session.tasks.delete_expired_sessions',
+                'schedule': timedelta(hours=1),
+            },
+        }
+    """
+    return current_app.session_interface.delete_expired(batch_size=batch_size)
+
+
+if celery:
+    delete_expired_sessions = celery.task(delete_expired_sessions)
@@ -1,5 +1,6 @@
 from flask_sqlalchemy_unchained import BaseQuery
-from flask_unchained import Bundle
+from flask_unchained import Bundle, FlaskUnchained
+from sqlalchemy.orm import configure_mappers
 from sqlalchemy_unchained import ValidationError, ValidationErrors
 
 from .alembic import MaterializedViewMigration
@@ -19,3 +20,9 @@ class SQLAlchemyBundle(Bundle):
         """
         A lookup of model classes keyed by class name.
         """
+
+    def warmup(self, app: FlaskUnchained):
+        """
+        Configure all of the SQLAlchemy mappers up front (instead of on first use).
+        """
+        configure_mappers()
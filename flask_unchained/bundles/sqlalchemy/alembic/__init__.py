@@ -1 +1,2 @@
+from .batch_backfill import BatchBackfillOp
 from .materialized_view import MaterializedViewMigration
@@ -0,0 +1,255 @@
+import contextlib
+import hashlib
+import logging
+import sqlalchemy as sa
+import time
+
+from alembic.autogenerate import renderers
+from alembic.operations import Operations
+from sqlalchemy.sql.elements import ClauseElement
+
+from .reversible_op import ReversibleOp
+
+
+logger = logging.getLogger('alembic.batch_backfill')
+
+PROGRESS_TABLE_NAME = 'alembic_batch_backfill'
+
+
+class BatchBackfill:
+    def __init__(self, table_name, set_, where=None, reverse_set=None,
+                 reverse_where=None, batch_size=1000, sleep=0, pk='id',
+                 schema=None):
+        if reverse_set is not None and where is not None and reverse_where is None:
+            # the rows matching `where` usually don't match it anymore once
+            # they've been backfilled, so it can't be reused for the reverse
+            raise ValueError(f'The batch backfill of {table_name} has a where '
+                             'clause, so reversing it requires reverse_where.')
+        self.table_name = table_name
+        self.set_ = set_
+        self.where = where
+        self.reverse_set = reverse_set
+        self.reverse_where = reverse_where
+        self.batch_size = batch_size
+        self.sleep = sleep
+        self.pk = pk
+        self.schema = schema
+
+    @property
+    def key(self):
+        """
+        Identifies this backfill in the progress table, so that it can be resumed.
+        """
+        definition = repr((sorted((k, str(v)) for k, v in self.set_.items()),
+                           str(self.where)))
+        digest = hashlib.sha1(definition.encode('utf-8')).hexdigest()[:12]
+        return f'{self.table_name}:{digest}'
+
+    def reversed(self):
+        if self.reverse_set is None:
+            raise NotImplementedError(
+                f'The batch backfill of {self.table_name} is not reversible. '
+                'Pass reverse_set to make it reversible.')
+        return BatchBackfill(self.table_name, self.reverse_set,
+                             where=self.reverse_where, reverse_set=self.set_,
+                             reverse_where=self.where, batch_size=self.batch_size,
+                             sleep=self.sleep, pk=self.pk, schema=self.schema)
+
+    def get_table(self):
+        columns = [self.pk] + [name for name in self.set_ if name != self.pk]
+        return sa.Table(self.table_name, sa.MetaData(),
+                        *[sa.Column(name) for name in columns],
+                        schema=self.schema)
+
+    def get_where_clause(self):
+        if self.where is None:
+            return sa.true()
+        elif isinstance(self.where, str):
+            return sa.text(self.where)
+        return self.where
+
+
+@Operations.register_operation('batch_backfill', 'batch_backfill')
+class BatchBackfillOp(ReversibleOp):
+    """
+    Updates the rows of a table in batches, walking its primary key in order and
+    committing after each batch, so that large data migrations don't lock the
+    table for their entire duration. Progress is recorded in the
+    ``alembic_batch_backfill`` table, so an interrupted backfill resumes from the
+    last committed batch when the migration gets run again. Usage::
+
+        def upgrade():
+            op.add_column('user', sa.Column('display_name', sa.String(), nullable=True))
+            op.batch_backfill('user',
+                              set_={'display_name': sa.text('username')},
+                              where='display_name IS NULL',
+                              reverse_set={'display_name': None},
+                              reverse_where='display_name IS NOT NULL',
+                              batch_size=5000, sleep=0.1)
+
+    **NOTE:** Committing per batch also commits any prior operations of the
+    current migration transaction, so it's best to keep backfills in their own
+    migration revisions.
+    """
+
+    @classmethod
+    def batch_backfill(cls, operations, table_name, set_, where=None,
+                       reverse_set=None, reverse_where=None, batch_size=1000,
+                       sleep=0, pk='id', schema=None):
+        """
+        :param table_name: The name of the table to update.
+        :param set_: A dictionary of column names to their new values (literal
+                     values or SQL expressions).
+        :param where: An optional SQL string or expression to filter which rows
+                      get updated.
+        :param reverse_set: An optional dictionary of column names to values, used
+                            to reverse the backfill in the downgrade direction.
+        :param reverse_where: An optional SQL string or expression to filter which
+                              rows get updated when reversing the backfill.
+                              Required to reverse backfills with a ``where``.
+        :param batch_size: How many rows to update per batch.
+        :param sleep: How many seconds to sleep between batches.
+        :param pk: The name of the (single) primary key column to walk.
+        :param schema: The optional schema of the table.
+        """
+        backfill = BatchBackfill(table_name, set_, where=where,
+                                 reverse_set=reverse_set,
+                                 reverse_where=reverse_where,
+                                 batch_size=batch_size, sleep=sleep, pk=pk,
+                                 schema=schema)
+        return operations.invoke(cls(backfill))
+
+    def reverse(self):
+        return BatchBackfillOp(self.target.reversed())
+
+
+@renderers.dispatch_for(BatchBackfillOp)
+def render_batch_backfill(autogen_context, op):
+    def render_value(value):
+        if isinstance(value, ClauseElement):
+            return f'sa.text({str(value)!r})'
+        return repr(value)
+
+    def render_dict(values):
+        items = ', '.join(f'{k!r}: {render_value(v)}' for k, v in values.items())
+        return f'{{{items}}}'
+
+    backfill = op.target
+    args = [repr(backfill.table_name), f'set_={render_dict(backfill.set_)}']
+    if backfill.where is not None:
+        args.append(f'where={render_value(backfill.where)}')
+    if backfill.reverse_set is not None:
+        args.append(f'reverse_set={render_dict(backfill.reverse_set)}')
+    if backfill.reverse_where is not None:
+        args.append(f'reverse_where={render_value(backfill.reverse_where)}')
+    args.append(f'batch_size={backfill.batch_size!r}')
+    args.append(f'sleep={backfill.sleep!r}')
+    if backfill.pk != 'id':
+        args.append(f'pk={backfill.pk!r}')
+    if backfill.schema:
+        args.append(f'schema={backfill.schema!r}')
+    return f'op.batch_backfill({", ".join(args)})'
+
+
+@Operations.implementation_for(BatchBackfillOp)
+def batch_backfill(operations, operation):
+    backfill = operation.target
+    table = backfill.get_table()
+    where = backfill.get_where_clause()
+
+    if operations.get_context().as_sql:
+        operations.execute(table.update().where(where).values(backfill.set_))
+        return
+
+    conn = operations.get_bind()
+    progress = sa.Table(PROGRESS_TABLE_NAME, sa.MetaData(),
+                        sa.Column('key', sa.String(255), primary_key=True),
+                        sa.Column('last_pk', sa.String(255), nullable=False))
+    progress.create(conn, checkfirst=True)
+
+    key = backfill.key
+    pk = table.c[backfill.pk]
+    last_pk = conn.execute(sa.select([progress.c.last_pk])
+                           .where(progress.c.key == key)).scalar()
+    if last_pk is not None:
+        last_pk = _parse_pk(conn, backfill, last_pk)
+        logger.info(f'Resuming backfill of {backfill.table_name} after '
+                    f'{backfill.pk}={last_pk}')
+
+    total = 0
+    start = time.time()
+    while True:
+        query = sa.select([pk]).where(where).order_by(pk).limit(backfill.batch_size)
+        if last_pk is not None:
+            query = query.where(pk > last_pk)
+
+        with _begin(conn):
+            pks = [row[0] for row in conn.execute(query)]
+            if not pks:
+                break
+
+            in_batch = pk <= pks[-1] if last_pk is None \
+                else sa.and_(pk > last_pk, pk <= pks[-1])
+            result = conn.execute(table.update()
+                                  .where(sa.and_(in_batch, where))
+                                  .values(backfill.set_))
+            last_pk = pks[-1]
+            total += result.rowcount
+
+            conn.execute(progress.delete().where(progress.c.key == key))
+            conn.execute(progress.insert().values(key=key, last_pk=str(last_pk)))
+        _commit(conn)
+
+        elapsed = time.time() - start
+        logger.info(f'Backfilled {total} rows of {backfill.table_name} '
+                    f'({total / elapsed if elapsed else total:.0f} rows/sec), '
+                    f'through {backfill.pk}={last_pk}')
+        if backfill.sleep:
+            time.sleep(backfill.sleep)
+
+    # drop the progress table once no backfills are in progress anymore, so that
+    # it doesn't show up in autogenerated migrations
+    with _begin(conn):
+        conn.execute(progress.delete().where(progress.c.key == key))
+        if not conn.execute(
+                sa.select([sa.func.count()]).select_from(progress)).scalar():
+            progress.drop(conn)
+    _commit(conn)
+    logger.info(f'Finished backfilling {total} rows of {backfill.table_name}')
+
+
+def _begin(conn):
+    """
+    Begin a transaction for a batch. When the migration runs in a transaction of
+    its own (ie with transactional DDL), batches are part of it instead, and they
+    get committed by :func:`_commit`.
+    """
+    if conn.in_transaction():
+        return contextlib.suppress()
+    return conn.begin()
+
+
+def _commit(conn):
+    """
+    Commit the migration's transaction, if it runs in one. Alembic holds on to
+    the SQLAlchemy transaction object (and commits it when the migration is done),
+    so the commit is issued through the connection's dialect, the same way the
+    transaction object does, and the database implicitly begins a new one.
+    """
+    if conn.in_transaction():
+        conn.dialect.do_commit(conn.connection)
+
+
+def _parse_pk(conn, backfill, value):
+    """
+    Convert a primary key value that was stored as a string in the progress
+    table back to the primary key column's type.
+    """
+    for column in sa.inspect(conn).get_columns(backfill.table_name,
+                                               schema=backfill.schema):
+        if column['name'] == backfill.pk:
+            try:
+                return column['type'].python_type(value)
+            except (NotImplementedError, TypeError, ValueError):
+                break
+    return value
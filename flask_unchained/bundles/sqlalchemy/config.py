@@ -16,6 +16,21 @@ class Config(BundleConfig):
     for more info.
     """
 
+    SQLALCHEMY_REPLICA_URIS = None
+    """
+    An optional list of database URIs for read replicas of the primary database.
+    Read-only queries issued inside of :meth:`SessionManager.read_replica` blocks
+    (including those from the ``list_loader`` and ``param_converter`` decorators)
+    will be routed to them round-robin. Writes, and any queries issued after the
+    session has written to the primary, always go to the primary.
+    """
+
+    SQLALCHEMY_REPLICA_GET_REQUESTS = False
+    """
+    Whether or not to route *all* read-only queries issued while handling ``GET``,
+    ``HEAD`` and ``OPTIONS`` requests to the read replicas.
+    """
+
     SQLALCHEMY_TRANSACTION_ISOLATION_LEVEL = None
     """
     Set the engine-wide transaction isolation level.
@@ -94,6 +109,21 @@ class Config(BundleConfig):
 
     SQLALCHEMY_COMMIT_ON_TEARDOWN = False
 
+    SQLALCHEMY_QUERY_STATS = False
+    """
+    Whether or not to record the number of SQL statements executed per request,
+    how long they took, and to detect likely N+1 queries (the same normalized
+    statement being executed repeatedly). When enabled, the ``X-Query-Count`` and
+    ``X-Query-Time`` (in milliseconds) headers are added to responses, and likely
+    N+1 queries are logged as warnings. Enabled by default in development.
+    """
+
+    SQLALCHEMY_QUERY_STATS_DUPLICATE_THRESHOLD = 3
+    """
+    How many times the same normalized statement must be executed during a request
+    before it gets reported as a likely N+1 query.
+    """
+
     PY_YAML_FIXTURES_DIR = 'db/fixtures'
 
     ALEMBIC = {
@@ -106,5 +136,9 @@ class Config(BundleConfig):
     }
 
 
+class DevConfig(Config):
+    SQLALCHEMY_QUERY_STATS = True
+
+
 class TestConfig(Config):
     SQLALCHEMY_DATABASE_URI = 'sqlite://'  # :memory:
@@ -1,6 +1,10 @@
+import itertools
+
+from flask import request
+from flask_sqlalchemy import _EngineConnector as _BaseEngineConnector, get_state
 from flask_sqlalchemy_unchained import SQLAlchemyUnchained as BaseSQLAlchemy, BaseQuery
 from sqlalchemy import event
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.sql.naming import (ConventionDict, _get_convention,
                                    conv as converted_name)
 from sqlalchemy_unchained import (DeclarativeMeta, BaseValidator, Required,
@@ -10,6 +14,34 @@ from .. import sqla
 from ..base_model import BaseModel
 from ..services import SessionManager
 from ..model_registry import UnchainedModelRegistry  # required so the correct one gets used
+from ..query_stats import (
+    _query_stats_stack, QueryStats, register_query_stats_listeners)
+from ..routing_session import RoutingSession
+
+
+class _EngineConnector(_BaseEngineConnector):
+    def __init__(self, sa, app, bind=None):
+        super().__init__(sa, app, bind)
+        self._instrumented_engine = None
+
+    def get_engine(self):
+        engine = super().get_engine()
+        if engine is not self._instrumented_engine:
+            register_query_stats_listeners(engine)
+            self._instrumented_engine = engine
+        return engine
+
+
+class _ReplicaBind(int):
+    """
+    Key for the engine connector of the read replica at this index in the
+    ``SQLALCHEMY_REPLICA_URIS`` config option.
+    """
+
+
+class _ReplicaEngineConnector(_EngineConnector):
+    def get_uri(self):
+        return self._app.config['SQLALCHEMY_REPLICA_URIS'][self._bind]
 
 
 class SQLAlchemyUnchained(BaseSQLAlchemy):
@@ -27,6 +59,7 @@ class SQLAlchemyUnchained(BaseSQLAlchemy):
                          query_class=query_class,
                          model_class=model_class)
         SessionManager.set_session_factory(lambda: self.session())
+        self._replica_counter = itertools.count()
 
         self.Column = sqla.Column
         self.BigInteger = sqla.BigInteger
@@ -118,6 +151,71 @@ class SQLAlchemyUnchained(BaseSQLAlchemy):
             self.relationship = sqla._relationship_type_hinter_
             self.session = Session
 
+    def init_app(self, app):
+        super().init_app(app)
+        if app.config.get('SQLALCHEMY_QUERY_STATS'):
+            app.before_request(self._start_query_stats)
+            app.after_request(self._report_query_stats)
+            app.teardown_request(self._stop_query_stats)
+
+    def create_session(self, options):
+        return sessionmaker(class_=RoutingSession, db=self, **options)
+
+    def make_connector(self, app=None, bind=None):
+        if isinstance(bind, _ReplicaBind):
+            return _ReplicaEngineConnector(self, self.get_app(app), bind)
+        return _EngineConnector(self, self.get_app(app), bind)
+
+    def get_replica_engine(self, app=None):
+        """
+        Returns the engine for the next read replica (round-robin), or ``None``
+        if no replicas are configured.
+        """
+        app = self.get_app(app)
+        replica_uris = app.config.get('SQLALCHEMY_REPLICA_URIS')
+        if not replica_uris:
+            return None
+
+        index = next(self._replica_counter) % len(replica_uris)
+        return self.get_engine(app, bind=_ReplicaBind(index))
+
+    def dispose_engines(self, app=None):
+        """
+        Dispose the connection pools of all the engines created so far (the
+        default one, the ones for ``SQLALCHEMY_BINDS``, and the read replicas),
+        eg so that forked processes don't share connections with their parent.
+        """
+        state = get_state(self.get_app(app))
+        with self._engine_lock:
+            connectors = list(state.connectors.values())
+        for connector in connectors:
+            if connector._engine is not None:
+                connector._engine.dispose()
+
+    def _start_query_stats(self):
+        request._query_stats = QueryStats(parent=_query_stats_stack.top)
+        _query_stats_stack.push(request._query_stats)
+
+    def _report_query_stats(self, response):
+        stats = getattr(request, '_query_stats', None)
+        if stats is None:
+            return response
+
+        response.headers['X-Query-Count'] = str(stats.count)
+        response.headers['X-Query-Time'] = f'{stats.total_time * 1000:.2f}'
+
+        app = self.get_app()
+        threshold = app.config.get('SQLALCHEMY_QUERY_STATS_DUPLICATE_THRESHOLD')
+        for statement, count in stats.duplicates(threshold).items():
+            app.logger.warning(f'Likely N+1 query ({count} times) during '
+                               f'{request.method} {request.path}: {statement}')
+        return response
+
+    def _stop_query_stats(self, exc=None):
+        stats = getattr(request, '_query_stats', None)
+        if stats is not None and _query_stats_stack.top is stats:
+            _query_stats_stack.pop()
+
     def _set_constraint_name(self, const, table):
         fmt = _get_convention(self.metadata.naming_convention, type(const))
         if not fmt:
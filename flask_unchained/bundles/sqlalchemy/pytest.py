@@ -1,17 +1,33 @@
 import factory
+import hashlib
+import os
 import pytest
+import shutil
 
+from contextlib import contextmanager
+from copy import copy
 from flask_unchained import unchained, injectable
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.schema import CreateIndex, CreateTable
+from weakref import WeakKeyDictionary
 
 # must import the model registry here so the right one gets used
 from .model_registry import UnchainedModelRegistry
+from .query_stats import record_queries
 
 
 @pytest.fixture(autouse=True, scope='session')
-def db(app):
+def db(app, request):
+    """
+    Creates the database tables once per test session. When running with
+    pytest-xdist, each worker gets its own database. For SQLite file databases,
+    the schema is restored from a snapshot stored in the pytest cache, and for
+    PostgreSQL databases it's cloned from a template database. Snapshots are keyed
+    by a hash of the models' DDL, so they get rebuilt whenever the models change.
+    """
     db_ext = app.unchained.extensions.db
-    # FIXME might need to reflect the current db, drop, and then create...
-    db_ext.create_all()
+    _create_test_database(app, db_ext, getattr(request.config, 'cache', None))
     yield db_ext
     db_ext.drop_all()
 
@@ -31,6 +47,141 @@ def db_session(db):
         session.remove()
 
 
+@pytest.fixture()
+def query_stats():
+    """
+    Records the SQL statements executed during the test.
+    """
+    with record_queries() as stats:
+        yield stats
+
+
+@contextmanager
+def assert_max_queries(n):
+    """
+    Context manager to assert that at most ``n`` SQL statements get executed
+    inside of it::
+
+        def test_list_users(client):
+            with assert_max_queries(2):
+                client.get('/users')
+    """
+    with record_queries() as stats:
+        yield stats
+
+    if stats.count > n:
+        statements = '\n'.join(f'  {count}x {statement}' for statement, count
+                               in stats.fingerprints.most_common())
+        raise AssertionError(f'Expected at most {n} queries, but {stats.count} '
+                             f'were executed:\n{statements}')
+
+
+def _create_test_database(app, db, cache=None):
+    base_url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    url = _get_worker_url(base_url)
+    app.config['SQLALCHEMY_DATABASE_URI'] = str(url)
+
+    if (not url.database or url.database == ':memory:'
+            or app.config.get('SQLALCHEMY_BINDS')):
+        return db.create_all()
+
+    schema_hash = _get_schema_hash(db, db.get_engine(app).dialect)
+    if url.drivername.startswith('sqlite') and cache is not None:
+        return _restore_sqlite_snapshot(app, db, url, cache, schema_hash)
+    elif url.drivername.startswith('postgresql'):
+        return _restore_postgres_template(app, db, url, base_url, schema_hash)
+    db.create_all()
+
+
+def _get_worker_url(url):
+    worker_id = os.getenv('PYTEST_XDIST_WORKER')
+    if not worker_id or not url.database or url.database == ':memory:':
+        return url
+
+    url = copy(url)
+    if url.drivername.startswith('sqlite'):
+        root, ext = os.path.splitext(url.database)
+        url.database = f'{root}_{worker_id}{ext}'
+    elif url.drivername.startswith('postgresql'):
+        url.database = f'{url.database}_{worker_id}'
+    return url
+
+
+def _get_schema_hash(db, dialect):
+    ddl = []
+    for table in db.metadata.sorted_tables:
+        ddl.append(str(CreateTable(table).compile(dialect=dialect)))
+        for index in sorted(table.indexes, key=lambda idx: idx.name or ''):
+            ddl.append(str(CreateIndex(index).compile(dialect=dialect)))
+    return hashlib.sha1('\n'.join(ddl).encode('utf-8')).hexdigest()
+
+
+def _restore_sqlite_snapshot(app, db, url, cache, schema_hash):
+    db_path = url.database
+    if not os.path.isabs(db_path):
+        db_path = os.path.join(app.root_path, db_path)
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+    snapshot_path = os.path.join(str(cache.makedir('sqlalchemy_bundle')),
+                                 f'{schema_hash}.sqlite')
+    db.get_engine(app).dispose()
+    if os.path.exists(snapshot_path):
+        shutil.copyfile(snapshot_path, db_path)
+        return
+
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    db.create_all()
+    db.get_engine(app).dispose()
+
+    # copy then rename, so that concurrent workers never see a partial snapshot
+    tmp_path = f'{snapshot_path}.{os.getpid()}'
+    shutil.copyfile(db_path, tmp_path)
+    os.replace(tmp_path, snapshot_path)
+
+
+def _restore_postgres_template(app, db, url, base_url, schema_hash):
+    template_url = copy(base_url)
+    template_url.database = f'{base_url.database}_template_{schema_hash[:12]}'
+    maintenance_url = copy(base_url)
+    maintenance_url.database = 'postgres'
+
+    db.get_engine(app).dispose()
+    engine = create_engine(maintenance_url, isolation_level='AUTOCOMMIT')
+    with engine.connect() as conn:
+        # serialize template creation across pytest-xdist workers
+        lock_key = dict(name=template_url.database)
+        conn.execute(text('SELECT pg_advisory_lock(hashtext(:name))'), **lock_key)
+        try:
+            exists = conn.execute(
+                text('SELECT 1 FROM pg_database WHERE datname = :name'),
+                **lock_key).scalar()
+            if not exists:
+                conn.execute(f'CREATE DATABASE "{template_url.database}"')
+                template_engine = create_engine(template_url)
+                db.metadata.create_all(bind=template_engine)
+                template_engine.dispose()
+
+            conn.execute(f'DROP DATABASE IF EXISTS "{url.database}"')
+            conn.execute(f'CREATE DATABASE "{url.database}" '
+                         f'TEMPLATE "{template_url.database}"')
+        finally:
+            conn.execute(text('SELECT pg_advisory_unlock(hashtext(:name))'),
+                         **lock_key)
+    engine.dispose()
+
+
+_unique_column_names = WeakKeyDictionary()
+
+
+def _get_unique_column_names(model_class):
+    if model_class not in _unique_column_names:
+        _unique_column_names[model_class] = {
+            col.name for col in model_class.__mapper__.columns
+            if col.primary_key or col.unique}
+    return _unique_column_names[model_class]
+
+
 class ModelFactory(factory.Factory):
     class Meta:
         abstract = True
@@ -41,19 +192,10 @@ class ModelFactory(factory.Factory):
         # make sure we get the correct mapped class
         model_class = unchained.sqlalchemy_bundle.models[model_class.__name__]
 
-        # try to query for existing by primary key or unique column(s)
-        filter_kwargs = {}
-        for col in model_class.__mapper__.columns:
-            if col.name in kwargs and (col.primary_key or col.unique):
-                filter_kwargs[col.name] = kwargs[col.name]
-
-        # otherwise try by all simple type values
-        if not filter_kwargs:
-            filter_kwargs = {k: v for k, v in kwargs.items()
-                             if '__' not in k
-                             and (v is None
-                                  or isinstance(v, (bool, int, str, float)))}
-
+        # try to query for existing by primary key or unique column(s). if
+        # none were given, there's no need to check for an existing instance
+        filter_kwargs = {k: kwargs[k] for k in _get_unique_column_names(model_class)
+                         if k in kwargs}
         instance = (model_class.query.filter_by(**filter_kwargs).one_or_none()
                     if filter_kwargs else None)
 
@@ -0,0 +1,122 @@
+import re
+import time
+
+from collections import Counter
+from contextlib import contextmanager
+from functools import lru_cache
+from sqlalchemy import event
+from werkzeug.local import LocalStack
+
+
+_query_stats_stack = LocalStack()
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PARAM_RE = re.compile(r'%\(\w+\)s|%s|(?<!:):\w+|\$\d+')
+_IN_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(statement: str) -> str:
+    """
+    Normalize a SQL statement, so that statements differing only by their
+    parameter values (and whitespace) share the same fingerprint.
+    """
+    statement = _STRING_RE.sub('?', statement)
+    statement = _PARAM_RE.sub('?', statement)
+    statement = _NUMBER_RE.sub('?', statement)
+    statement = _IN_LIST_RE.sub('(?)', statement)
+    return _WHITESPACE_RE.sub(' ', statement).strip()
+
+
+class QueryStats:
+    """
+    Statistics about the SQL statements executed while recording.
+    """
+
+    def __init__(self, parent=None):
+        self.parent = parent
+
+        self.count = 0
+        """
+        The number of statements executed.
+        """
+
+        self.total_time = 0.0
+        """
+        The total time spent executing statements, in seconds.
+        """
+
+        self.fingerprints = Counter()
+        """
+        A counter of normalized statements (see :func:`fingerprint`).
+        """
+
+    def record(self, statement: str, duration: float):
+        stats = self
+        statement = fingerprint(statement)
+        while stats is not None:
+            stats.count += 1
+            stats.total_time += duration
+            stats.fingerprints[statement] += 1
+            stats = stats.parent
+
+    def duplicates(self, threshold: int = 2):
+        """
+        Returns a dictionary of the fingerprints that were executed at least
+        ``threshold`` times (ie likely N+1 queries), and how many times each ran.
+        """
+        return {statement: count for statement, count in self.fingerprints.items()
+                if count >= threshold}
+
+    def __repr__(self):
+        return (f'<QueryStats count={self.count} '
+                f'total_time={self.total_time * 1000:.2f}ms>')
+
+
+def get_query_stats():
+    """
+    Returns the :class:`QueryStats` currently being recorded, if any.
+    """
+    return _query_stats_stack.top
+
+
+@contextmanager
+def record_queries():
+    """
+    Context manager to record the statements executed inside of it::
+
+        with record_queries() as stats:
+            users = User.query.all()
+        print(stats.count, stats.total_time, stats.duplicates())
+
+    Recordings can be nested; statements are counted by all active recordings.
+    """
+    stats = QueryStats(parent=_query_stats_stack.top)
+    _query_stats_stack.push(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats_stack.pop()
+
+
+def register_query_stats_listeners(engine):
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context,
+                           executemany):
+    if _query_stats_stack.top is not None:
+        conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context,
+                          executemany):
+    stats = _query_stats_stack.top
+    start_times = conn.info.get('query_start_time')
+    if stats is None or not start_times:
+        return
+
+    stats.record(statement, time.perf_counter() - start_times.pop())
@@ -0,0 +1,89 @@
+from contextlib import contextmanager
+
+from flask import has_request_context, request
+from flask_sqlalchemy import SignallingSession
+from sqlalchemy.sql.expression import SelectBase
+
+
+READ_ONLY_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+
+class RoutingSession(SignallingSession):
+    """
+    The database session used by :class:`SQLAlchemyUnchained`. It extends
+    Flask-SQLAlchemy's session to route read-only queries to the read replicas
+    configured by ``SQLALCHEMY_REPLICA_URIS`` (round-robin), while writes (and
+    everything else) go to the primary database.
+
+    Reads are only routed to a replica if:
+
+    - the query is a plain ``SELECT`` (without ``FOR UPDATE``)
+    - the session is not flushing, nor inside a nested transaction
+    - the session has not written anything yet (read-your-writes stickiness:
+      once a session has flushed or committed, all of its remaining queries, ie
+      for the rest of the current request, go to the primary)
+    - the query was issued inside a :meth:`read_replica` block (as used by
+      ``list_loader`` and ``param_converter``), or while handling a ``GET``
+      request with ``SQLALCHEMY_REPLICA_GET_REQUESTS`` enabled
+    """
+
+    def __init__(self, db, autocommit=False, autoflush=True, **options):
+        super().__init__(db, autocommit=autocommit, autoflush=autoflush, **options)
+        self.db = db
+        self._replica_depth = 0
+        self._primary_depth = 0
+        self._sticky = False
+
+    @contextmanager
+    def read_replica(self):
+        """
+        Context manager to route the read-only queries issued inside of it to
+        the read replicas (if any are configured).
+        """
+        self._replica_depth += 1
+        try:
+            yield self
+        finally:
+            self._replica_depth -= 1
+
+    @contextmanager
+    def primary(self):
+        """
+        Context manager to force all queries issued inside of it to go to the
+        primary database.
+        """
+        self._primary_depth += 1
+        try:
+            yield self
+        finally:
+            self._primary_depth -= 1
+
+    def get_bind(self, mapper=None, clause=None):
+        if self._should_use_replica(mapper, clause):
+            return self.db.get_replica_engine(self.app)
+
+        if self._flushing or not isinstance(clause, (SelectBase, type(None))):
+            self._sticky = True
+        return super().get_bind(mapper, clause)
+
+    def _should_use_replica(self, mapper, clause):
+        if (self._sticky or self._flushing or self._primary_depth
+                or not self.app.config.get('SQLALCHEMY_REPLICA_URIS')):
+            return False
+
+        if (not isinstance(clause, SelectBase)
+                or getattr(clause, '_for_update_arg', None) is not None):
+            return False
+
+        if mapper is not None and mapper.mapped_table.info.get('bind_key'):
+            return False
+
+        if self.transaction is not None and self.transaction.nested:
+            return False
+
+        if self._replica_depth:
+            return True
+
+        return (self.app.config.get('SQLALCHEMY_REPLICA_GET_REQUESTS')
+                and has_request_context()
+                and request.method in READ_ONLY_METHODS)
@@ -1,9 +1,20 @@
+from contextlib import contextmanager
+
 from flask_unchained import BaseService
 from flask_unchained.di import _ServiceMetaclass
 from sqlalchemy_unchained.session_manager import (SessionManager as _SessionManager,
                                                   _SessionManagerMetaclass)
 
 
+@contextmanager
+def _no_read_replica():
+    """
+    Stand-in for :meth:`SessionManager.read_replica` with sessions that don't
+    support routing queries to read replicas.
+    """
+    yield
+
+
 class SessionManagerMetaclass(_ServiceMetaclass, _SessionManagerMetaclass):
     pass
 
@@ -12,3 +23,37 @@ class SessionManager(_SessionManager, BaseService, metaclass=SessionManagerMetac
     """
     The database session manager service.
     """
+
+    @contextmanager
+    def read_replica(self):
+        """
+        Context manager to route the read-only queries issued inside of it to the
+        read replicas configured by ``SQLALCHEMY_REPLICA_URIS``, eg::
+
+            with session_manager.read_replica():
+                users = User.query.all()
+
+        Queries are still sent to the primary if the session has already written
+        to it, so that reads always see the current session's own writes.
+        """
+        read_replica = getattr(self.session, 'read_replica', None)
+        if read_replica is None:
+            yield self
+            return
+
+        with read_replica():
+            yield self
+
+    @contextmanager
+    def primary(self):
+        """
+        Context manager to force all queries issued inside of it to go to the
+        primary database.
+        """
+        primary = getattr(self.session, 'primary', None)
+        if primary is None:
+            yield self
+            return
+
+        with primary():
+            yield self
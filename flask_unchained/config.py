@@ -80,6 +80,18 @@ class AppBundleConfig(BundleConfig):
 class _ConfigDefaults:
     DEBUG = get_boolean_env('FLASK_DEBUG', False)
 
+    WARMUP_ON_STARTUP = get_boolean_env('FLASK_WARMUP_ON_STARTUP', False)
+    """
+    Whether or not to run the warmup stage at the end of the app factory, to
+    perform initialization that would otherwise happen lazily on the first
+    requests each worker serves. See :meth:`flask_unchained.AppFactory.warmup`.
+    """
+
+    WARMUP_TEMPLATES = []
+    """
+    A list of template names (or glob patterns) to compile during warmup.
+    """
+
 
 class _DevConfigDefaults:
     DEBUG = get_boolean_env('FLASK_DEBUG', True)
@@ -83,9 +83,14 @@ def _convert_models(view_kwargs: dict,
 
         filter_by = url_param_name.replace(
             snake_case(model.__name__) + '_', '')
-        instance = model.query.filter_by(**{
-            filter_by: view_kwargs.pop(url_param_name, request.args.get(url_param_name)),
-        }).first()
+        from flask_unchained.bundles.sqlalchemy.services.session_manager import (
+            _no_read_replica)
+        query = model.query
+        with getattr(query.session, 'read_replica', _no_read_replica)():
+            instance = query.filter_by(**{
+                filter_by: view_kwargs.pop(url_param_name,
+                                           request.args.get(url_param_name)),
+            }).first()
 
         if not instance:
             abort(HTTPStatus.NOT_FOUND)
@@ -43,6 +43,7 @@ setup(
         'celery': [
             'celery>=4.2.1',
             'dill>=0.2.8.2',
+            'msgpack>=0.5.6',
         ],
         'dev': [
             'coverage>=4.5.1',
@@ -68,10 +69,7 @@ setup(
             'graphene>=2.1.3',
             'graphene-sqlalchemy>=2.1.0',
         ],
-        'mail': [
-            'beautifulsoup4>=4.6.3',
-            'lxml>=4.2.4',
-        ],
+        'mail': [],
         'oauth': [
             'Flask-OAuthlib>=0.9.5',
         ],
@@ -0,0 +1,138 @@
+import os
+import pytest
+
+from babel.messages.catalog import Catalog
+from babel.messages.mofile import write_mo
+from flask_unchained.bundles.babel import babel, gettext, _get_key_domain_name
+from flask_unchained.bundles.babel.catalogs import (
+    compile_catalogs as _compile_catalogs, load_compiled_catalogs)
+from flask_unchained.bundles.babel.commands import compile_catalogs
+
+
+KEY = 'flask_unchained.bundles.security:flash.login'
+
+
+@pytest.mark.bundles(['flask_unchained.bundles.babel'])
+class TestDomainCache:
+    @pytest.fixture(autouse=True)
+    def reload_catalogs(self):
+        babel.reload_catalogs()
+
+    def test_gettext(self, app):
+        with app.test_request_context():
+            assert gettext(KEY) == 'Welcome!'
+            assert gettext('unknown.package:some.key') == 'unknown.package:some.key'
+            assert gettext('Not a key') == 'Not a key'
+
+    def test_domains_are_cached(self, app):
+        with app.test_request_context():
+            gettext(KEY)
+            domain = babel.get_domain('flask_unchained.bundles.security')
+            assert list(domain.cache) == ['en']
+            gettext(KEY)
+            assert babel.get_domain('flask_unchained.bundles.security') is domain
+
+            assert babel.get_domain('unknown.package') is babel._default_domain
+
+            babel.reload_catalogs()
+            assert babel.get_domain('flask_unchained.bundles.security') is not domain
+
+    def test_key_matching_is_memoized(self):
+        _get_key_domain_name.cache_clear()
+        assert _get_key_domain_name(KEY) == 'flask_unchained.bundles.security'
+        assert _get_key_domain_name(KEY) == 'flask_unchained.bundles.security'
+        assert _get_key_domain_name('Not a key') is None
+        assert _get_key_domain_name.cache_info().hits == 1
+
+
+GREETING = 'tests.bundles.babel._bundles.greetings:hello'
+
+
+@pytest.mark.bundles(['flask_unchained.bundles.babel',
+                      'tests.bundles.babel._bundles.greetings'])
+@pytest.mark.options(LANGUAGES=['en', 'fr', 'fr_CA'])
+class TestCompiledCatalogs:
+    @pytest.fixture(autouse=True)
+    def reload_catalogs(self):
+        yield
+        babel._compiled_catalogs_dir = None
+        babel.reload_catalogs()
+
+    def test_compile_catalogs(self, app, cli_runner, tmpdir):
+        result = cli_runner.invoke(compile_catalogs, ['--output-dir', str(tmpdir)])
+        assert result.exit_code == 0, result.output
+        assert 'Compiled 1 messages for en' in result.output
+        assert 'Compiled 1 messages for fr' in result.output
+
+        babel._compiled_catalogs_dir = str(tmpdir)
+        babel.reload_catalogs()
+        assert sorted(babel._default_domain.cache) == ['en', 'fr', 'fr_CA']
+
+        with app.test_request_context(headers={'Accept-Language': 'fr'}):
+            assert gettext(GREETING) == 'Bonjour!'
+            assert gettext('Not a key') == 'Not a key'
+            assert babel.get_domain('tests.bundles.babel._bundles.greetings') \
+                is babel._default_domain
+        with app.test_request_context():
+            assert gettext(GREETING) == 'Hello!'
+        assert babel._domains == {}
+
+    def test_regional_locales_fall_back(self, app, cli_runner, tmpdir):
+        with app.test_request_context(headers={'Accept-Language': 'fr-CA'}):
+            assert gettext(GREETING) == 'Bonjour!'
+
+        cli_runner.invoke(compile_catalogs, ['--output-dir', str(tmpdir)])
+        babel._compiled_catalogs_dir = str(tmpdir)
+        babel.reload_catalogs()
+        assert 'fr_CA' in babel._default_domain.cache
+
+        with app.test_request_context(headers={'Accept-Language': 'fr-CA'}):
+            assert gettext(GREETING) == 'Bonjour!'
+
+    def test_compile_catalogs_requires_output_dir(self, cli_runner):
+        result = cli_runner.invoke(compile_catalogs)
+        assert result.exit_code == 2
+        assert 'BABEL_COMPILED_CATALOGS_DIR' in result.output
+
+
+def _write_mo(path, locale, messages):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    catalog = Catalog(locale=locale)
+    for id, string in messages.items():
+        catalog.add(id, string)
+    with open(path, 'wb') as f:
+        write_mo(f, catalog)
+
+
+def test_compiled_catalogs_override_earlier_dirs(tmpdir):
+    bundle_dir = os.path.join(str(tmpdir), 'bundle')
+    app_dir = os.path.join(str(tmpdir), 'app')
+    _write_mo(os.path.join(bundle_dir, 'en', 'LC_MESSAGES', 'bundle.mo'), 'en',
+              {'x:hello': 'bundle', 'x:bye': 'bundle bye'})
+    _write_mo(os.path.join(app_dir, 'en', 'LC_MESSAGES', 'app.mo'), 'en',
+              {'x:hello': 'app override'})
+
+    output_dir = os.path.join(str(tmpdir), 'compiled')
+    assert _compile_catalogs([bundle_dir, app_dir], output_dir) == {'en': 2}
+
+    translations = load_compiled_catalogs(output_dir)['en']
+    assert translations.gettext('x:hello') == 'app override'
+    assert translations.gettext('x:bye') == 'bundle bye'
+
+
+def test_compiled_catalogs_fall_back_through_every_level(tmpdir):
+    for locale, messages in [('zh', {'a': 'zh a', 'b': 'zh b'}),
+                             ('zh_Hant', {'b': 'zh_Hant b'}),
+                             ('zh_Hant_TW', {'c': 'zh_Hant_TW c'})]:
+        _write_mo(os.path.join(str(tmpdir), f'{locale}.mo'), locale, messages)
+
+    catalogs = load_compiled_catalogs(str(tmpdir), locales=['zh_Hant_HK'])
+    assert sorted(catalogs) == ['zh', 'zh_Hant', 'zh_Hant_HK', 'zh_Hant_TW']
+    assert catalogs['zh_Hant_HK'] is catalogs['zh_Hant']
+
+    translations = catalogs['zh_Hant_TW']
+    assert translations.gettext('a') == 'zh a'
+    assert translations.gettext('b') == 'zh_Hant b'
+    assert translations.gettext('c') == 'zh_Hant_TW c'
+    assert translations.gettext('missing') == 'missing'
+    assert catalogs['zh'].gettext('missing') == 'missing'
@@ -0,0 +1,93 @@
+import pytest
+import time
+
+from smtplib import SMTPServerDisconnected
+
+from flask_unchained.bundles.celery import BatchTask, celery
+from flask_unchained.bundles.celery.tasks import async_bulk_mail_task, async_mail_task
+from flask_unchained.bundles.mail import mail
+from flask_unchained.bundles.mail.pytest import *
+from flask_unchained.bundles.mail.utils import make_message
+
+
+class RecordDelayedBatches:
+    def __init__(self, batches):
+        self.batches = batches
+
+    def delay(self, calls):
+        self.batches.append([(list(args), kwargs) for args, kwargs in calls])
+
+
+def create_batch_task(batches, **kwargs):
+    def record_batch(calls):
+        batches.append([(list(args), kwargs) for args, kwargs in calls])
+    return celery.batch_task(name='tests.record_batch', **kwargs)(record_batch)
+
+
+@pytest.mark.bundles(['flask_unchained.bundles.mail', 'flask_unchained.bundles.celery'])
+@pytest.mark.options(CELERY_RESULT_BACKEND='cache+memory://')
+class TestBatchTask:
+    def test_applied_immediately_when_testing(self):
+        batches = []
+        task = create_batch_task(batches)
+        assert isinstance(task, BatchTask)
+
+        task.delay(1, foo='bar')
+        assert batches == [[([1], {'foo': 'bar'})]]
+
+    @pytest.mark.options(TESTING=False)
+    def test_max_size(self):
+        batches = []
+        task = create_batch_task(batches, max_size=2, max_wait=60)
+        task.task = RecordDelayedBatches(batches)
+
+        futures = [task.delay(i) for i in range(3)]
+        assert batches == [[([0], {}), ([1], {})]]
+        assert [future.done() for future in futures] == [True, True, False]
+
+        task.flush()
+        assert batches[1] == [([2], {})]
+        assert futures[2].done()
+
+    @pytest.mark.options(TESTING=False)
+    def test_max_wait(self):
+        batches = []
+        task = create_batch_task(batches, max_size=10, max_wait=0.01)
+        task.task = RecordDelayedBatches(batches)
+
+        task.delay(1)
+        task.delay(2)
+        assert batches == []
+
+        for _ in range(100):
+            if batches:
+                break
+            time.sleep(0.01)
+        assert batches == [[([1], {}), ([2], {})]]
+
+    def test_discovered(self):
+        assert 'flask_unchained.bundles.celery.tasks.async_bulk_mail_task' \
+            in celery.batch_tasks
+
+    def test_async_mail(self, outbox):
+        result = mail.send('subject', 'foo@example.com', body='body').result()
+        assert result.successful()
+        assert len(outbox) == 1
+        assert outbox[0].subject == 'subject'
+
+    def test_async_bulk_mail_failures(self, monkeypatch, caplog):
+        messages = [make_message(subject, 'foo@example.com', body='body')
+                    for subject in ('ok', 'disconnected', 'broken')]
+        monkeypatch.setattr(mail, 'send_bulk', lambda msgs: [
+            (messages[1], SMTPServerDisconnected()),
+            (messages[2], ValueError('broken')),
+        ])
+        retried = []
+        monkeypatch.setattr(async_mail_task, 'delay', retried.append)
+
+        result = async_bulk_mail_task.task.apply(
+            args=([((msg,), {}) for msg in messages],))
+        assert result.failed()
+        assert str(result.result) == 'Failed to send 1 of 3 emails'
+        assert retried == [messages[1]]
+        assert "Failed to send email 'broken'" in caplog.text
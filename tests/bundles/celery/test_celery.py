@@ -0,0 +1,81 @@
+import pytest
+import threading
+
+from celery.signals import task_postrun
+from flask import _app_ctx_stack, g
+
+from flask_unchained.bundles.celery import celery
+from flask_unchained.bundles.celery.commands import benchmark_app_context, worker
+
+
+def record_app_context(contexts):
+    contexts.append((_app_ctx_stack.top, getattr(g, 'value', None)))
+    g.value = 'set by task'
+
+
+def run_in_thread(fn):
+    thread = threading.Thread(target=fn)
+    thread.start()
+    thread.join()
+
+
+@pytest.mark.bundles(['flask_unchained.bundles.mail', 'flask_unchained.bundles.celery'])
+class TestAppContext:
+    def test_new_app_context_per_task(self):
+        contexts = []
+        task = celery.task(name='tests.record_app_context')(record_app_context)
+
+        run_in_thread(lambda: [task(contexts) for _ in range(2)])
+        assert contexts[0][0] is not contexts[1][0]
+        assert contexts[1][1] is None
+
+    @pytest.mark.options(CELERY_PERSISTENT_APP_CONTEXT=True)
+    def test_persistent_app_context(self):
+        contexts = []
+        task = celery.task(name='tests.record_app_context')(record_app_context)
+
+        def run():
+            task(contexts)
+            task(contexts)
+            task_postrun.send(sender=task, task_id='1', task=task, args=(contexts,),
+                              kwargs={}, retval=None, state='SUCCESS')
+            task(contexts)
+
+        run_in_thread(run)
+        assert contexts[0][0] is contexts[1][0] is contexts[2][0]
+        assert contexts[1][1] == 'set by task'
+        assert contexts[2][1] is None
+
+    @pytest.mark.options(CELERY_RESULT_BACKEND='cache+memory://')
+    def test_benchmark_command(self, cli_runner):
+        result = cli_runner.invoke(benchmark_app_context, args=['--number', '10'])
+        assert result.exit_code == 0, result.output
+        assert 'persistent' in result.output
+
+
+@pytest.mark.bundles(['flask_unchained.bundles.mail', 'flask_unchained.bundles.celery'])
+def test_worker_command(cli_runner, monkeypatch):
+    started = []
+
+    class FakeWorker:
+        exitcode = 0
+
+        def __init__(self, **kwargs):
+            self.kwargs = kwargs
+
+        def start(self):
+            started.append((self.kwargs, len(_app_ctx_stack._local.stack)))
+
+    monkeypatch.setattr(celery, 'Worker', FakeWorker)
+    stack_size = len(_app_ctx_stack._local.stack)
+    result = cli_runner.invoke(worker, args=['-c', '2', '--prefetch-multiplier', '1',
+                                             '-l', 'warning'])
+    assert result.exit_code == 0, result.output
+
+    kwargs, worker_stack_size = started[0]
+    assert kwargs['concurrency'] == 2
+    assert kwargs['pool_cls'] == 'prefork'
+    assert kwargs['prefetch_multiplier'] == 1
+    assert kwargs['loglevel'] == 30
+    assert worker_stack_size == stack_size  # the command's app context is detached
+    assert len(_app_ctx_stack._local.stack) == stack_size
@@ -0,0 +1,123 @@
+import os
+import pytest
+import socket
+import time
+
+from celery.signals import worker_init
+
+from flask_unchained.bundles.celery import celery
+from flask_unchained.bundles.celery.commands import stats
+from flask_unchained.bundles.celery.metrics import (
+    MetricsSink, RegistryMetricsSink, StatsdMetricsSink, merge_snapshots)
+
+
+sink = RegistryMetricsSink()
+
+
+def add(a, b):
+    return a + b
+
+
+@pytest.mark.bundles(['flask_unchained.bundles.mail', 'flask_unchained.bundles.celery'])
+@pytest.mark.options(CELERY_RESULT_BACKEND='cache+memory://',
+                     CELERY_TASK_METRICS_SINK=sink)
+class TestTaskMetrics:
+    @pytest.fixture(autouse=True)
+    def clear_sink(self):
+        sink.clear()
+
+    def test_records_runtime(self):
+        task = celery.task(name='tests.metrics_add')(add)
+        assert task.apply(args=(1, 2)).get() == 3
+        assert task(1, 2) == 3  # called directly: not recorded
+
+        metrics = sink.snapshot()['tests.metrics_add']
+        assert list(metrics) == ['runtime']
+        assert metrics['runtime']['count'] == 1
+
+    @pytest.mark.options(CELERY_TASK_METRICS_PAYLOAD_SIZE=True)
+    def test_records_headers(self):
+        task = celery.task(name='tests.metrics_add')(add)
+        headers = {}
+        celery._on_before_task_publish(sender=task.name, body=((1, 2), {}, {}),
+                                       headers=headers)
+        assert headers['payload_size'] > 0
+
+        headers['enqueued_at'] -= 2
+        task.apply(args=(1, 2), headers=headers)
+
+        metrics = sink.snapshot()['tests.metrics_add']
+        assert metrics['queue_wait']['min'] >= 2
+        assert metrics['payload_size']['max'] == headers['payload_size']
+
+    def test_payload_size_disabled_by_default(self):
+        task = celery.task(name='tests.metrics_add')(add)
+        headers = {}
+        celery._on_before_task_publish(sender=task.name, body=((1, 2), {}, {}),
+                                       headers=headers)
+        assert list(headers) == ['enqueued_at']
+
+    def test_collects_metrics_from_child_processes(self):
+        worker_init.send(sender=None)
+        assert sink._collector_pid == os.getpid()
+
+        pid = os.fork()
+        if pid == 0:  # the child process, like a prefork pool process
+            try:
+                sink.record('tests.metrics_add', 'runtime', 0.5)
+                sink.record('tests.metrics_add', 'runtime', 1.5)
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+
+        deadline = time.time() + 5
+        while sink.snapshot().get('tests.metrics_add', {}).get(
+                'runtime', {}).get('count') != 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert sink.snapshot()['tests.metrics_add']['runtime'] == dict(
+            count=2, total=2.0, min=0.5, max=1.5)
+
+        sink.record('tests.metrics_add', 'runtime', 1.0)  # in the main process
+        assert sink.snapshot()['tests.metrics_add']['runtime']['count'] == 3
+
+    def test_stats_command(self, cli_runner, monkeypatch):
+        sink.record('tests.metrics_add', 'runtime', 0.5)
+        monkeypatch.setattr(celery.control, 'broadcast', lambda *a, **kw: [
+            {'worker1': sink.snapshot()},
+            {'worker2': {'tests.metrics_add': {'runtime': dict(
+                count=1, total=1.5, min=1.5, max=1.5)}}},
+        ])
+
+        result = cli_runner.invoke(stats)
+        assert result.exit_code == 0, result.output
+        lines = result.output.strip().splitlines()
+        assert lines[-1].split() == ['tests.metrics_add', 'runtime', '2',
+                                     '1000.00ms', '500.00ms', '1500.00ms']
+
+
+def test_merge_snapshots():
+    merged = merge_snapshots([
+        {'a': {'runtime': dict(count=1, total=1, min=1, max=1)}},
+        {'a': {'runtime': dict(count=2, total=5, min=2, max=3)},
+         'b': {'runtime': dict(count=1, total=1, min=1, max=1)}},
+    ])
+    assert merged['a']['runtime'] == dict(count=3, total=6, min=1, max=3)
+    assert merged['b']['runtime']['count'] == 1
+
+
+def test_metrics_sink_is_abstract():
+    with pytest.raises(TypeError):
+        MetricsSink()
+
+
+def test_statsd_sink():
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(('127.0.0.1', 0))
+    server.settimeout(1)
+    statsd = StatsdMetricsSink(port=server.getsockname()[1])
+
+    statsd.record('foo', 'runtime', 0.25)
+    assert server.recv(1024) == b'celery.foo.runtime:250.000|ms'
+    statsd.record('foo', 'payload_size', 120)
+    assert server.recv(1024) == b'celery.foo.payload_size:120|g'
+    server.close()
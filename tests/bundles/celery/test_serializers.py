@@ -0,0 +1,88 @@
+import datetime as dt
+import pytest
+import uuid
+
+from decimal import Decimal
+from flask_mail import Attachment, Message
+from kombu.exceptions import EncodeError
+from kombu.serialization import registry
+
+from flask_unchained.bundles.babel import lazy_gettext as _
+from flask_unchained.bundles.celery.commands import benchmark_serializers
+from flask_unchained.bundles.celery.serializers import (
+    benchmark, register_type, tagged_json_loads, _ModelReference)
+
+
+class Point:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+def round_trip(obj, serializer='tagged-json'):
+    content_type, content_encoding, data = registry.dumps(obj, serializer=serializer)
+    return registry.loads(data, content_type, content_encoding, accept=[content_type])
+
+
+@pytest.mark.bundles(['flask_unchained.bundles.mail', 'flask_unchained.bundles.celery'])
+class TestTaggedSerializers:
+    def test_types(self):
+        payload = dict(
+            datetime=dt.datetime(2019, 1, 2, 3, 4, 5, 6, tzinfo=dt.timezone.utc),
+            naive=dt.datetime(2019, 1, 2, 3, 4, 5),
+            date=dt.date(2019, 1, 2),
+            timedelta=dt.timedelta(days=1, seconds=2, microseconds=3),
+            decimal=Decimal('1.10'),
+            uuid=uuid.uuid4(),
+            set={1, 2},
+            bytes=b'\x00\xff',
+            nested=[dict(date=dt.date(2019, 1, 2))],
+        )
+        assert round_trip(payload) == payload
+
+    def test_mail_message(self):
+        msg = Message('subject', ['foo@example.com'], body='body', html='<p>html</p>',
+                      attachments=[Attachment('a.txt', 'text/plain', b'data')])
+        rv = round_trip(((msg,), {}, {}))[0][0]
+        assert isinstance(rv, Message)
+        assert rv.subject == 'subject'
+        assert rv.recipients == ['foo@example.com']
+        assert rv.sender == msg.sender
+        assert rv.html == '<p>html</p>'
+        assert rv.attachments[0].data == b'data'
+
+    def test_security_email_message(self):
+        # security emails have lazy translated subjects
+        msg = Message(_('flask_unchained.bundles.security:email_subject.register'),
+                      ['foo@example.com'], body='body')
+        rv = round_trip(((msg,), {}, {}))[0][0]
+        assert rv.subject == str(msg.subject)
+        assert type(rv.subject) is str
+
+    def test_dicts_with_tag_like_keys(self):
+        payload = {'__type__': 'model', '__value__': ['User', [1]]}
+        assert round_trip(payload) == payload
+
+    def test_models_are_not_loaded_while_decoding(self):
+        rv = tagged_json_loads('{"__flask_unchained.tagged__":["model",["User",[1]]]}')
+        assert rv == _ModelReference('User', [1])
+
+    def test_register_type(self):
+        register_type(Point, 'test_point', lambda p: [p.x, p.y], lambda v: Point(*v))
+        rv = round_trip(Point(1, 2))
+        assert (rv.x, rv.y) == (1, 2)
+
+    def test_unserializable(self):
+        with pytest.raises(EncodeError):
+            registry.dumps(object(), serializer='tagged-json')
+
+    def test_benchmark(self):
+        results = benchmark(((Message('subject', ['foo@example.com']),), {}, {}),
+                            number=1)
+        assert [name for name, *_ in results][:3] == ['pickle', 'dill', 'tagged-json']
+        assert all(size > 0 for _, size, _, _ in results)
+
+    def test_benchmark_command(self, cli_runner):
+        result = cli_runner.invoke(benchmark_serializers, args=['--number', '1'])
+        assert result.exit_code == 0, result.output
+        assert 'tagged-json' in result.output
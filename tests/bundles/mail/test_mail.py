@@ -1,9 +1,10 @@
 import pytest
+import smtplib
 from flask_unchained.bundles.mail.pytest import *
 
 from flask_mail import Message
 from flask_unchained.bundles.mail import mail
-from flask_unchained.bundles.mail.utils import _send_mail
+from flask_unchained.bundles.mail.utils import _send_mail, html_to_text, make_message
 
 
 subject = 'hello world'
@@ -32,6 +33,46 @@ class TestMail:
         assert msg.body == body
         assert msg.html == html
 
+    def test_text_template_variant(self, templates):
+        msg = make_message(subject, recipient, 'send_mail_text.html', name='World')
+        assert msg.html == '<p>Hello World</p>'
+        assert msg.body == 'Hello World,\n\none fine body'
+        assert [t.template.name for t in templates] == ['send_mail_text.html',
+                                                        'send_mail_text.txt']
+
+    def test_render_many(self, templates):
+        rendered = mail.render_many('send_mail_text.html',
+                                    (dict(name=name) for name in ['one', 'two']))
+        assert list(rendered) == ['<p>Hello one</p>', '<p>Hello two</p>']
+        assert len(templates) == 2
+
+    def test_send_templated_bulk(self, smtp_server):
+        failures = mail.send_templated_bulk(subject, 'send_mail_text.html', [
+            dict(to='one@example.com', name='one'),
+            dict(to=['two@example.com'], name='two', subject='custom subject'),
+        ], batch_size=1)
+        assert failures == []
+        assert smtp_server.connections == 2
+
+        one, two = smtp_server.messages
+        assert one['To'] == 'one@example.com'
+        assert one['Subject'] == subject
+        text = next(part for part in one.walk()
+                    if part.get_content_type() == 'text/plain')
+        assert 'Hello one,' in text.get_payload(decode=True).decode()
+        assert two['To'] == 'two@example.com'
+        assert two['Subject'] == 'custom subject'
+
+    def test_send_templated_bulk_render_failures(self, smtp_server):
+        failures = mail.send_templated_bulk(subject, 'send_mail_text.html', [
+            dict(name='missing to'),
+            dict(to='one@example.com', name='one'),
+        ])
+        assert len(failures) == 1
+        msg, e = failures[0]
+        assert msg is None and isinstance(e, KeyError)
+        assert [msg['To'] for msg in smtp_server.messages] == ['one@example.com']
+
     def test_send(self, outbox):
         msg = Message(subject, [recipient], body=body, html=html)
         mail.send(msg)
@@ -39,6 +80,37 @@ class TestMail:
         assert outbox[0] == msg
         assert msg.sender == sender
 
+    def test_send_over_smtp(self, smtp_server):
+        _send_mail(subject, recipient, 'send_mail.html')
+        assert len(smtp_server.messages) == 1
+        msg = smtp_server.messages[0]
+        assert msg['Subject'] == subject
+        assert msg['To'] == recipient
+        assert msg.envelope_sender == sender
+
+    def test_send_bulk(self, smtp_server):
+        messages = [Message(subject, [f'{i}@example.com'], body=body)
+                    for i in range(5)]
+        failures = mail.send_bulk(messages, batch_size=2)
+        assert failures == []
+        assert [msg['To'] for msg in smtp_server.messages] == \
+            [f'{i}@example.com' for i in range(5)]
+        assert smtp_server.connections == 3
+
+    @pytest.mark.options(MAIL_MAX_EMAILS=2)
+    def test_send_bulk_respects_max_emails(self, smtp_server):
+        messages = (Message(subject, [recipient], body=body) for _ in range(3))
+        assert mail.send_bulk(messages, batch_size=10) == []
+        assert len(smtp_server.messages) == 3
+        assert smtp_server.connections == 2
+
+    def test_send_bulk_failures(self, smtp_server):
+        bad = Message('bad\nsubject', [recipient], body=body)
+        failures = mail.send_bulk([Message(subject, [recipient], body=body), bad])
+        assert len(failures) == 1
+        assert failures[0][0] is bad
+        assert len(smtp_server.messages) == 1
+
     def test_send_message(self, outbox):
         mail.send_message(subject=subject, recipients=[recipient],
                           body=body, html=html)
@@ -49,3 +121,56 @@ class TestMail:
         assert msg.sender == sender
         assert msg.body == body
         assert msg.html == html
+
+
+@pytest.mark.bundles(['flask_unchained.bundles.mail'])
+@pytest.mark.options(MAIL_DEFAULT_SENDER=sender, MAIL_POOL_SIZE=1)
+class TestConnectionPool:
+    @pytest.fixture(autouse=True)
+    def close_connections(self):
+        yield
+        mail.close_connections()
+
+    def test_reuses_connections(self, smtp_server):
+        mail.send_message(subject, [recipient], body=body)
+        mail.send_message(subject, [recipient], body=body)
+        assert len(smtp_server.messages) == 2
+        assert smtp_server.connections == 1
+
+    @pytest.mark.options(MAIL_DEFAULT_SENDER=sender, MAIL_POOL_SIZE=1,
+                         MAIL_POOL_NOOP_INTERVAL=0)
+    def test_reconnects_after_disconnect(self, smtp_server):
+        mail.send_message(subject, [recipient], body=body)
+        smtp_server.disconnect_clients()
+        mail.send_message(subject, [recipient], body=body)
+        assert len(smtp_server.messages) == 2
+        assert smtp_server.connections == 2
+
+    @pytest.mark.options(MAIL_MAX_EMAILS=2)
+    def test_pooled_connections_respect_max_emails(self, smtp_server):
+        for _ in range(3):
+            mail.send_message(subject, [recipient], body=body)
+        assert len(smtp_server.messages) == 3
+        assert smtp_server.connections == 2
+
+    @pytest.mark.options(MAIL_MAX_EMAILS=1)
+    def test_no_resend_after_disconnect_on_quit(self, smtp_server, monkeypatch):
+        def quit(self):
+            raise smtplib.SMTPServerDisconnected()
+        monkeypatch.setattr(smtplib.SMTP, 'quit', quit)
+
+        mail.send_message(subject, [recipient], body=body)
+        assert len(smtp_server.messages) == 1
+
+
+def test_html_to_text():
+    assert html_to_text(html) == body
+    assert html_to_text("""\
+<html>
+<head><title>Title</title><style>p { color: red; }</style></head>
+<body>
+  <h1>Hello &amp; welcome</h1><p>first<br>second</p>
+  <ul><li>one</li><li><a href="/two">two</a></li></ul>
+  <script>alert('hi');</script>
+</body>
+</html>""") == 'Hello & welcome\n\nfirst\nsecond\n\none\n\ntwo'
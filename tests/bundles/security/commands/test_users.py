@@ -1,9 +1,12 @@
+import json
 import pytest
 import traceback
 
+from datetime import datetime, timezone
+
 from flask_unchained.bundles.security.commands.users import (
-    list_users, create_user, delete_user, set_password, confirm_user, activate_user,
-    deactivate_user, add_role_to_user, remove_role_from_user)
+    list_users, create_user, import_users, delete_user, set_password, confirm_user,
+    activate_user, deactivate_user, add_role_to_user, remove_role_from_user)
 
 
 @pytest.mark.security_bundle('flask_unchained.bundles.security')
@@ -42,6 +45,63 @@ class TestUsersCommands:
             "Successfully created User(id=1, email='a@a.com', active=True)"
         assert user_manager.get_by(email='a@a.com')
 
+    @pytest.mark.role(name='ROLE_USER')
+    def test_import_users_csv(self, role, cli_runner, tmpdir, user_manager):
+        path = tmpdir.join('users.csv')
+        path.write('email,password,active,confirmed_at,roles,first_name\n'
+                   'one@example.com,password,true,now,ROLE_USER,One\n'
+                   'two@example.com,password,false,,,\n'
+                   'three@example.com,password,true,2019-01-02T03:04:05+00:00,,\n'
+                   'four@example.com,password,true,2019-01-02 05:04:05+02:00,,\n'
+                   'five@example.com,password,true,2019-01-02 03:04:05,,\n')
+
+        result = cli_runner.invoke(import_users, args=[str(path), '--processes', '1'])
+        assert result.exit_code == 0, traceback.print_exception(*result.exc_info)
+        assert 'Successfully imported 5 users' in result.output
+
+        one = user_manager.get_by(email='one@example.com')
+        assert one.active and one.confirmed_at and one.first_name == 'One'
+        assert one.has_role('ROLE_USER')
+        assert one.password == 'password'
+
+        two = user_manager.get_by(email='two@example.com')
+        assert not two.active and not two.confirmed_at and not two.roles
+
+        user_manager.session.expire_all()
+        confirmed_at = datetime(2019, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        for email in ['three@example.com', 'four@example.com', 'five@example.com']:
+            assert user_manager.get_by(email=email).confirmed_at == confirmed_at
+
+    @pytest.mark.user(email='existing@example.com')
+    def test_import_users_jsonl_errors(self, user, cli_runner, tmpdir, user_manager):
+        path = tmpdir.join('users.jsonl')
+        path.write('\n'.join([
+            json.dumps(dict(email='one@example.com', password='password')),
+            json.dumps(dict(email='one@example.com', password='password')),
+            json.dumps(dict(email='existing@example.com')),
+            json.dumps(dict(email='invalid', password='password')),
+            json.dumps(dict(email='two@example.com', password='short')),
+            json.dumps(dict(email='three@example.com', roles=['ROLE_FAIL'])),
+            json.dumps(dict(email='four@example.com', fail=True)),
+            json.dumps(dict(email='five@example.com', confirmed_at='yesterday')),
+            '{"email": ',
+        ]))
+
+        result = cli_runner.invoke(import_users, args=[str(path), '--batch-size', '3'])
+        assert result.exit_code == 1
+        assert 'Successfully imported 1 users' in result.output
+        assert 'Failed to import 8 rows' in result.output
+        assert 'line 2: Duplicate email one@example.com.' in result.output
+        assert 'line 3: A user with email existing@example.com already exists.' \
+            in result.output
+        assert 'line 4: Invalid email address.' in result.output
+        assert 'line 5: Password must be at least 8 characters long.' in result.output
+        assert 'line 6: Unknown roles: ROLE_FAIL' in result.output
+        assert 'line 7: Unknown columns: fail' in result.output
+        assert "line 8: Invalid timestamp 'yesterday'." in result.output
+        assert 'line 9: Invalid JSON' in result.output
+        assert user_manager.get_by(email='one@example.com')
+
     def test_delete_user(self, user, cli_runner, user_manager):
         result = cli_runner.invoke(delete_user, args=['email=user@example.com'],
                                    input='y\n')
@@ -0,0 +1,61 @@
+import pytest
+
+from flask_unchained.bundles.security import SecurityUtilsService, UserManager, security
+from flask_unchained.bundles.security.signals import password_hashing_finished
+
+
+@pytest.fixture()
+def hashing_timings(app):
+    records = []
+
+    def record(sender, **kwargs):
+        records.append(kwargs)
+
+    password_hashing_finished.connect(record, app)
+
+    try:
+        yield records
+    finally:
+        password_hashing_finished.disconnect(record, app)
+
+
+class TestPasswordHashing:
+    def test_inline(self, security_utils_service: SecurityUtilsService,
+                    hashing_timings):
+        assert security.get_password_hashing_pool() is None
+        security_utils_service.hash_password('password')
+        assert len(hashing_timings) == 1
+        assert hashing_timings[0]['method'] == 'hash'
+        assert hashing_timings[0]['duration'] >= 0
+
+    @pytest.mark.options(SECURITY_PASSWORD_HASH='pbkdf2_sha512',
+                         SECURITY_PASSWORD_HASH_OPTIONS={
+                             'pbkdf2_sha512': {'rounds': 1000}},
+                         SECURITY_PASSWORD_HASHING_POOL_SIZE=1)
+    def test_pool(self, user, security_utils_service: SecurityUtilsService,
+                  hashing_timings):
+        assert security.get_password_hashing_pool() is not None
+        assert user.password.startswith('$pbkdf2-sha512$1000$')
+        assert security_utils_service.verify_password(user, 'password')
+        assert not security_utils_service.verify_password(user, 'fail')
+        assert [timing['method'] for timing in hashing_timings] \
+            == ['verify', 'verify']
+
+
+@pytest.mark.options(SECURITY_PASSWORD_HASH='pbkdf2_sha512',
+                     SECURITY_PASSWORD_HASH_OPTIONS={
+                         'pbkdf2_sha512': {'rounds': 1000}})
+class TestRehashPassword:
+    def test_rehash_after_response(self, client, user, user_manager: UserManager,
+                                   session_manager):
+        user._password = 'password'
+        session_manager.save(user, commit=True)
+        user_id = user.id
+
+        r = client.login_with_creds(user.email, 'password')
+        assert r.status_code == 302
+        assert user_manager.get(user_id).password == 'password'
+
+        r.close()
+        session_manager.expunge_all()
+        assert user_manager.get(user_id).password.startswith('$pbkdf2-sha512$')
@@ -0,0 +1,97 @@
+import pytest
+
+from flask_unchained.bundles.security import SecurityUtilsService, security
+from flask_unchained.bundles.sqlalchemy import SessionManager
+from flask_unchained.bundles.sqlalchemy.pytest import assert_max_queries
+
+from .conftest import RoleFactory
+
+
+class TestRoleNames:
+    def test_role_names(self, user):
+        assert user.role_names == frozenset({'ROLE_USER', 'ROLE_USER1'})
+        assert user.has_role('ROLE_USER')
+        assert not user.has_role('ROLE_FAIL')
+
+    @pytest.mark.role(name='ROLE_OTHER')
+    def test_pending_role_changes(self, user, role: RoleFactory):
+        user.roles.append(role)
+        assert {'ROLE_USER', 'ROLE_OTHER'} <= user.role_names
+
+    @pytest.mark.role(name='ROLE_ADMIN')
+    def test_pending_role_changes_not_cached(self, user, role):
+        assert not user.has_role('ROLE_ADMIN')
+        user.roles.append(role)
+        assert user.has_role('ROLE_ADMIN')
+
+    def test_user_loader_eager_loads_roles(self, app, user,
+                                           session_manager: SessionManager,
+                                           security_utils_service: SecurityUtilsService):
+        user_id = user.id
+        session_manager.expunge_all()
+        with app.test_request_context():
+            with assert_max_queries(1):
+                loaded = security_utils_service.user_loader(user_id)
+                assert loaded.has_role('ROLE_USER')
+                assert loaded.has_role('ROLE_USER1')
+
+
+@pytest.mark.options(SECURITY_ROLE_CACHE=True)
+class TestRoleCache:
+    @pytest.fixture(autouse=True)
+    def clear_role_cache(self):
+        security.clear_role_names_cache()
+
+    def test_cached_between_requests(self, app, user,
+                                     session_manager: SessionManager,
+                                     security_utils_service: SecurityUtilsService):
+        user_id = user.id
+        with app.test_request_context():
+            assert security_utils_service.user_loader(user_id).has_role('ROLE_USER')
+
+        session_manager.expunge_all()
+        with app.test_request_context():
+            with assert_max_queries(1):
+                loaded = security_utils_service.user_loader(user_id)
+                assert loaded.role_names == frozenset({'ROLE_USER', 'ROLE_USER1'})
+
+    @pytest.mark.role(name='ROLE_ADMIN')
+    def test_invalidated_on_user_role_changes(self, user, role,
+                                              session_manager: SessionManager):
+        assert not user.has_role('ROLE_ADMIN')
+        assert security.get_cached_role_names(user.id) is not None
+
+        user.roles.append(role)
+        session_manager.save(user, commit=True)
+        assert security.get_cached_role_names(user.id) is None
+        assert user.has_role('ROLE_ADMIN')
+
+        user.roles.remove(role)
+        session_manager.save(user, commit=True)
+        assert security.get_cached_role_names(user.id) is None
+        assert not user.has_role('ROLE_ADMIN')
+
+    @pytest.mark.users(dict(username='one', email='one@example.com'),
+                       dict(username='two', email='two@example.com'))
+    @pytest.mark.role(name='ROLE_ADMIN')
+    def test_invalidated_when_user_role_moves_to_another_user(
+            self, users, role, session_manager: SessionManager):
+        one, two = users
+        one.roles.append(role)
+        session_manager.save(one, commit=True)
+        assert one.has_role('ROLE_ADMIN') and not two.has_role('ROLE_ADMIN')
+
+        user_role = next(ur for ur in one.user_roles if ur.role_id == role.id)
+        user_role.user_id = two.id
+        session_manager.save(user_role, commit=True)
+        assert security.get_cached_role_names(one.id) is None
+        assert security.get_cached_role_names(two.id) is None
+
+    @pytest.mark.options(SECURITY_ROLE_CACHE_TTL=-1)
+    def test_ttl(self, app, user):
+        with app.test_request_context():
+            assert user.has_role('ROLE_USER')
+            assert security.get_cached_role_names(user.id) is not None
+
+        with app.test_request_context():
+            assert security.get_cached_role_names(user.id) is None
@@ -0,0 +1,40 @@
+import pytest
+from flask_unchained.bundles.mail.pytest import *
+
+from flask_unchained.bundles.security import SecurityService
+from flask_unchained.bundles.sqlalchemy import SessionManager
+
+
+@pytest.mark.options(SECURITY_SEND_MAIL_AFTER_COMMIT=True, SECURITY_RECOVERABLE=True)
+class TestSendMailAfterCommit:
+    def test_sent_after_commit(self, user, outbox,
+                               security_service: SecurityService,
+                               session_manager: SessionManager):
+        security_service.change_password(user, 'new password')
+        assert len(outbox) == 0
+
+        session_manager.commit()
+        assert len(outbox) == 1
+        assert outbox[0].recipients == [user.email]
+
+    def test_discarded_on_rollback(self, user, outbox,
+                                   security_service: SecurityService,
+                                   session_manager: SessionManager):
+        security_service.change_password(user, 'new password')
+        session_manager.session.flush()
+        session_manager.session.rollback()
+        session_manager.commit()
+        assert len(outbox) == 0
+
+    def test_sent_without_changes(self, user, outbox,
+                                  security_service: SecurityService):
+        security_service.send_reset_password_instructions(user)
+        assert len(outbox) == 1
+
+    def test_sent_over_smtp(self, user, smtp_server,
+                            security_service: SecurityService,
+                            session_manager: SessionManager):
+        security_service.change_password(user, 'new password')
+        session_manager.commit()
+        assert len(smtp_server.messages) == 1
+        assert smtp_server.messages[0].envelope_recipients == [user.email]
@@ -0,0 +1,54 @@
+import pytest
+
+from flask_unchained.bundles.security import (
+    SecurityService, SecurityUtilsService, UserSnapshot, security)
+from flask_unchained.bundles.sqlalchemy import SessionManager
+from flask_unchained.bundles.sqlalchemy.pytest import assert_max_queries
+
+
+@pytest.mark.options(SECURITY_USER_CACHE_TTL=60)
+class TestUserCache:
+    @pytest.fixture(autouse=True)
+    def clear_user_cache(self):
+        security.clear_user_cache()
+
+    def test_cached_user_loader(self, user,
+                                security_utils_service: SecurityUtilsService):
+        snapshot = security_utils_service.cached_user_loader(user.id)
+        assert isinstance(snapshot, UserSnapshot)
+
+        with assert_max_queries(0):
+            snapshot = security_utils_service.cached_user_loader(str(user.id))
+            assert snapshot.id == user.id
+            assert snapshot.email == user.email
+            assert snapshot.first_name == 'first'
+            assert snapshot.is_active
+            assert snapshot.has_role('ROLE_USER')
+            with pytest.raises(AttributeError):
+                snapshot.password
+
+        assert snapshot.get_user() == user
+
+    def test_invalidated_on_update(self, user, session_manager: SessionManager):
+        security.cache_user(user)
+        assert security.get_cached_user(user.id).first_name == 'first'
+
+        user.first_name = 'updated'
+        session_manager.save(user, commit=True)
+        assert security.get_cached_user(user.id) is None
+
+    def test_invalidated_by_signals(self, user, security_service: SecurityService):
+        security.cache_user(user)
+        security_service.change_password(user, 'new password', send_email=False)
+        assert security.get_cached_user(user.id) is None
+
+    def test_session_auth(self, client, user):
+        client.login_user()
+        r = client.get('site_controller.index')
+        assert r.status_code == 200
+        assert security.get_cached_user(user.id) is not None
+
+
+def test_user_cache_disabled(user, security_utils_service: SecurityUtilsService):
+    assert security_utils_service.cached_user_loader(user.id) == user
+    assert security.get_cached_user(user.id) is None
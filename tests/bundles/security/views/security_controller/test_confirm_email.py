@@ -28,6 +28,20 @@ class TestConfirmEmail:
         assert user.confirmed_at
         assert current_user == user
 
+    @pytest.mark.options(SECURITY_CONFIRMABLE=True, SECURITY_USER_CACHE_TTL=60)
+    @pytest.mark.user()
+    def test_confirm_email_when_logged_in(self, client, user, security_service,
+                                          security_utils_service, monkeypatch):
+        client.login_user()
+        logouts = []
+        monkeypatch.setattr(security_service, 'logout_user',
+                            lambda: logouts.append(True))
+
+        token = security_utils_service.generate_confirmation_token(user)
+        r = client.get(url_for('security_controller.confirm_email', token=token))
+        assert r.status_code == 302
+        assert logouts == []
+
     @pytest.mark.options(SECURITY_CONFIRM_EMAIL_WITHIN='-1 seconds')
     def test_expired_token(self, client, user, registrations, confirmations,
                            outbox, templates, security_service):
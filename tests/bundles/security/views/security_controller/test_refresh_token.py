@@ -0,0 +1,71 @@
+import pytest
+
+from flask_unchained.bundles.security import (
+    SecurityService, SecurityUtilsService, TokenUser, auth_required, current_user)
+from flask_unchained.bundles.sqlalchemy.pytest import assert_max_queries
+
+
+@pytest.mark.options(SECURITY_STATELESS_TOKENS=True)
+@pytest.mark.usefixtures('user')
+class TestStatelessTokens:
+    def test_login(self, api_client, user,
+                   security_utils_service: SecurityUtilsService):
+        r = api_client.post('security_api.login',
+                            data=dict(email=user.email, password='password'))
+        assert r.status_code == 200
+        assert 'refresh_token' in r.json
+
+        token_user = security_utils_service.access_token_loader(r.json['token'])
+        assert token_user.id == user.id
+        assert token_user.role_names == {'ROLE_USER', 'ROLE_USER1'}
+
+    def test_auth_without_queries(self, app, user):
+        token = user.get_auth_token()
+
+        @auth_required(role='ROLE_USER')
+        def method():
+            return current_user._get_current_object()
+
+        with app.test_request_context(headers={'Authentication-Token': token}):
+            with assert_max_queries(0):
+                rv = method()
+        assert isinstance(rv, TokenUser)
+        assert rv.id == user.id
+        assert rv.get_user() == user
+
+    def test_check_auth_token(self, api_client, user):
+        r = api_client.get('security_controller.check_auth_token',
+                           headers={'Authentication-Token': user.get_auth_token()})
+        assert r.status_code == 200
+        assert r.json['user']['id'] == user.id
+
+    def test_refresh_token(self, api_client, user,
+                           security_utils_service: SecurityUtilsService):
+        refresh_token = security_utils_service.get_refresh_token(user)
+        r = api_client.post('security_api.refresh_token',
+                            data=dict(refresh_token=refresh_token))
+        assert r.status_code == 200
+        assert security_utils_service.access_token_loader(r.json['token']).id \
+            == user.id
+
+    def test_invalid_refresh_token(self, api_client):
+        r = api_client.post('security_api.refresh_token',
+                            data=dict(refresh_token='fail'))
+        assert r.status_code == 401
+        assert r.json['error'] == 'Invalid or expired refresh token.'
+
+    def test_revoked_refresh_token(self, api_client, user,
+                                   security_service: SecurityService,
+                                   security_utils_service: SecurityUtilsService):
+        refresh_token = security_utils_service.get_refresh_token(user)
+        security_service.change_password(user, 'new password', send_email=False)
+
+        r = api_client.post('security_api.refresh_token',
+                            data=dict(refresh_token=refresh_token))
+        assert r.status_code == 401
+
+    @pytest.mark.options(SECURITY_ACCESS_TOKEN_MAX_AGE=-1)
+    def test_expired_access_token(self, user,
+                                  security_utils_service: SecurityUtilsService):
+        assert security_utils_service.access_token_loader(
+            user.get_auth_token()) is None
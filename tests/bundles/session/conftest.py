@@ -0,0 +1,79 @@
+import pytest
+import time
+
+from flask import current_app, request
+from werkzeug.wrappers import Response
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.calls = []
+
+    def get(self, key):
+        self.calls.append(('get', key))
+        value, expires = self.data.get(key, (None, None))
+        if expires is not None and expires <= time.time():
+            return None
+        return value
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def ttl(self, name):
+        self.calls.append(('ttl', name))
+        value, expires = self.data.get(name, (None, None))
+        if value is None:
+            return -2
+        return int(expires - time.time())
+
+    def setex(self, name, time, value):
+        self.calls.append(('setex', name))
+        self.data[name] = (value, _expires_at(time))
+
+    def expire(self, name, time):
+        self.calls.append(('expire', name))
+        if name in self.data:
+            self.data[name] = (self.data[name][0], _expires_at(time))
+
+    def delete(self, name):
+        self.calls.append(('delete', name))
+        self.data.pop(name, None)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.commands.append((name, args))
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args) for name, args in self.commands]
+
+
+def _expires_at(seconds):
+    return time.time() + getattr(seconds, 'total_seconds', lambda: seconds)()
+
+
+@pytest.fixture()
+def session_request():
+    """
+    Returns a function to run a request with the server-side session: it opens
+    the session (using the given session id cookie), calls ``fn(session)``, saves
+    the session and returns the response.
+    """
+    def run(sid=None, fn=None):
+        app = current_app._get_current_object()
+        headers = {'Cookie': f'{app.session_cookie_name}={sid}'} if sid else {}
+        with app.test_request_context(headers=headers):
+            session = app.session_interface.open_session(app, request)
+            if fn is not None:
+                fn(session)
+            response = Response()
+            app.session_interface.save_session(app, session, response)
+            response.session = session
+            return response
+    return run
+
@@ -0,0 +1,27 @@
+import pytest
+
+from flask_unchained import AppFactory, TEST
+from ...sqlalchemy.conftest import *
+
+
+@pytest.fixture(autouse=True)
+def app(request, db_ext):
+    options = {'SESSION_TYPE': 'sqlalchemy', 'SESSION_SQLALCHEMY': db_ext}
+    for mark in request.node.iter_markers('options'):
+        kwargs = getattr(mark, 'kwargs', {})
+        options.update({k.upper(): v for k, v in kwargs.items()})
+
+    app = AppFactory.create_app(TEST, bundles=['flask_unchained.bundles.sqlalchemy',
+                                               'flask_unchained.bundles.session'],
+                                _config_overrides=options)
+    ctx = app.app_context()
+    ctx.push()
+    yield app
+    ctx.pop()
+
+
+@pytest.fixture(autouse=True)
+def db(app, db_ext):
+    db_ext.create_all()
+    yield db_ext
+    db_ext.drop_all()
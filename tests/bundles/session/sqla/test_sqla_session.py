@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+from flask_unchained.bundles.session.commands import cleanup
+from flask_unchained.bundles.sqlalchemy.query_stats import record_queries
+
+
+def test_skip_redundant_writes(app, db, session_request):
+    Session = app.session_interface.sql_session_model
+    sid = session_request(fn=lambda s: s.update(user_id=1)).session.sid
+    row = Session.query.filter_by(session_id='session:' + sid).one()
+
+    with record_queries() as stats:
+        response = session_request(sid)
+    assert response.session['user_id'] == 1
+    assert [q.split()[0] for q in stats.fingerprints] == ['SELECT']
+
+    expiry = row.expiry - timedelta(minutes=10)
+    Session.query.update({'expiry': expiry})
+    db.session.commit()
+    with record_queries() as stats:
+        session_request(sid)
+    updates = [q for q in stats.fingerprints if q.startswith('UPDATE')]
+    assert len(updates) == 1 and 'data' not in updates[0]
+    db.session.expire_all()
+    assert Session.query.one().expiry > expiry
+
+    session_request(sid, fn=lambda s: s.update(user_id=2))
+    assert session_request(sid).session['user_id'] == 2
+
+
+def test_expired_session(app, db, session_request):
+    Session = app.session_interface.sql_session_model
+    sid = session_request(fn=lambda s: s.update(user_id=1)).session.sid
+    Session.query.update({'expiry': datetime.utcnow() - timedelta(seconds=1)})
+    db.session.commit()
+
+    assert 'user_id' not in session_request(sid).session
+    assert Session.query.one().expiry > datetime.utcnow()
+
+
+def test_cleanup_command(app, db, cli_runner):
+    Session = app.session_interface.sql_session_model
+    now = datetime.utcnow()
+    for i in range(5):
+        db.session.add(Session(f'session:{i}', b'', now - timedelta(seconds=i - 2)))
+    db.session.commit()
+    assert 'ix_flask_sessions_expiry' in {ix.name for ix in Session.__table__.indexes}
+
+    with record_queries() as stats:
+        result = cli_runner.invoke(cleanup, args=['--batch-size', '2'])
+    assert result.exit_code == 0, result.output
+    assert 'Deleted 3 expired sessions.' in result.output
+    assert sum(count for q, count in stats.fingerprints.items()
+               if q.startswith('DELETE')) == 2  # batches of 2 and 1
+
+    assert {s.session_id for s in Session.query} == {'session:0', 'session:1'}
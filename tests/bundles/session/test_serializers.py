@@ -0,0 +1,44 @@
+import dill
+import pytest
+import uuid
+
+from datetime import datetime
+
+from flask_unchained.bundles.session.serializers import SessionSerializer, msgpack
+
+
+DATA = {'user_id': 1, '_fresh': True, '_id': 'a' * 128,
+        'csrf_token': uuid.uuid4().hex, 'ids': (1, 2),
+        'uuid': uuid.uuid4(), 'at': datetime(2018, 1, 2, 3, 4, 5)}
+
+
+@pytest.mark.parametrize('format', ['pickle', 'json', pytest.param(
+    'msgpack', marks=pytest.mark.skipif(msgpack is None,
+                                        reason='msgpack is not installed'))])
+def test_round_trip(format):
+    serializer = SessionSerializer(format, compress_threshold=None)
+    data = serializer.dumps(DATA)
+    assert data[:3] == b'\x00' + SessionSerializer.formats[format] + b'-'
+    assert serializer.loads(data) == DATA
+
+
+def test_compression():
+    serializer = SessionSerializer('json', compress_threshold=100)
+    small = serializer.dumps({'user_id': 1})
+    assert small[2:3] == b'-'
+
+    large = serializer.dumps({'token': 'x' * 1000})
+    assert large[2:3] == b'z'
+    assert len(large) < 100
+    assert serializer.loads(large) == {'token': 'x' * 1000}
+
+
+def test_loads_other_formats_and_dill():
+    serializer = SessionSerializer('json')
+    assert serializer.loads(SessionSerializer('pickle').dumps(DATA)) == DATA
+    assert serializer.loads(dill.dumps(DATA)) == DATA
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        SessionSerializer('yaml')
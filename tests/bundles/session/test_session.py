@@ -0,0 +1,109 @@
+import pytest
+import tempfile
+
+from flask import current_app
+from flask_unchained import AppFactory, TEST, unchained
+
+from .conftest import FakeRedis
+
+
+fake_redis = FakeRedis()
+
+
+@pytest.mark.bundles(['flask_unchained.bundles.session'])
+@pytest.mark.options(SESSION_TYPE='redis', SESSION_REDIS=fake_redis,
+                     SESSION_SERIALIZER='json')
+class TestSessionSerializer:
+    def test_configured_serializer(self, session_request):
+        response = session_request(fn=lambda s: s.update(user_id=1))
+        sid = response.session.sid
+
+        value, _ = fake_redis.data['session:' + sid]
+        assert value.startswith(b'\x00j')
+
+        response = session_request(sid)
+        assert response.session['user_id'] == 1
+        assert current_app.session_interface.serializer.format == 'json'
+
+
+redis = FakeRedis()
+
+
+@pytest.mark.bundles(['flask_unchained.bundles.session'])
+@pytest.mark.options(SESSION_TYPE='redis', SESSION_REDIS=redis)
+class TestSkipRedundantWrites:
+    @pytest.fixture(autouse=True)
+    def reset_redis(self):
+        redis.data.clear()
+
+    def writes(self):
+        rv = [name for name, key in redis.calls if name in {'setex', 'expire'}]
+        redis.calls.clear()
+        return rv
+
+    def test_unchanged_session_is_not_written(self, session_request):
+        sid = session_request(fn=lambda s: s.update(user_id=1)).session.sid
+        assert self.writes() == ['setex']
+
+        response = session_request(sid)
+        assert response.session['user_id'] == 1
+        assert self.writes() == []
+        assert 'Set-Cookie' not in response.headers
+
+        session_request(sid, fn=lambda s: s.update(user_id=2))
+        assert self.writes() == ['setex']
+        assert session_request(sid).session['user_id'] == 2
+
+    def test_nested_changes_are_written(self, session_request):
+        sid = session_request(fn=lambda s: s.update(cart=[])).session.sid
+        self.writes()
+
+        session_request(sid, fn=lambda s: s['cart'].append(1))
+        assert self.writes() == ['setex']
+        assert session_request(sid).session['cart'] == [1]
+
+    def test_expiry_refreshed_after_interval(self, app, session_request):
+        sid = session_request(fn=lambda s: s.update(user_id=1)).session.sid
+        self.writes()
+
+        value, expires = redis.data['session:' + sid]
+        redis.data['session:' + sid] = (value, expires - 600)
+        response = session_request(sid)
+        assert self.writes() == ['expire']
+        assert 'Set-Cookie' in response.headers
+        assert redis.data['session:' + sid][1] > expires - 60
+
+    @pytest.mark.options(SESSION_REFRESH_EACH_REQUEST=False)
+    def test_no_refresh_each_request(self, session_request):
+        sid = session_request(fn=lambda s: s.update(user_id=1)).session.sid
+        self.writes()
+
+        value, expires = redis.data['session:' + sid]
+        redis.data['session:' + sid] = (value, expires - 600)
+        session_request(sid)
+        assert self.writes() == []
+
+    def test_cleared_session_is_deleted(self, session_request):
+        sid = session_request(fn=lambda s: s.update(user_id=1)).session.sid
+        session_request(sid, fn=lambda s: s.clear())
+        assert 'session:' + sid not in redis.data
+
+
+@pytest.mark.bundles(['flask_unchained.bundles.session'])
+@pytest.mark.options(SESSION_TYPE='filesystem', SESSION_FILE_DIR=tempfile.mkdtemp())
+def test_filesystem_sessions(app, session_request):
+    cache = app.session_interface.cache
+    sid = session_request(fn=lambda s: s.update(user_id=1)).session.sid
+    assert session_request(sid).session['user_id'] == 1
+
+    cache.set('session:legacy', {'user_id': 2})
+    assert session_request('legacy').session['user_id'] == 2
+
+
+def test_local_cache_is_not_supported():
+    unchained._reset()
+    with pytest.raises(ValueError, match='SESSION_LOCAL_CACHE'):
+        AppFactory.create_app(TEST, bundles=['flask_unchained.bundles.session'],
+                              _config_overrides=dict(SESSION_TYPE='redis',
+                                                     SESSION_REDIS=FakeRedis(),
+                                                     SESSION_LOCAL_CACHE=True))
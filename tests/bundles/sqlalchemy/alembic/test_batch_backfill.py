@@ -0,0 +1,93 @@
+import pytest
+import sqlalchemy as sa
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from flask_unchained.bundles.sqlalchemy.alembic import BatchBackfillOp
+from flask_unchained.bundles.sqlalchemy.alembic.batch_backfill import (
+    BatchBackfill, PROGRESS_TABLE_NAME, render_batch_backfill)
+
+
+@pytest.fixture()
+def conn(tmpdir):
+    engine = sa.create_engine(f'sqlite:///{tmpdir.join("backfill.sqlite")}')
+    engine.execute('CREATE TABLE foo (id INTEGER PRIMARY KEY, '
+                   'name VARCHAR, slug VARCHAR)')
+    engine.execute(sa.text('INSERT INTO foo (id, name) VALUES (:id, :name)'),
+                   [dict(id=i, name=f'foo {i}') for i in range(1, 11)])
+    conn = engine.connect()
+    yield conn
+    conn.close()
+    engine.dispose()
+
+
+def get_op(conn):
+    return Operations(MigrationContext.configure(conn))
+
+
+def get_slugs(conn):
+    return [row[0] for row in conn.execute('SELECT slug FROM foo ORDER BY id')]
+
+
+class TestBatchBackfill:
+    def test_backfill(self, conn):
+        op = get_op(conn)
+        op.batch_backfill('foo', set_={'slug': sa.text("replace(name, ' ', '-')")},
+                          where='id > 2', batch_size=3)
+
+        assert get_slugs(conn) == [None, None] + [f'foo-{i}' for i in range(3, 11)]
+        assert PROGRESS_TABLE_NAME not in sa.inspect(conn).get_table_names()
+
+    def test_backfill_in_migration_transaction(self, conn):
+        with conn.begin():
+            get_op(conn).batch_backfill('foo', set_={'slug': 'x'}, batch_size=3)
+        assert get_slugs(conn) == ['x'] * 10
+
+    def test_resume(self, conn):
+        backfill = BatchBackfill('foo', set_={'slug': 'x'}, batch_size=4)
+        conn.execute(f'CREATE TABLE {PROGRESS_TABLE_NAME} '
+                     f'(key VARCHAR PRIMARY KEY, last_pk VARCHAR NOT NULL)')
+        conn.execute(sa.text(f'INSERT INTO {PROGRESS_TABLE_NAME} VALUES (:k, :v)'),
+                     k=backfill.key, v='8')
+
+        get_op(conn).batch_backfill('foo', set_={'slug': 'x'}, batch_size=4)
+        assert get_slugs(conn) == [None] * 8 + ['x', 'x']
+
+    def test_reverse(self, conn):
+        op = BatchBackfillOp(BatchBackfill('foo', set_={'slug': 'x'},
+                                           reverse_set={'slug': None}))
+        get_op(conn).invoke(op)
+        assert get_slugs(conn) == ['x'] * 10
+
+        get_op(conn).invoke(op.reverse())
+        assert get_slugs(conn) == [None] * 10
+
+        with pytest.raises(NotImplementedError):
+            BatchBackfillOp(BatchBackfill('foo', set_={'slug': 'x'})).reverse()
+
+    def test_reverse_where(self, conn):
+        with pytest.raises(ValueError):
+            BatchBackfill('foo', set_={'slug': 'x'}, where='slug IS NULL',
+                          reverse_set={'slug': None})
+
+        op = BatchBackfillOp(BatchBackfill('foo', set_={'slug': 'x'},
+                                           where='slug IS NULL AND id > 5',
+                                           reverse_set={'slug': None},
+                                           reverse_where='slug IS NOT NULL'))
+        get_op(conn).invoke(op)
+        assert get_slugs(conn) == [None] * 5 + ['x'] * 5
+
+        get_op(conn).invoke(op.reverse())
+        assert get_slugs(conn) == [None] * 10
+
+    def test_render(self):
+        op = BatchBackfillOp(BatchBackfill('foo',
+                                           set_={'slug': sa.text('lower(name)')},
+                                           where='slug IS NULL',
+                                           reverse_set={'slug': None},
+                                           reverse_where='slug IS NOT NULL',
+                                           batch_size=500, sleep=0.5))
+        assert render_batch_backfill(None, op) == (
+            "op.batch_backfill('foo', set_={'slug': sa.text('lower(name)')}, "
+            "where='slug IS NULL', reverse_set={'slug': None}, "
+            "reverse_where='slug IS NOT NULL', batch_size=500, sleep=0.5)")
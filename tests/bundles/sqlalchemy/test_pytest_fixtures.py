@@ -0,0 +1,83 @@
+import os
+
+from flask_unchained.bundles.sqlalchemy import SQLAlchemyUnchained
+from flask_unchained.bundles.sqlalchemy.pytest import (
+    ModelFactory, _create_test_database, _get_worker_url, assert_max_queries)
+from sqlalchemy import inspect
+from sqlalchemy.engine.url import make_url
+
+
+class Cache:
+    def __init__(self, tmpdir):
+        self.tmpdir = tmpdir
+
+    def makedir(self, name):
+        return self.tmpdir.ensure_dir(name)
+
+
+def setup(db: SQLAlchemyUnchained):
+    class Foo(db.Model):
+        class Meta:
+            lazy_mapped = False
+
+        name = db.Column(db.String)
+        slug = db.Column(db.String, nullable=True, unique=True)
+
+    return Foo
+
+
+class TestTestDatabase:
+    def test_get_worker_url(self, monkeypatch):
+        monkeypatch.delenv('PYTEST_XDIST_WORKER', raising=False)
+        assert str(_get_worker_url(make_url('sqlite:///db/test.sqlite'))) \
+            == 'sqlite:///db/test.sqlite'
+
+        monkeypatch.setenv('PYTEST_XDIST_WORKER', 'gw1')
+        assert str(_get_worker_url(make_url('sqlite://'))) == 'sqlite://'
+        assert str(_get_worker_url(make_url('sqlite:///db/test.sqlite'))) \
+            == 'sqlite:///db/test_gw1.sqlite'
+        assert str(_get_worker_url(make_url('postgresql://u:p@host/test'))) \
+            == 'postgresql://u:p@host/test_gw1'
+
+    def test_sqlite_snapshot(self, app, db: SQLAlchemyUnchained, tmpdir,
+                             monkeypatch):
+        setup(db)
+        cache = Cache(tmpdir.mkdir('cache'))
+        app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{tmpdir}/one.sqlite'
+        _create_test_database(app, db, cache)
+
+        snapshots = os.listdir(str(tmpdir.join('cache', 'sqlalchemy_bundle')))
+        assert len(snapshots) == 1
+        assert 'foo' in inspect(db.get_engine(app)).get_table_names()
+
+        # the second database gets restored from the snapshot
+        def create_all(*args, **kwargs):
+            raise AssertionError('create_all should not be called')
+        monkeypatch.setattr(db, 'create_all', create_all)
+
+        app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{tmpdir}/two.sqlite'
+        _create_test_database(app, db, cache)
+        assert tmpdir.join('two.sqlite').check()
+        assert 'foo' in inspect(db.get_engine(app)).get_table_names()
+
+
+class TestModelFactory:
+    def test_skips_select_without_unique_columns(self, app, db: SQLAlchemyUnchained):
+        Foo = setup(db)
+        db.create_all()
+        app.unchained.sqlalchemy_bundle.models['Foo'] = Foo
+
+        class FooFactory(ModelFactory):
+            class Meta:
+                model = Foo
+
+            name = 'foo'
+
+        with assert_max_queries(1):
+            one = FooFactory()
+        two = FooFactory()
+        assert one.id != two.id
+
+        with assert_max_queries(2):
+            three = FooFactory(slug='three')
+        assert FooFactory(slug='three') == three
@@ -0,0 +1,72 @@
+import pytest
+
+from flask_unchained.bundles.sqlalchemy import SQLAlchemyUnchained
+from flask_unchained.bundles.sqlalchemy.pytest import assert_max_queries
+from flask_unchained.bundles.sqlalchemy.query_stats import fingerprint
+
+
+def setup(db: SQLAlchemyUnchained):
+    class Foo(db.Model):
+        class Meta:
+            lazy_mapped = False
+
+        name = db.Column(db.String)
+
+    db.create_all()
+    db.session.add_all([Foo(name='one'), Foo(name='two')])
+    db.session.commit()
+    return Foo
+
+
+class TestFingerprint:
+    def test_literals(self):
+        assert fingerprint("SELECT * FROM foo WHERE name = 'it''s' AND id = 42") \
+            == 'SELECT * FROM foo WHERE name = ? AND id = ?'
+
+    def test_params_and_in_lists(self):
+        assert fingerprint('SELECT foo.id\n FROM foo WHERE foo.id IN (?, ?, ?)') \
+            == 'SELECT foo.id FROM foo WHERE foo.id IN (?)'
+        assert fingerprint('SELECT * FROM foo_1 WHERE id = %(id_1)s') \
+            == 'SELECT * FROM foo_1 WHERE id = ?'
+
+
+class TestQueryStats:
+    def test_query_stats_fixture(self, db: SQLAlchemyUnchained, query_stats):
+        Foo = setup(db)
+        count = query_stats.count
+        Foo.query.get(1)
+        Foo.query.get(2)
+        assert query_stats.count == count + 2
+        assert [statement for statement in query_stats.duplicates()
+                if statement.startswith('SELECT')]
+
+    def test_assert_max_queries(self, db: SQLAlchemyUnchained):
+        Foo = setup(db)
+
+        with assert_max_queries(1) as stats:
+            Foo.query.all()
+        assert stats.count == 1
+        assert stats.total_time > 0
+
+        with pytest.raises(AssertionError) as e:
+            with assert_max_queries(1):
+                for name in ['one', 'two']:
+                    Foo.query.filter_by(name=name).one()
+        assert 'Expected at most 1 queries, but 2 were executed' in str(e.value)
+        assert '2x SELECT' in str(e.value)
+
+    @pytest.mark.options(SECRET_KEY='secret',
+                         SQLALCHEMY_QUERY_STATS=True,
+                         SQLALCHEMY_QUERY_STATS_DUPLICATE_THRESHOLD=2)
+    def test_request_headers(self, app, db: SQLAlchemyUnchained, caplog):
+        Foo = setup(db)
+
+        def view():
+            return ','.join(Foo.query.get(id).name for id in [1, 2])
+        app.add_url_rule('/foos', 'foos', view)
+
+        r = app.test_client().get('/foos')
+        assert r.data == b'one,two'
+        assert r.headers['X-Query-Count'] == '2'
+        assert float(r.headers['X-Query-Time']) > 0
+        assert 'Likely N+1 query (2 times) during GET /foos' in caplog.text
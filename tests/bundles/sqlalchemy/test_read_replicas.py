@@ -0,0 +1,81 @@
+import pytest
+
+from flask_unchained.bundles.sqlalchemy import SessionManager, SQLAlchemyUnchained
+
+
+def setup(app, db: SQLAlchemyUnchained, tmpdir):
+    session_manager = SessionManager(db)
+
+    class Foo(db.Model):
+        class Meta:
+            lazy_mapped = False
+
+        name = db.Column(db.String)
+
+    db.create_all()
+
+    app.config['SQLALCHEMY_REPLICA_URIS'] = [
+        f'sqlite:///{tmpdir.join("replica0.sqlite")}',
+        f'sqlite:///{tmpdir.join("replica1.sqlite")}',
+    ]
+    for i in range(2):
+        engine = db.get_replica_engine()
+        db.metadata.create_all(bind=engine)
+        engine.execute(Foo.__table__.insert(), name=f'replica{i}')
+
+    return Foo, session_manager
+
+
+class TestReadReplicas:
+    def test_reads_default_to_primary(self, app, db: SQLAlchemyUnchained, tmpdir):
+        Foo, session_manager = setup(app, db, tmpdir)
+
+        session_manager.save(Foo(name='primary'), commit=True)
+        assert [foo.name for foo in Foo.query.all()] == ['primary']
+
+    def test_read_replica_round_robin(self, app, db: SQLAlchemyUnchained, tmpdir):
+        Foo, session_manager = setup(app, db, tmpdir)
+
+        names = set()
+        for _ in range(2):
+            with session_manager.read_replica():
+                names.add(Foo.query.one().name)
+            db.session.rollback()
+        assert names == {'replica0', 'replica1'}
+
+    def test_sticky_after_write(self, app, db: SQLAlchemyUnchained, tmpdir):
+        Foo, session_manager = setup(app, db, tmpdir)
+
+        session_manager.save(Foo(name='primary'), commit=True)
+        with session_manager.read_replica():
+            assert Foo.query.one().name == 'primary'
+
+    def test_primary_context_and_for_update(self, app, db: SQLAlchemyUnchained,
+                                            tmpdir):
+        Foo, session_manager = setup(app, db, tmpdir)
+
+        with session_manager.read_replica():
+            with session_manager.primary():
+                assert Foo.query.all() == []
+            assert Foo.query.with_for_update().all() == []
+
+    @pytest.mark.options(SQLALCHEMY_REPLICA_GET_REQUESTS=True)
+    def test_get_requests(self, app, db: SQLAlchemyUnchained, tmpdir):
+        Foo, session_manager = setup(app, db, tmpdir)
+
+        with app.test_request_context(method='POST'):
+            assert Foo.query.all() == []
+
+        with app.test_request_context(method='GET'):
+            assert Foo.query.one().name.startswith('replica')
+
+    def test_dispose_engines(self, app, db: SQLAlchemyUnchained, tmpdir):
+        setup(app, db, tmpdir)
+        app.config['SQLALCHEMY_BINDS'] = {
+            'other': f'sqlite:///{tmpdir.join("other.sqlite")}'}
+        engines = [db.engine, db.get_engine(bind='other'),
+                   db.get_replica_engine(), db.get_replica_engine()]
+        pools = [engine.pool for engine in engines]
+
+        db.dispose_engines()
+        assert all(engine.pool is not pool for engine, pool in zip(engines, pools))
@@ -68,3 +68,18 @@ class TestLoadBundles:
         assert isinstance(bundles[-3], ModuleBundle)
         assert isinstance(bundles[-2], VendorBundle)
         assert isinstance(bundles[-1], AppBundleInModule)
+
+
+class TestWarmup:
+    def test_warmup(self, app):
+        timings = app_factory.AppFactory.warmup(
+            app, list(app.unchained.bundles.values()))
+        assert list(timings.keys()) == ['url_map', 'templates', 'babel_bundle',
+                                        'controller_bundle', 'sqlalchemy_bundle']
+
+    @pytest.mark.options(warmup_on_startup=True,
+                         warmup_templates=['default/index.html', 'site/*'])
+    def test_warmup_on_startup(self, app):
+        cached = {name for _, name in app.jinja_env.cache.keys()}
+        assert cached == {'default/index.html', 'site/about.html',
+                          'site/index.html', 'site/terms.html'}